@@ -0,0 +1,128 @@
+"""AI suhbat: butun tarixni promptga qo'shish va chat_memory.ChatMemory.
+
+Ishlatish:
+    python benchmarks/bench_chat_memory.py --turns 50 --users 2000
+
+Bitta foydalanuvchi `--turns` ta ketma-ket savol beradi (javoblar
+fake_gemini'dan, ~`--words` so'z). Har navbatda prompt
+bot_gemini.prompt_registry.build() bilan yig'iladi:
+
+    naive  - hamma oldingi savol-javoblar kontekstga qo'shiladi
+             (prompt budjeti bo'lmasa qancha o'sishi ham ko'rsatiladi)
+    memory - ChatMemory.context(): xulosa + oxirgi juftliklar;
+             xulosa fonda soxta model bilan (`--latency`)
+
+Keyin `--users` ta foydalanuvchi bittadan suhbat qiladi va ularning
+xotirasi (tracemalloc) hamda `idle` dan keyin o'chirilishi o'lchanadi.
+
+Natija:
+    prompt_tokens.first/last/max - birinchi va oxirgi navbatdagi kirish tokenlari
+    unbounded_last_tokens        - budjetsiz to'liq tarix
+    summaries                    - xulosa uchun modelga so'rovlar
+    bytes_per_user, evicted      - xotira va bo'sh turganlar o'chirilgandan keyin
+"""
+import os
+import sys
+import json
+import asyncio
+import logging
+import argparse
+import tracemalloc
+from typing import Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("PROFILE_STORE", "memory")
+
+import bot_gemini  # noqa: E402
+from chat_memory import ChatMemory  # noqa: E402
+from fake_gemini import FakeGenerativeModel  # noqa: E402
+from prompts import PromptRegistry, estimate_tokens  # noqa: E402
+
+PROFILE = "Foydalanuvchi: 30 yosh, 80kg, 178cm\nMaqsad: lose_weight"
+
+
+def summary(tokens: List[int]) -> Dict[str, int]:
+    return {"first": tokens[0], "last": tokens[-1], "max": max(tokens)}
+
+
+async def run(args: argparse.Namespace) -> Dict:
+    model = FakeGenerativeModel(latency=args.latency, words=args.words)
+    questions = [f"{n}-savol: kechki ovqatda nima yesam bo'ladi va {n * 50} kcal ko'pmi?"
+                 for n in range(1, args.turns + 1)]
+    builder: PromptRegistry = bot_gemini.prompt_registry
+
+    async def summarize(old: str, turns: str) -> str:
+        prompt = bot_gemini.prompt_registry.render("chat_summary", summary=old or "-", turns=turns)
+        return (await asyncio.to_thread(model.generate_content, prompt)).text
+
+    answers = [model.generate_content(question).text for question in questions]
+    model.calls = 0
+
+    naive_tokens, unbounded_tokens, history = [], [], []
+    for question, answer in zip(questions, answers):
+        parts = (*history, PROFILE)
+        naive_tokens.append(builder.request_tokens(builder.build(question, parts)))
+        unbounded_tokens.append(estimate_tokens("\n".join(parts)) + estimate_tokens(question)
+                                + builder.system_tokens)
+        history.append(f"Foydalanuvchi: {question}\nAI: {answer}")
+
+    memory = ChatMemory(summarize)
+    memory_tokens = []
+    for question, answer in zip(questions, answers):
+        parts = (*memory.context(1), PROFILE)
+        memory_tokens.append(builder.request_tokens(builder.build(question, parts)))
+        memory.add(1, question, answer)
+        # Foydalanuvchi keyingi savolni yozguncha xulosa tayyor bo'ladi
+        await asyncio.sleep(0)
+    await asyncio.gather(*memory._tasks)
+    summaries = model.calls
+
+    # Ko'p foydalanuvchi: xotira hajmi va bo'sh turganlarni o'chirish
+    failing = ChatMemory(_no_summary, idle=0.05)
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    for user_id in range(args.users):
+        for question, answer in zip(questions[:args.user_turns], answers):
+            failing.add(user_id, question, answer)
+    await asyncio.gather(*failing._tasks)
+    after, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    users_stats = failing.stats()
+    await asyncio.sleep(0.1)
+    failing.context(-1)
+
+    return {
+        "turns": args.turns,
+        "naive": {"prompt_tokens": summary(naive_tokens),
+                  "unbounded_last_tokens": unbounded_tokens[-1],
+                  "trimmed": "tarix budjetdan oshganda eng eski juftliklar tashlanadi, xulosasiz"},
+        "memory": {"prompt_tokens": summary(memory_tokens),
+                   "summaries": summaries},
+        "users": {"count": args.users,
+                  "bytes_per_user": round((after - before) / args.users),
+                  "avg_tokens": users_stats["avg_tokens"],
+                  "evicted_after_idle": failing.stats()["evicted"],
+                  "left": failing.stats()["users"]}
+    }
+
+
+async def _no_summary(old: str, turns: str) -> str:
+    # Modelsiz: ChatMemory savollardan xulosa yig'adi
+    raise RuntimeError("xulosa o'chirilgan")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--turns", type=int, default=50)
+    parser.add_argument("--users", type=int, default=2000)
+    parser.add_argument("--user-turns", type=int, default=10)
+    parser.add_argument("--words", type=int, default=80, help="javob uzunligi (so'z)")
+    parser.add_argument("--latency", type=float, default=0.05, help="soxta model kechikishi (s)")
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+    print(json.dumps(asyncio.run(run(args)), ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+"""Profillarni eksport qilish: oqimli export.write_export va hammasini xotirada yig'ish.
+
+Ishlatish:
+    python benchmarks/bench_export.py --users 100000
+
+Vaqtinchalik SQLite bazaga `--users` ta tasodifiy profil (vazifalar,
+stress o'lchovlari, saqlangan ovqat rejalari bilan) yoziladi. Keyin
+ikki usulda NDJSON+gzip eksport qilinadi:
+
+    naive  - iter_all() natijasi ro'yxatga yig'iladi va yozuvlar
+             event loop'ning o'zida tayyorlanadi
+    stream - botdagidek: write_export thread'da (asyncio.to_thread),
+             profillar bittadan o'qiladi va yozish paytida siqiladi
+
+Eksport paytida event loop'da har 10 ms da uyg'onadigan "handler"
+ishlaydi; uning eng katta kechikishi - boshqa foydalanuvchilar
+javobni qancha kutishi.
+
+Natija (har bir usul uchun):
+    seconds, records_per_sec  - eksport tezligi
+    peak_mb                   - tracemalloc bo'yicha eng katta xotira
+    loop_lag_max_ms, p99_ms   - event loop kechikishi
+    bytes                     - siqilgan fayl hajmi
+"""
+import os
+import sys
+import json
+import time
+import random
+import asyncio
+import argparse
+import tempfile
+import tracemalloc
+from typing import Callable, Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("PROFILE_STORE", "memory")
+
+import export  # noqa: E402
+from bot_gemini import UserProfile  # noqa: E402
+from storage import SQLiteBackend  # noqa: E402
+
+TASKS = ["Ertalab yugurish", "Hisobot tayyorlash", "Kitob o'qish", "Suv ichish", "Meditatsiya"]
+DISHES = ["Osh", "Mastava", "Tovuqli salat", "Grechka", "Qatiq", "Olma"]
+
+
+def populate(backend: SQLiteBackend, users: int, seed: int = 7) -> None:
+    rng = random.Random(seed)
+    today = time.time()
+    day = int(today // 86400) + 719163
+    batch = []
+    for user_id in range(users):
+        profile = UserProfile(user_id)
+        profile.weight = round(rng.uniform(50, 120), 1)
+        profile.height = round(rng.uniform(150, 195), 1)
+        profile.age = rng.randint(16, 70)
+        profile.gender = rng.choice(["male", "female"])
+        profile.activity_level = "moderate"
+        profile.goal = rng.choice(["lose_weight", "maintain", "gain_muscle"])
+        for back in range(rng.randint(0, 14)):
+            profile.stress_levels.append(rng.uniform(1, 10), today - back * 86400)
+        for _ in range(rng.randint(0, 5)):
+            task = profile.tasks.add(rng.choice(TASKS), day)
+            if rng.random() < 0.6:
+                profile.tasks.complete(task.id)
+        for back in range(rng.randint(0, 3)):
+            profile.meal_history.append([day - back, rng.getrandbits(32), rng.randint(1500, 2800),
+                                         rng.sample(DISHES, 4)])
+        batch.append((user_id, json.dumps(profile.to_dict(), ensure_ascii=False), today - rng.uniform(0, 30 * 86400)))
+        if len(batch) == 5000:
+            backend.save_many(batch)
+            batch = []
+    backend.save_many(batch)
+
+
+def naive_export(backend: SQLiteBackend, out) -> int:
+    """Hammasini ro'yxatga yig'ib, keyin bitta gzip bilan yozish"""
+    import gzip
+    rows = list(backend.iter_all())
+    lines = [line for line in export.ndjson_lines(export.iter_records(rows))]
+    data = gzip.compress(b"".join(lines))
+    out.write(data)
+    return len(data)
+
+
+def stream_export(backend: SQLiteBackend, out) -> int:
+    return export.write_export(backend, out, "ndjson", export.KINDS, 0.0, True).bytes
+
+
+async def measure(run: Callable[[], int], in_thread: bool) -> Dict:
+    lags: List[float] = []
+    done = asyncio.Event()
+
+    async def handler() -> None:
+        while not done.is_set():
+            started = time.perf_counter()
+            await asyncio.sleep(0.01)
+            lags.append(time.perf_counter() - started - 0.01)
+
+    ticker = asyncio.create_task(handler())
+    await asyncio.sleep(0.05)
+    tracemalloc.start()
+    started = time.perf_counter()
+    size = await asyncio.to_thread(run) if in_thread else run()
+    seconds = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    await asyncio.sleep(0.05)
+    done.set()
+    await ticker
+    lags.sort()
+    return {
+        "seconds": round(seconds, 2),
+        "peak_mb": round(peak / 2 ** 20, 1),
+        "loop_lag_max_ms": round(max(lags) * 1000, 1),
+        "loop_lag_p99_ms": round(lags[min(len(lags) - 1, int(0.99 * len(lags)))] * 1000, 1),
+        "bytes": size
+    }
+
+
+async def run(args: argparse.Namespace) -> Dict:
+    with tempfile.TemporaryDirectory() as workdir:
+        backend = SQLiteBackend(os.path.join(workdir, "export.db"))
+        started = time.perf_counter()
+        populate(backend, args.users)
+        populate_seconds = time.perf_counter() - started
+
+        # Yozuvlar soni (tezlikni hisoblash uchun)
+        with open(os.devnull, "wb") as sink:
+            records = sum(export.write_export(backend, sink).records.values())
+
+        results = {"users": args.users, "records": records, "populate_seconds": round(populate_seconds, 1)}
+        for name, fn, in_thread in (("naive", naive_export, False), ("stream", stream_export, True)):
+            with open(os.path.join(workdir, f"{name}.ndjson.gz"), "wb") as out:
+                result = await measure(lambda: fn(backend, out), in_thread)
+            result["records_per_sec"] = round(records / result["seconds"])
+            results[name] = result
+        backend.close()
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=100000)
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(run(args)), ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""Mahalliy taomlar bazasi (food_db.FoodDB) benchmarki.
+
+Ishlatish:
+    python benchmarks/bench_food_db.py --repeat 20000
+
+Baza bir marta yuklanadi (vaqti va tracemalloc bo'yicha xotirasi), keyin
+har xil so'rovlar o'lchanadi: aniq nom, prefiks, xato yozilgan nom
+(trigram indeksi), bazada yo'q nom va erkin matndagi kaloriya savoli.
+Noaniq qidiruv indekssiz usul - barcha kalitlar bo'ylab
+difflib.get_close_matches - bilan solishtiriladi. Oxirida xuddi shu
+savolga Gemini yo'li (fake_gemini, `--latency`) qancha turishi ko'rsatiladi.
+
+Natija:
+    load_ms, memory_kb   - yuklash vaqti va bazaning xotirasi
+    lookups.*_us         - bitta qidiruv vaqti (mikrosoniya)
+    fuzzy_linear_us      - indekssiz noaniq qidiruv
+    llm_ms               - bitta savolning Gemini orqali vaqti
+"""
+import os
+import sys
+import json
+import time
+import difflib
+import asyncio
+import argparse
+import tracemalloc
+from typing import Callable, Dict
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fake_gemini import FakeGenerativeModel  # noqa: E402
+from food_db import FoodDB, normalize  # noqa: E402
+from llm_executor import GeminiExecutor  # noqa: E402
+
+QUERIES = {
+    "exact": "osh",
+    "alias": "plov",
+    "prefix": "shashl",
+    "fuzzy": "chuchvra",
+    "miss": "sushi",
+}
+QUESTION = "Oshda necha kaloriya bor?"
+
+
+def timeit(fn: Callable[[], object], repeat: int) -> float:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - started) / repeat * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=20000)
+    parser.add_argument("--latency", type=float, default=0.8, help="soxta model kechikishi (s)")
+    args = parser.parse_args()
+
+    db = FoodDB()
+    tracemalloc.start()
+    db.load()
+    memory, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    lookups = {f"{name}_us": round(timeit(lambda q=query: db.lookup(q), args.repeat), 2)
+               for name, query in QUERIES.items()}
+    lookups["question_us"] = round(timeit(lambda: db.find(QUESTION), args.repeat), 2)
+    keys = db._keys
+    fuzzy_linear = timeit(lambda: difflib.get_close_matches(normalize(QUERIES["fuzzy"]), keys, 1, 0.6),
+                          max(1, args.repeat // 20))
+
+    model = FakeGenerativeModel(latency=args.latency)
+    executor = GeminiExecutor()
+    started = time.perf_counter()
+    asyncio.run(executor.run(lambda: model.generate_content(QUESTION).text))
+    llm_ms = (time.perf_counter() - started) * 1000
+    executor.shutdown()
+
+    results: Dict[str, object] = {
+        "foods": len(db),
+        "keys": len(keys),
+        "load_ms": round(db.load_seconds * 1000, 2),
+        "memory_kb": round(memory / 1024, 1),
+        "lookups": lookups,
+        "fuzzy_linear_us": round(fuzzy_linear, 2),
+        "llm_ms": round(llm_ms, 1),
+        "answers": {name: getattr(db.lookup(query), "name", None) for name, query in QUERIES.items()},
+    }
+    results["answers"]["question"] = db.find(QUESTION).name
+    print(json.dumps(results, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""Suhbat jurnali (journal.JournalPersistence) yozish va tiklanish benchmarki.
+
+Ishlatish:
+    python benchmarks/bench_journal.py --users 100000 --rounds 4
+
+Har bir raundda barcha foydalanuvchilarning suhbat holati va user_data'si
+o'zgaradi; yozuvlar Application'dagidek `--batch` tadan guruhlanib
+(bitta update_persistence = bitta fsync) yoziladi. So'ng jurnal yangi
+obyekt bilan qayta o'qiladi (restart), avval siqilmagan, keyin
+siqilgan holda.
+
+Natija:
+    write.records_per_sec - guruhlangan yozish tezligi
+    replay_*.seconds      - ishga tushishda holatni tiklash vaqti
+"""
+import os
+import sys
+import json
+import time
+import asyncio
+import tempfile
+import argparse
+from typing import Dict
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from journal import JournalPersistence  # noqa: E402
+
+FIRST_USER_ID = 100_000
+# bot_gemini'dagi WEIGHT_INPUT ... STRESS_CHECK
+STATES = (2, 3, 4, 5, 6, 7, 0)
+
+
+async def write_journal(path: str, users: int, rounds: int, batch: int) -> Dict:
+    # Siqish o'chirilgan: tiklash eng yomon holatda (to'liq jurnal) o'lchanadi
+    journal = JournalPersistence(path, compact_min=10 ** 12)
+    await journal.get_conversations("main")
+    started = time.perf_counter()
+    for round_ in range(rounds):
+        for first in range(0, users, batch):
+            updates = []
+            for user_id in range(FIRST_USER_ID + first, FIRST_USER_ID + min(users, first + batch)):
+                state = STATES[(user_id + round_) % len(STATES)]
+                updates.append(journal.update_conversation("main", (user_id, user_id), state))
+                updates.append(journal.update_user_data(user_id, {"step": round_, "lang": "uz"}))
+            await asyncio.gather(*updates)
+    elapsed = time.perf_counter() - started
+    stats = journal.stats()
+    await journal.flush()
+    return {
+        "records": stats["records"],
+        "batches": stats["batches"],
+        "seconds": round(elapsed, 2),
+        "records_per_sec": int(stats["records"] / elapsed),
+        "bytes": os.path.getsize(path)
+    }
+
+
+async def replay(path: str, compact: bool = False) -> Dict:
+    journal = JournalPersistence(path)
+    started = time.perf_counter()
+    conversations = await journal.get_conversations("main")
+    user_data = await journal.get_user_data()
+    await journal.get_chat_data()
+    await journal.get_bot_data()
+    elapsed = time.perf_counter() - started
+    result = {
+        "records": journal.stats()["records"],
+        "conversations": len(conversations),
+        "user_data": len(user_data),
+        "seconds": round(elapsed, 3),
+        "bytes": os.path.getsize(path)
+    }
+    if compact:
+        started = time.perf_counter()
+        await asyncio.get_running_loop().run_in_executor(
+            journal._io, journal._compact_sync, journal._snapshot()
+        )
+        result["compact_seconds"] = round(time.perf_counter() - started, 3)
+    await journal.flush()
+    return result
+
+
+async def run(users: int, rounds: int, batch: int) -> Dict:
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "bench.journal")
+        write = await write_journal(path, users, rounds, batch)
+        before = await replay(path, compact=True)
+        after = await replay(path)
+    return {"users": users, "rounds": rounds, "write": write,
+            "replay_full_log": before, "replay_compacted": after}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=100_000)
+    parser.add_argument("--rounds", type=int, default=4)
+    parser.add_argument("--batch", type=int, default=5000,
+                        help="bitta update_persistence'dagi foydalanuvchilar")
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(run(args.users, args.rounds, args.batch)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
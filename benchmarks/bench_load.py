@@ -0,0 +1,242 @@
+"""Haqiqiy ConversationHandler ustida yuklama va kechikish benchmarki.
+
+Ishlatish:
+    python benchmarks/bench_load.py --users 2000 --llm-latency 0.5
+    python benchmarks/bench_load.py --users 500 --max-lag-ms 100   # CI uchun
+
+Bot `build_application()` orqali quriladi va lokal soxta Bot API'ga
+(fake_telegram.StubBotAPI) polling qiladi, Gemini o'rniga
+fake_gemini.FakeGenerativeModel ishlatiladi - tarmoq kerak emas.
+Har bir bosqichda barcha foydalanuvchilar bittadan update yuboradi va
+keyingi bosqich oldingisi to'liq qayta ishlanganidan keyin boshlanadi.
+
+Natija:
+    latency_ms   - update Bot API'ga tushgandan handler tugaguncha (p50/p95/p99)
+    handler_ms   - faqat handler zanjiri (navbatda kutishsiz)
+    loop_lag_ms  - event loop kechikishi; bloklovchi chaqiruvlar shu yerda ko'rinadi
+    bytes_per_user - RSS o'sishi / foydalanuvchilar
+"""
+import os
+import sys
+import json
+import time
+import asyncio
+import logging
+import argparse
+from collections import defaultdict
+from typing import Dict, List, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("PROFILE_STORE", "memory")
+# Rate limit benchmarkda o'lchanmaydi; kerak bo'lsa env orqali qaytarish mumkin
+os.environ.setdefault("LLM_USER_RATE", "1000")
+os.environ.setdefault("LLM_USER_BURST", "1000")
+os.environ.setdefault("LLM_GLOBAL_RATE", "100000")
+os.environ.setdefault("LLM_GLOBAL_BURST", "100000")
+
+from fake_telegram import (  # noqa: E402
+    STUB_TOKEN, StubBotAPI, make_callback_update, make_message_update, start_server
+)
+from fake_gemini import FakeGenerativeModel  # noqa: E402
+
+# (tur, qiymat): har bir foydalanuvchi uchun bir xil suhbat
+SCRIPT = [
+    ("msg", "/start"),
+    ("msg", "👤 Profil sozlash"),
+    ("cb", "gender_male"),
+    ("msg", "75"),
+    ("msg", "180"),
+    ("msg", "30"),
+    ("cb", "activity_moderate"),
+    ("cb", "goal_maintain"),
+    ("msg", "📋 Kunlik rejalashtirish"),
+    ("cb", "add_task"),
+    ("msg", "Ertalab yugurish"),
+    ("cb", "view_tasks"),
+    ("cb", "task_done:1"),
+    ("msg", "🍎 Ovqatlanish rejasi"),
+    ("msg", "😌 Stress va dam olish"),
+    ("cb", "check_stress"),
+    ("msg", "5,7,6"),
+    ("msg", "📊 Haftalik natijalar"),
+    ("msg", "Qanday qilib yaxshi uxlash mumkin?"),
+]
+
+FIRST_USER_ID = 100_000
+
+
+def percentiles(values: List[float], points=(50, 95, 99)) -> Dict[str, float]:
+    if not values:
+        return {f"p{p}": 0.0 for p in points}
+    ordered = sorted(values)
+    result = {}
+    for p in points:
+        index = min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))
+        result[f"p{p}"] = round(ordered[index] * 1000, 2)
+    result["max"] = round(ordered[-1] * 1000, 2)
+    return result
+
+
+def rss_bytes() -> int:
+    """Jarayonning joriy RSS hajmi (Linux), bo'lmasa eng yuqori RSS"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+class LoopLagMonitor:
+    """Event loop `interval` dan qancha kech uyg'onayotganini o'lchash"""
+
+    def __init__(self, interval: float = 0.01):
+        self.interval = interval
+        self.samples: List[float] = []
+        self._task: Optional[asyncio.Task] = None
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            started = loop.time()
+            await asyncio.sleep(self.interval)
+            self.samples.append(max(0.0, loop.time() - started - self.interval))
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+
+
+class UpdateTimer:
+    """Update'lar bo'yicha vaqt: Bot API'ga tushgan, handler boshlangan, tugagan"""
+
+    def __init__(self):
+        self.fed_at: Dict[int, float] = {}
+        self.started_at: Dict[int, float] = {}
+        self.latencies: List[float] = []
+        self.handler_times: List[float] = []
+        self.by_step: Dict[str, List[float]] = defaultdict(list)
+        self.step_of: Dict[int, str] = {}
+        self.done = 0
+
+    async def on_start(self, update, context) -> None:
+        self.started_at[update.update_id] = time.perf_counter()
+
+    async def on_end(self, update, context) -> None:
+        now = time.perf_counter()
+        update_id = update.update_id
+        latency = now - self.fed_at.pop(update_id, now)
+        self.latencies.append(latency)
+        self.handler_times.append(now - self.started_at.pop(update_id, now))
+        self.by_step[self.step_of.pop(update_id, "?")].append(latency)
+        self.done += 1
+
+    async def wait(self, count: int, timeout: float) -> None:
+        deadline = time.perf_counter() + timeout
+        while self.done < count:
+            if time.perf_counter() > deadline:
+                raise TimeoutError(f"{self.done}/{count} update qayta ishlandi")
+            await asyncio.sleep(0.005)
+
+
+async def run_load(users: int, llm_latency: float, llm_error_rate: float = 0.0,
+                   port: int = 8383, phase_timeout: float = 300) -> Dict:
+    from telegram import Update
+    from telegram.ext import TypeHandler
+    import bot_gemini
+
+    # Har bir Bot API so'rovi log'ga yozilsa o'lchov buziladi
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    model = FakeGenerativeModel(latency=llm_latency, error_rate=llm_error_rate)
+    bot_gemini.gemini_model = model
+
+    stub = StubBotAPI()
+    stub_server, stub_task = await start_server(stub, port)
+    application = bot_gemini.build_application(
+        token=STUB_TOKEN, base_url=f"http://127.0.0.1:{port}"
+    )
+    timer = UpdateTimer()
+    application.add_handler(TypeHandler(Update, timer.on_start), group=-1000)
+    application.add_handler(TypeHandler(Update, timer.on_end), group=1000)
+
+    await application.initialize()
+    await application.start()
+    await application.updater.start_polling(poll_interval=0, timeout=1)
+
+    monitor = LoopLagMonitor()
+    monitor.start()
+    rss_before = rss_bytes()
+    started = time.perf_counter()
+    update_id = 1
+    expected = 0
+    for kind, value in SCRIPT:
+        phase = []
+        for n in range(users):
+            user_id = FIRST_USER_ID + n
+            if kind == "msg":
+                phase.append(make_message_update(update_id, user_id, value))
+            else:
+                phase.append(make_callback_update(update_id, user_id, value))
+            timer.step_of[update_id] = value
+            update_id += 1
+        now = time.perf_counter()
+        for update in phase:
+            timer.fed_at[update["update_id"]] = now
+        stub.feed(phase)
+        expected += len(phase)
+        await timer.wait(expected, phase_timeout)
+    elapsed = time.perf_counter() - started
+    rss_after = rss_bytes()
+    await monitor.stop()
+
+    await application.updater.stop()
+    await application.stop()
+    await application.shutdown()
+    stub_server.should_exit = True
+    await stub_task
+
+    slowest = sorted(timer.by_step.items(), key=lambda item: -percentiles(item[1])["p95"])[:5]
+    return {
+        "users": users,
+        "updates": expected,
+        "seconds": round(elapsed, 2),
+        "updates_per_sec": round(expected / elapsed, 1),
+        "latency_ms": percentiles(timer.latencies),
+        "handler_ms": percentiles(timer.handler_times),
+        "loop_lag_ms": percentiles(monitor.samples),
+        "bytes_per_user": int((rss_after - rss_before) / users),
+        "profiles": len(bot_gemini.user_data_storage),
+        "llm_calls": model.calls,
+        "api_calls": dict(stub.calls),
+        "slowest_steps_p95_ms": {step: percentiles(v)["p95"] for step, v in slowest},
+        "gemini": bot_gemini.gemini_executor.stats()
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--llm-latency", type=float, default=0.5,
+                        help="soxta Gemini javob kechikishi, soniya")
+    parser.add_argument("--llm-error-rate", type=float, default=0.0)
+    parser.add_argument("--port", type=int, default=8383)
+    parser.add_argument("--max-lag-ms", type=float, default=None,
+                        help="loop lag p99 shundan oshsa chiqish kodi 1")
+    args = parser.parse_args()
+
+    result = asyncio.run(run_load(args.users, args.llm_latency, args.llm_error_rate, args.port))
+    print(json.dumps(result, ensure_ascii=False, indent=2))
+    if args.max_lag_ms is not None and result["loop_lag_ms"]["p99"] > args.max_lag_ms:
+        print(f"loop lag p99 {result['loop_lag_ms']['p99']} ms > {args.max_lag_ms} ms", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+"""Ovqatlanish rejasi ekrani: har foydalanuvchiga alohida reja va kohorta keshi.
+
+Ishlatish:
+    python benchmarks/bench_meal_plans.py --users 1000 --concurrency 32
+
+Tasodifiy profillar (vazn, bo'y, yosh, jins, faollik, maqsad) bilan
+`--users` ta foydalanuvchi "Ovqatlanish rejasi" tugmasini bosadi. Gemini
+o'rniga fake_gemini.FakeGenerativeModel (`--latency` kechikish bilan),
+chaqiriqlar botdagidek GeminiExecutor orqali. Ikki variant:
+
+    per_user - eski usul: profil promptidan har safar Gemini'ga so'rov
+    cohort   - bot_gemini.meal_plan_prompt (kohorta prompti) bo'yicha
+               meal_plans.MealPlanCache, JSON javob tekshirilib saqlanadi;
+               bir kohortaga bir vaqtda kelgan so'rovlar botdagidek
+               LLMGate orqali birlashtiriladi (limitlar o'chirilgan)
+
+Natija (har bir variant uchun):
+    model_calls      - modelga yuborilgan so'rovlar (kvota sarfi)
+    p50_ms, p99_ms   - ekran kechikishi
+    seconds          - hamma foydalanuvchilarga xizmat vaqti
+Kohorta uchun qo'shimcha: kohortalar soni, kesh statistikasi va
+meal_history'ga saqlanadigan yozuv hajmi (eski matnli reja bilan).
+"""
+import os
+import sys
+import json
+import time
+import random
+import asyncio
+import argparse
+from typing import Awaitable, Callable, Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("PROFILE_STORE", "memory")
+
+import bot_gemini  # noqa: E402
+import meal_plans  # noqa: E402
+from fake_gemini import FakeGenerativeModel  # noqa: E402
+from llm_executor import GeminiExecutor  # noqa: E402
+from meal_plans import MealPlanCache  # noqa: E402
+from rate_limit import LLMGate  # noqa: E402
+
+ACTIVITIES = ("sedentary", "light", "moderate", "very_active")
+GOALS = ("lose_weight", "maintain", "gain_muscle")
+
+
+def percentile(values: List[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))] if ordered else 0.0
+
+
+def make_profiles(count: int, seed: int = 7) -> List[bot_gemini.UserProfile]:
+    rng = random.Random(seed)
+    profiles = []
+    for user_id in range(count):
+        profile = bot_gemini.UserProfile(user_id)
+        profile.gender = rng.choice(("male", "female"))
+        male = profile.gender == "male"
+        profile.height = round(rng.gauss(176 if male else 163, 7))
+        profile.weight = round(rng.gauss(82 if male else 68, 12), 1)
+        profile.age = rng.randint(18, 65)
+        profile.activity_level = rng.choice(ACTIVITIES)
+        profile.goal = rng.choice(GOALS)
+        profiles.append(profile)
+    return profiles
+
+
+def legacy_prompt(profile: bot_gemini.UserProfile) -> str:
+    result = profile.nutrition()
+    return f"""
+    Foydalanuvchi ma'lumotlari:
+    - Vazni: {profile.weight} kg
+    - Bo'yi: {profile.height} cm
+    - BMI: {result.bmi}
+    - Kunlik kaloriya: {result.calories} kcal
+    - Makrolar: oqsil {result.protein_g} g, uglevod {result.carbs_g} g, yog' {result.fat_g} g
+    - Maqsad: {profile.goal or 'maintain'}
+
+    Iltimos, bir kunlik ovqatlanish rejasi tuzing:
+    1. Nonushta (kaloriya va tarkib)
+    2. Tushlik (kaloriya va tarkib)
+    3. Kechki ovqat (kaloriya va tarkib)
+    4. Snacklar (2 ta)
+
+    O'zbek milliy taomlarini ham qo'shing. Qisqa va aniq javob bering.
+    """
+
+
+async def serve(profiles: List[bot_gemini.UserProfile], concurrency: int,
+                screen: Callable[[bot_gemini.UserProfile], Awaitable[str]]) -> Dict:
+    latencies: List[float] = []
+    queue = iter(profiles)
+
+    async def user() -> None:
+        for profile in queue:
+            started = time.perf_counter()
+            await screen(profile)
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(user() for _ in range(concurrency)))
+    return {
+        "p50_ms": round(percentile(latencies, 0.5) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 2),
+        "seconds": round(time.perf_counter() - started, 2)
+    }
+
+
+async def run(args: argparse.Namespace) -> Dict:
+    profiles = make_profiles(args.users)
+    executor = GeminiExecutor(max_concurrency=args.concurrency, timeout=30)
+
+    model = FakeGenerativeModel(latency=args.latency, words=250)
+    legacy_text = ""
+
+    async def per_user(profile: bot_gemini.UserProfile) -> str:
+        nonlocal legacy_text
+        prompt = bot_gemini.build_gemini_prompt(legacy_prompt(profile))
+        legacy_text = await executor.run(lambda: model.generate_content(prompt).text)
+        return legacy_text
+
+    per_user_result = await serve(profiles, args.concurrency, per_user)
+    per_user_result["model_calls"] = model.calls
+
+    model = FakeGenerativeModel(latency=args.latency, seed=1)
+    cache = MealPlanCache()
+    gate = LLMGate(global_rate=1e9, global_burst=1e9)
+
+    async def generate(prompt: str) -> str:
+        full_prompt = bot_gemini.build_gemini_prompt(prompt)
+        return await executor.run(lambda: model.generate_content(full_prompt).text)
+
+    async def fetch(prompt: str) -> str:
+        return meal_plans.normalize(await gate.call(None, prompt, lambda: generate(prompt)))
+
+    last_plan = None
+
+    async def cohort(profile: bot_gemini.UserProfile) -> str:
+        nonlocal last_plan
+        plan = await cache.plan(bot_gemini.meal_plan_prompt(profile), fetch)
+        last_plan = meal_plans.personalize(plan, profile.calculate_daily_calories())
+        return meal_plans.format_plan(last_plan)
+
+    cohort_result = await serve(profiles, args.concurrency, cohort)
+    # Fonda to'ldirilayotgan variantlar ham kvota sarfiga kiradi
+    await asyncio.gather(*cache._tasks)
+    executor.shutdown()
+    cohort_result.update({
+        "model_calls": model.calls,
+        "cohorts": len({bot_gemini.meal_plan_prompt(profile) for profile in profiles}),
+        "cache": cache.stats(),
+        "coalesced": gate.stats()["coalesced"],
+        "history_entry_bytes": len(json.dumps([0, *meal_plans.summary(last_plan)], ensure_ascii=False).encode()),
+        "legacy_plan_text_bytes": len(legacy_text.encode())
+    })
+    return {"users": args.users, "per_user": per_user_result, "cohort": cohort_result}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--latency", type=float, default=0.2, help="soxta model kechikishi (s)")
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(run(args)), ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""Profil uchun xotira sarfi: eski (dict + cheksiz ro'yxatlar) va yangi
+(__slots__ + chegaralangan array tarix) ko'rinishlar.
+
+Ishlatish:
+    python benchmarks/bench_memory.py --users 100000
+"""
+import os
+import sys
+import gc
+import random
+import argparse
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("PROFILE_STORE", "memory")
+
+from bot_gemini import UserProfile  # noqa: E402
+
+
+class LegacyUserProfile:
+    """O'zgarishdan oldingi profil ko'rinishi (solishtirish uchun)"""
+    def __init__(self, user_id: int):
+        self.user_id = user_id
+        self.weight = None
+        self.height = None
+        self.age = None
+        self.gender = None
+        self.activity_level = None
+        self.goal = None
+        self.daily_tasks = []
+        self.completed_tasks = []
+        self.meal_history = []
+        self.stress_levels = []
+        self.weekly_stats = []
+
+
+TASKS = ["Ertalab yugurish", "Hisobot tayyorlash", "Kitob o'qish", "Suv ichish", "Meditatsiya"]
+
+
+def simulate(cls, users: int, seed: int = 7) -> list:
+    """Har xil faollikdagi foydalanuvchilarni yaratish"""
+    rng = random.Random(seed)
+    profiles = []
+    for user_id in range(users):
+        profile = cls(user_id)
+        profile.weight = round(rng.uniform(50, 120), 1)
+        profile.height = round(rng.uniform(150, 195), 1)
+        profile.age = rng.randint(16, 70)
+        profile.gender = rng.choice(["male", "female"])
+        profile.activity_level = "moderate"
+        profile.goal = "maintain"
+        # Faollik: ko'pchilik kam, ozchilik juda ko'p foydalanadi
+        days = min(int(rng.paretovariate(1.2) * 10), 1000)
+        for _ in range(days):
+            profile.stress_levels.append(rng.uniform(1, 10))
+        for _ in range(min(days, 50)):
+            # Foydalanuvchi kiritgan matn har safar yangi satr obyekti bo'ladi
+            task = "".join(list(rng.choice(TASKS)))
+            if cls is UserProfile:
+                profile.tasks.add(task)
+            else:
+                profile.daily_tasks.append(task)
+        for _ in range(days // 7):
+            profile.weekly_stats.append(rng.uniform(0, 100))
+        profiles.append(profile)
+    return profiles
+
+
+def measure(cls, users: int) -> float:
+    gc.collect()
+    tracemalloc.start()
+    profiles = simulate(cls, users)
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del profiles
+    return current / users
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--users", type=int, default=100_000)
+    args = parser.parse_args()
+
+    before = measure(LegacyUserProfile, args.users)
+    after = measure(UserProfile, args.users)
+    print(f"{args.users} ta foydalanuvchi")
+    print(f"  oldin : {before:8.0f} bayt/profil")
+    print(f"  keyin : {after:8.0f} bayt/profil  ({after / before:.0%})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""Skalyar (profil-profil) va batch nutritsiya hisobini solishtirish.
+
+Ishlatish:
+    python benchmarks/bench_nutrition.py --profiles 100000
+"""
+import os
+import sys
+import time
+import random
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import nutrition  # noqa: E402
+
+
+def random_rows(count: int, seed: int = 42):
+    rng = random.Random(seed)
+    activities = list(nutrition.ACTIVITY_MULTIPLIERS)
+    for _ in range(count):
+        yield (
+            round(rng.uniform(45, 140), 1),
+            round(rng.uniform(150, 200), 1),
+            rng.randint(14, 80),
+            rng.choice(["male", "female"]),
+            rng.choice(activities),
+            rng.choice(nutrition.GOALS)
+        )
+
+
+def bench(func, repeat: int = 3) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--profiles", type=int, default=100_000)
+    args = parser.parse_args()
+
+    rows = list(random_rows(args.profiles))
+    columns = nutrition.ProfileColumns()
+    for row in rows:
+        columns.append(*row)
+    uncached = nutrition.calculate.__wrapped__
+
+    results = {
+        "scalar": bench(lambda: [uncached(*row) for row in rows]),
+        "scalar_cached": bench(lambda: [nutrition.calculate(*row) for row in rows]),
+        "batch_python": bench(lambda: nutrition.batch_calculate(columns, use_numpy=False)),
+    }
+    if nutrition.numpy_module() is not None:
+        results["batch_numpy"] = bench(lambda: nutrition.batch_calculate(columns))
+
+    base = results["scalar"]
+    print(f"{args.profiles} ta profil")
+    for name, seconds in results.items():
+        per_profile = seconds / args.profiles * 1e9
+        print(f"{name:>14}: {seconds * 1000:8.1f} ms  {per_profile:7.0f} ns/profil  x{base / seconds:5.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+"""Chiquvchi xabarlar navbati (outbound.OutboundLimiter) benchmarki.
+
+Ishlatish:
+    python benchmarks/bench_outbound.py --broadcast 300 --interactive 40
+
+Soxta Bot API (fake_telegram.StubBotAPI) Telegram kabi flood limitlari
+bilan ishlaydi: soniyasiga `--flood-global` tadan va bitta chatga
+`--flood-chat` tadan ko'p xabar kelsa 429 (retry_after) qaytaradi.
+Bir vaqtning o'zida ommaviy eslatma (`--broadcast` ta chat, BULK) va
+foydalanuvchilarga javoblar (`--interactive` ta, har 0.1 s da bitta)
+yuboriladi. Ikki variant: limitersiz ExtBot (429 chaqiruvchiga
+qaytadi) va OutboundLimiter bilan.
+
+Natija (har bir variant uchun):
+    delivered/failed         - yetkazilgan va 429 bilan yo'qolgan xabarlar
+    http_429                 - stub qaytargan 429 javoblar
+    interactive_p50/p99_ms   - foydalanuvchi javobining kechikishi
+    broadcast_seconds        - ommaviy eslatma tugagan vaqt
+
+Oxirida uzun Markdown javobni streaming.split_message bilan bo'lish
+tekshiriladi (har bir qism chegarada va entity'lari yopiq).
+"""
+import os
+import sys
+import json
+import time
+import asyncio
+import logging
+import argparse
+from typing import Dict, List, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from telegram.error import RetryAfter  # noqa: E402
+from telegram.ext import ExtBot  # noqa: E402
+from telegram.request import HTTPXRequest  # noqa: E402
+
+# outbound fake_telegram'dan oldin: u stub uchun limitlarni o'chiradi, bu yerda esa haqiqiylari kerak
+from outbound import BULK, OutboundLimiter  # noqa: E402
+from fake_telegram import STUB_TOKEN, StubBotAPI, start_server  # noqa: E402
+from streaming import MAX_MESSAGE_LENGTH, markdown_safe_prefix, split_message  # noqa: E402
+
+FIRST_CHAT_ID = 10_000
+
+
+def percentile(values: List[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))] if ordered else 0.0
+
+
+async def run_variant(args: argparse.Namespace, port: int,
+                      limiter: Optional[OutboundLimiter]) -> Dict:
+    stub = StubBotAPI(flood_global=args.flood_global, flood_chat=args.flood_chat,
+                      retry_after=args.retry_after)
+    server, task = await start_server(stub, port)
+    bot = ExtBot(STUB_TOKEN, base_url=f"http://127.0.0.1:{port}/bot",
+                 request=HTTPXRequest(connection_pool_size=128), rate_limiter=limiter)
+    await bot.initialize()
+    kwargs = {"rate_limit_args": BULK} if limiter else {}
+    failed = 0
+    latencies: List[float] = []
+
+    async def send(chat_id: int, text: str, **extra) -> bool:
+        nonlocal failed
+        try:
+            await bot.send_message(chat_id=chat_id, text=text, **extra)
+            return True
+        except RetryAfter:
+            failed += 1
+            return False
+
+    async def broadcast() -> float:
+        started = time.perf_counter()
+        await asyncio.gather(*(send(FIRST_CHAT_ID + i, "☀️ Xayrli tong!", **kwargs)
+                               for i in range(args.broadcast)))
+        return time.perf_counter() - started
+
+    async def reply(index: int) -> None:
+        await asyncio.sleep(0.1 * index)
+        started = time.perf_counter()
+        if await send(index + 1, "🤖 javob"):
+            latencies.append(time.perf_counter() - started)
+
+    broadcast_task = asyncio.create_task(broadcast())
+    await asyncio.gather(*(reply(i) for i in range(args.interactive)))
+    broadcast_seconds = await broadcast_task
+
+    await bot.shutdown()
+    server.should_exit = True
+    await task
+    result = {
+        "delivered": stub.replies,
+        "failed": failed,
+        "http_429": stub.flooded,
+        "interactive_p50_ms": round(percentile(latencies, 0.5) * 1000, 1),
+        "interactive_p99_ms": round(percentile(latencies, 0.99) * 1000, 1),
+        "broadcast_seconds": round(broadcast_seconds, 2)
+    }
+    if limiter:
+        result["limiter"] = limiter.stats()
+    return result
+
+
+def check_split(length: int) -> Dict:
+    paragraph = "**Nonushta:** *tuxum*, non va `choy` - taxminan 350 kcal. _Maslahat:_ sekin yeng.\n\n"
+    text = paragraph * (length // len(paragraph) + 1)
+    started = time.perf_counter()
+    parts = split_message(text)
+    elapsed = time.perf_counter() - started
+    return {
+        "chars": len(text),
+        "parts": len(parts),
+        "max_part": max(len(part) for part in parts),
+        "within_limit": all(len(part) <= MAX_MESSAGE_LENGTH for part in parts),
+        "markdown_balanced": all(markdown_safe_prefix(part) == part for part in parts),
+        "split_ms": round(elapsed * 1000, 2)
+    }
+
+
+async def run(args: argparse.Namespace) -> Dict:
+    return {
+        "direct": await run_variant(args, args.port, None),
+        "outbound": await run_variant(args, args.port + 1, OutboundLimiter()),
+        "split": check_split(args.split_chars)
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--broadcast", type=int, default=300)
+    parser.add_argument("--interactive", type=int, default=40)
+    parser.add_argument("--flood-global", type=int, default=30)
+    parser.add_argument("--flood-chat", type=int, default=3)
+    parser.add_argument("--retry-after", type=int, default=1)
+    parser.add_argument("--split-chars", type=int, default=12000)
+    parser.add_argument("--port", type=int, default=8191)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.WARNING)
+    print(json.dumps(asyncio.run(run(args)), ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
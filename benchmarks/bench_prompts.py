@@ -0,0 +1,157 @@
+"""Prompt hajmi benchmarki: eski f-string promptlar va prompts.PromptRegistry.
+
+Ishlatish:
+    python benchmarks/bench_prompts.py
+
+Har bir so'rov turi uchun Gemini'ga yuboriladigan to'liq matn (tizim
+prompti + kontekst + savol) eski usulda va yangi shablonlar bilan
+yig'iladi. Tokenlar prompts.estimate_tokens bilan taxminlanadi.
+
+Natija (so'rov turi bo'yicha):
+    before/after_tokens - bitta so'rovning kirish tokenlari
+    saved_pct           - tejalgan ulush
+    render_us           - bitta promptni yig'ish vaqti
+"""
+import os
+import sys
+import json
+import time
+from typing import Callable, Dict
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("PROFILE_STORE", "memory")
+
+import bot_gemini  # noqa: E402
+from prompts import PromptRegistry, estimate_tokens  # noqa: E402
+
+# Eski build_gemini_prompt'dagi matn aynan shu edi (chekinishlar bilan)
+LEGACY_SYSTEM = bot_gemini.SYSTEM_PROMPT
+
+
+def legacy_build(prompt: str, context: str = "") -> str:
+    if context:
+        return f"{LEGACY_SYSTEM}\n\nKontekst: {context}\n\nSavol: {prompt}"
+    return f"{LEGACY_SYSTEM}\n\nSavol: {prompt}"
+
+
+def legacy_meal_plan(profile) -> str:
+    result = profile.nutrition()
+    return f"""
+    Foydalanuvchi ma'lumotlari:
+    - Vazni: {profile.weight} kg
+    - Bo'yi: {profile.height} cm
+    - BMI: {result.bmi}
+    - Kunlik kaloriya: {result.calories} kcal
+    - Makrolar: oqsil {result.protein_g} g, uglevod {result.carbs_g} g, yog' {result.fat_g} g
+    - Maqsad: {profile.goal or 'maintain'}
+
+    Iltimos, bir kunlik ovqatlanish rejasi tuzing:
+    1. Nonushta (kaloriya va tarkib)
+    2. Tushlik (kaloriya va tarkib)
+    3. Kechki ovqat (kaloriya va tarkib)
+    4. Snacklar (2 ta)
+
+    O'zbek milliy taomlarini ham qo'shing. Qisqa va aniq javob bering.
+    """
+
+
+def legacy_stress(scores, avg_stress) -> str:
+    return f"""
+            Stress baholari:
+            - Charchoq: {scores[0]}/10
+            - Uyqu: {scores[1]}/10
+            - Ish yuki: {scores[2]}/10
+            O'rtacha: {avg_stress:.1f}/10
+
+            Qisqa tahlil va 3 ta maslahat bering.
+            """
+
+
+def legacy_weekly(total, done, rate, stress_line) -> str:
+    return f"""
+    Haftalik statistika:
+    - Jami vazifalar: {total}
+    - Bajarilgan: {done}
+    - Bajarish: {rate:.1f}%
+    - Kuniga bajarilgan (7 kun): {1.4:.1f}, trend {0.1:+.2f}/kun
+    - Kuniga bajarilgan (30 kun): {1.2:.1f}, trend {0.05:+.2f}/kun
+    - Stress (7 kun): {stress_line}
+    - Stress (30 kun): {5.5:.1f}/10, {12} ta o'lchov
+    - Ovqat rejalari (7 kun): {3}
+
+    Qisqa tahlil va keyingi haftaga 3 ta maslahat bering.
+    """
+
+
+def legacy_chat_context(cohort) -> str:
+    return f"""
+        Foydalanuvchi: BMI toifasi {cohort[1]}
+        Maqsad: {cohort[0]}
+        """
+
+
+def timeit(fn: Callable[[], str], repeat: int = 20000) -> float:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - started) / repeat * 1e6
+
+
+def main() -> None:
+    profile = bot_gemini.UserProfile(1)
+    profile.weight, profile.height, profile.age = 75.0, 180.0, 30
+    profile.gender, profile.activity_level, profile.goal = "male", "moderate", "lose"
+    registry = bot_gemini.prompt_registry
+    registry_in_model = PromptRegistry(bot_gemini.SYSTEM_PROMPT, system_in_model=True)
+    stress_line = "6.0/10 (min 5.0, max 7.0, ↘️ kamaymoqda)"
+    cohort = (profile.goal, bot_gemini.bmi_band(profile.calculate_bmi()))
+    question = "Kechqurun nima yesam vazn tashlashga yordam beradi?"
+
+    cases: Dict[str, tuple] = {
+        "meal_plan": (
+            lambda: legacy_build(legacy_meal_plan(profile)),
+            lambda reg: reg.build(bot_gemini.meal_plan_prompt(profile))
+        ),
+        "weekly_stats": (
+            lambda: legacy_build(legacy_weekly(14, 9, 64.3, stress_line)),
+            lambda reg: reg.build(registry.render(
+                "weekly_stats", total_tasks=14, completed_tasks=9, completion_rate=64.3,
+                done_week_mean=1.4, done_week_trend=0.1, done_month_mean=1.2,
+                done_month_trend=0.05, stress_line=stress_line, stress_month_mean=5.5,
+                stress_month_count=12, meals_week=3))
+        ),
+        "stress_check": (
+            lambda: legacy_build(legacy_stress([5, 7, 6], 6.0)),
+            lambda reg: reg.build(registry.render("stress_check", fatigue=5, sleep=7,
+                                                  workload=6, avg_stress=6.0))
+        ),
+        "ai_chat": (
+            lambda: legacy_build(question, legacy_chat_context(cohort)),
+            lambda reg: reg.build(question, registry.render(
+                "chat_cohort", bmi_band=cohort[1], goal=cohort[0]))
+        ),
+    }
+
+    results = {}
+    for name, (legacy, current) in cases.items():
+        before = estimate_tokens(legacy())
+        after = registry.request_tokens(current(registry))
+        in_model = registry_in_model.request_tokens(current(registry_in_model))
+        results[name] = {
+            "before_tokens": before,
+            "after_tokens": after,
+            "saved_pct": round((1 - after / before) * 100, 1),
+            # system_instruction bilan: tizim prompti so'rov matnida emas, lekin API uni baribir hisoblaydi
+            "user_text_tokens_with_system_instruction": in_model - registry_in_model.system_tokens,
+            "render_us_before": round(timeit(legacy), 2),
+            "render_us_after": round(timeit(lambda: current(registry)), 2)
+        }
+    print(json.dumps({
+        "system_in_model": bot_gemini.SYSTEM_IN_MODEL,
+        "system_tokens": {"before": estimate_tokens(LEGACY_SYSTEM), "after": registry.system_tokens},
+        "requests": results
+    }, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""Gemini klientining chidamliligi benchmarki (resilience.ResilientClient).
+
+Ishlatish:
+    python benchmarks/bench_resilience.py --requests 400 --concurrency 8
+
+Gemini o'rniga fake_gemini.FakeGenerativeModel ishlatiladi, chaqiriqlar
+botdagidek GeminiExecutor thread pool'i orqali o'tadi. Uchta ssenariy:
+
+    retries - so'rovlarning `--error-rate` qismi 503 qaytaradi; qayta
+              urinishsiz va qayta urinish bilan muvaffaqiyat ulushi
+    hedging - so'rovlarning `--tail-rate` qismi `--tail-factor` marta
+              sekin; hedgingsiz va hedging bilan p50/p99 kechikish
+    outage  - Gemini butunlay ishlamayapti; circuit breaker ochilgach
+              so'rovlar qancha tez rad etiladi va modelga nechtasi yetadi
+
+Natija (har bir variant uchun):
+    success_rate      - muvaffaqiyatli javoblar ulushi
+    p50_ms, p99_ms    - kechikish (xato bilan tugaganlari ham)
+    model_calls       - modelga yetib borgan chaqiriqlar (kvota sarfi)
+"""
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+from typing import Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fake_gemini import FakeGenerativeModel  # noqa: E402
+from llm_executor import GeminiExecutor  # noqa: E402
+from resilience import CircuitBreaker, ResilientClient  # noqa: E402
+
+
+def percentile(values: List[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))] if ordered else 0.0
+
+
+async def drive(model: FakeGenerativeModel, client: ResilientClient,
+                requests: int, concurrency: int) -> Dict:
+    """`requests` ta so'rovni `concurrency` ta parallel foydalanuvchi bilan yuborish"""
+    executor = GeminiExecutor(max_concurrency=concurrency * 2, timeout=client.attempt_timeout)
+    latencies: List[float] = []
+    ok = 0
+    queue = iter(range(requests))
+
+    def generate(prompt: str) -> str:
+        return model.generate_content(prompt).text
+
+    async def user() -> None:
+        nonlocal ok
+        for i in queue:
+            prompt = f"savol {i}"
+            started = time.perf_counter()
+            try:
+                await client.call(lambda timeout: executor.run(generate, prompt, timeout=timeout))
+                ok += 1
+            except Exception:
+                pass
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(user() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    executor.shutdown()
+    stats = client.stats()
+    return {
+        "success_rate": round(ok / requests, 3),
+        "p50_ms": round(percentile(latencies, 0.5) * 1000, 1),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 1),
+        "seconds": round(elapsed, 2),
+        "model_calls": model.calls,
+        "retried": stats["retried"],
+        "hedged": stats["hedged"],
+        "hedge_wins": stats["hedge_wins"],
+        "rejected": stats["rejected"],
+        "circuit_opened": stats["circuit_opened"]
+    }
+
+
+def client(retries: int = 0, hedge: bool = False, failures: int = 10 ** 6,
+           reset: float = 30.0, hedge_budget: float = 0.1) -> ResilientClient:
+    return ResilientClient(deadline=10.0, attempt_timeout=5.0, retries=retries,
+                           backoff_base=0.05, backoff_max=0.5,
+                           breaker=CircuitBreaker(failures, reset), hedge=hedge,
+                           hedge_budget=hedge_budget, hedge_min_samples=50)
+
+
+async def run(args: argparse.Namespace) -> Dict:
+    latency = args.latency
+    results: Dict[str, Dict] = {}
+
+    def flaky() -> FakeGenerativeModel:
+        return FakeGenerativeModel(latency=latency, error_rate=args.error_rate, seed=1)
+
+    results["retries"] = {
+        "off": await drive(flaky(), client(retries=0), args.requests, args.concurrency),
+        "on": await drive(flaky(), client(retries=2), args.requests, args.concurrency)
+    }
+
+    def slow_tail() -> FakeGenerativeModel:
+        return FakeGenerativeModel(latency=latency, tail_rate=args.tail_rate,
+                                   tail_factor=args.tail_factor, seed=2)
+
+    results["hedging"] = {
+        "off": await drive(slow_tail(), client(), args.requests, args.concurrency),
+        "on": await drive(slow_tail(), client(hedge=True), args.requests, args.concurrency)
+    }
+
+    def down() -> FakeGenerativeModel:
+        return FakeGenerativeModel(latency=latency, error_rate=1.0, seed=3)
+
+    results["outage"] = {
+        "no_breaker": await drive(down(), client(retries=2), args.requests, args.concurrency),
+        "breaker": await drive(down(), client(retries=2, failures=5), args.requests, args.concurrency)
+    }
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--latency", type=float, default=0.05, help="soxta model kechikishi (s)")
+    parser.add_argument("--error-rate", type=float, default=0.2)
+    parser.add_argument("--tail-rate", type=float, default=0.05)
+    parser.add_argument("--tail-factor", type=float, default=20.0)
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(run(args)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
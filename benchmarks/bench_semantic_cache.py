@@ -0,0 +1,108 @@
+"""Erkin savollar semantik keshi: hit rate, noto'g'ri hitlar va tejalgan vaqt.
+
+Ishlatish:
+    python benchmarks/bench_semantic_cache.py --questions 20000 --llm-latency 2.5
+
+Savollar bir necha mavzu guruhidan (har birida bir xil ma'noli turli
+yozilishlar, lotin va kirill) Zipf taqsimoti bilan tanlanadi.
+Foydalanuvchilar kohortalarga (maqsad + BMI oralig'i) bo'lingan.
+Boshqa mavzudagi javob qaytsa "noto'g'ri hit" hisoblanadi.
+
+Oxirida bir xil mavzudagi, lekin savol so'zi boshqa juftliklar
+("qancha" / "qachon" / "nega") tekshiriladi: ular bir-birining javobini
+olmasligi kerak, aks holda skript 1 kodi bilan tugaydi.
+"""
+import os
+import sys
+import time
+import random
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from semantic_cache import SemanticCache  # noqa: E402
+
+TOPICS = {
+    "ozish": ["Qanday ozish mumkin?", "Ozish uchun nima qilish kerak?", "Қандай озиш мумкин?",
+              "qanday qilib ozsam bo'ladi", "Tez ozish uchun nima qilay?"],
+    "semirish": ["Qanday semirish mumkin?", "Vazn olish uchun nima qilish kerak?",
+                 "Семириш учун нима қилиш керак?"],
+    "suv": ["Kuniga qancha suv ichish kerak?", "kuniga necha litr suv ichish kerak",
+            "Кунига қанча сув ичиш керак?"],
+    "uyqu": ["Qanday qilib yaxshi uxlash mumkin?", "Uyqum yomon, nima qilay?",
+             "Yaxshi uxlash uchun maslahat bering"],
+    "kaloriya": ["Kuniga qancha kaloriya kerak?", "Kunlik kaloriya me'yori qancha?"],
+    "oqsil": ["Kuniga qancha oqsil kerak?", "Oqsil me'yori qancha?"],
+    "stress": ["Stressdan qanday qutulish mumkin?", "Stressni kamaytirish yo'llari",
+               "Стрессдан қандай қутулиш мумкин?"],
+    "yugurish": ["Ertalab yugurish foydalimi?", "Ertalabki yugurishning foydasi nima?"],
+}
+# (keshlangan savol, boshqa savol) - bir-biriga hit bo'lmasligi kerak
+INTENT_PAIRS = [
+    ("Kuniga qancha suv ichish kerak?", "Kuniga qachon suv ichish kerak?"),
+    ("Kuniga qancha suv ichish kerak?", "Kuniga nega suv ichish kerak?"),
+    ("Ozish uchun nima yeyish kerak?", "Nega ozish uchun yeyish kerak?"),
+    ("Qanday qilib yaxshi uxlash mumkin?", "Qachon uxlash kerak?"),
+    ("Qaysi mevalar foydali?", "Nega mevalar foydali?"),
+]
+COHORTS = [(goal, band) for goal in ("lose_weight", "maintain", "gain_muscle")
+           for band in ("normal", "over", "obese")]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--questions", type=int, default=20_000)
+    parser.add_argument("--llm-latency", type=float, default=2.5,
+                        help="Gemini javobi o'rtacha vaqti (tejalgan vaqt hisobi uchun)")
+    parser.add_argument("--threshold", type=float, default=None)
+    args = parser.parse_args()
+
+    rng = random.Random(3)
+    topics = list(TOPICS)
+    weights = [1 / (i + 1) for i in range(len(topics))]
+    cache = SemanticCache() if args.threshold is None else SemanticCache(threshold=args.threshold)
+    answers = {}
+    false_hits = 0
+    exact = set()
+
+    started = time.perf_counter()
+    for _ in range(args.questions):
+        topic = rng.choices(topics, weights)[0]
+        question = rng.choice(TOPICS[topic])
+        cohort = rng.choice(COHORTS)
+        exact.add((cohort, question))
+        hit = cache.lookup(cohort, question)
+        if hit:
+            if answers[hit.text] != topic:
+                false_hits += 1
+            continue
+        text = f"{topic}-{len(answers)}"
+        answers[text] = topic
+        cache.put(cohort, question, text, latency=args.llm_latency)
+    elapsed = time.perf_counter() - started
+
+    stats = cache.stats()
+    print(f"{args.questions} ta savol, {len(COHORTS)} ta kohorta, threshold {cache.threshold}")
+    print(f"  hit rate       : {stats['hit_rate']:.1%}")
+    print(f"  noto'g'ri hit  : {false_hits} ({false_hits / max(1, stats['hits']):.2%})")
+    print(f"  Gemini so'rovi : {stats['misses']} (keshsiz: {args.questions}, "
+          f"aniq moslik keshi: {len(exact)})")
+    print(f"  tejalgan vaqt  : {stats['saved_seconds'] / 3600:.1f} soat")
+    print(f"  qidiruv        : {stats['avg_lookup_ms']:.3f} ms/savol, jami {elapsed:.2f} s")
+
+    collisions = 0
+    for cached, other in INTENT_PAIRS:
+        pair_cache = SemanticCache(threshold=cache.threshold)
+        pair_cache.put(COHORTS[0], cached, cached)
+        hit = pair_cache.lookup(COHORTS[0], other)
+        if hit:
+            collisions += 1
+            print(f"  TO'QNASHUV     : {other!r} -> {cached!r} ({hit.similarity:.2f})")
+    print(f"  savol so'zi    : {collisions}/{len(INTENT_PAIRS)} juftlik to'qnashdi")
+    if collisions:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
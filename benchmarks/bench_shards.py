@@ -0,0 +1,120 @@
+"""Shardlangan (ko'p jarayonli) rejimning o'tkazuvchanlik benchmarki.
+
+Ishlatish:
+    python benchmarks/bench_shards.py --users 2000 --shards 1 2 4
+
+Soxta Bot API (fake_telegram.StubBotAPI) shu jarayonda ishlaydi,
+sharding.ShardRouter esa N ta worker jarayonni ishga tushiradi va
+update'larni user_id bo'yicha ularga tarqatadi. Workerlar javoblarni
+stub'ga HTTP orqali yuboradi, Gemini o'rniga fake_gemini ishlatiladi.
+Ssenariy LLM chaqirmaydi (faqat handlerlar),
+shuning uchun natija CPU'ga bog'liq qismni ko'rsatadi: shardlar soni
+yadrolar sonidan oshsa o'sish to'xtaydi.
+
+Natija (har bir shard soni uchun):
+    updates_per_sec - barcha bosqichlar bo'yicha o'rtacha
+    speedup         - 1 shardga nisbatan
+"""
+import os
+import sys
+import json
+import time
+import asyncio
+import logging
+import argparse
+from typing import Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Workerlar `spawn` bilan yaratiladi va shu muhitni meros qiladi
+os.environ["PROFILE_STORE"] = "memory"
+
+from fake_telegram import (  # noqa: E402
+    STUB_TOKEN, StubBotAPI, make_callback_update, make_message_update, start_server
+)
+from fake_gemini import FakeGenerativeModel  # noqa: E402
+
+# Har bir qadam bitta javob xabarini beradi
+SCRIPT = [
+    ("msg", "/start"),
+    ("msg", "📋 Kunlik rejalashtirish"),
+    ("cb", "add_task"),
+    ("msg", "Ertalab yugurish"),
+    ("cb", "view_tasks"),
+]
+
+FIRST_USER_ID = 100_000
+
+
+def fake_worker(*args) -> None:
+    """Worker jarayon, lekin Gemini o'rniga soxta model bilan"""
+    import bot_gemini
+    from sharding import worker_main
+
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    bot_gemini.gemini_model = FakeGenerativeModel(latency=0.0)
+    worker_main(*args)
+
+
+async def run_shards(shards: int, users: int, port: int, phase_timeout: float = 300) -> Dict:
+    from sharding import ShardRouter
+
+    stub = StubBotAPI()
+    stub_server, stub_task = await start_server(stub, port)
+    router = ShardRouter(shards, STUB_TOKEN, base_url=f"http://127.0.0.1:{port}",
+                         worker=fake_worker)
+    loop = asyncio.get_running_loop()
+    router.start()
+    try:
+        if not await loop.run_in_executor(None, router.wait_ready, 120):
+            raise RuntimeError("shardlar ishga tushmadi")
+
+        started = time.perf_counter()
+        update_id = 1
+        for kind, value in SCRIPT:
+            for n in range(users):
+                user_id = FIRST_USER_ID + n
+                if kind == "msg":
+                    router.route(make_message_update(update_id, user_id, value))
+                else:
+                    router.route(make_callback_update(update_id, user_id, value))
+                update_id += 1
+            await stub.wait_replies(update_id - 1, phase_timeout)
+        elapsed = time.perf_counter() - started
+        routed = dict(router.routed)
+    finally:
+        await loop.run_in_executor(None, router.stop)
+        stub_server.should_exit = True
+        await stub_task
+
+    updates = users * len(SCRIPT)
+    return {
+        "shards": shards,
+        "updates": updates,
+        "seconds": round(elapsed, 2),
+        "updates_per_sec": round(updates / elapsed, 1),
+        "routed": routed,
+        "api_calls": dict(stub.calls)
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--shards", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--port", type=int, default=8484)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    results: List[Dict] = []
+    for shards in args.shards:
+        result = asyncio.run(run_shards(shards, args.users, args.port))
+        result["speedup"] = round(result["updates_per_sec"] / results[0]["updates_per_sec"], 2) \
+            if results else 1.0
+        results.append(result)
+    print(json.dumps({"cpu_count": os.cpu_count(), "users": args.users, "runs": results},
+                     ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
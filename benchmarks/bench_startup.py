@@ -0,0 +1,168 @@
+"""Sovuq start: import vaqti va uyg'otgan update'larga birinchi javob.
+
+Ishlatish:
+    python benchmarks/bench_startup.py --runs 3
+    python benchmarks/bench_startup.py --importtime-only
+
+Avval `python -X importtime -c "import bot_gemini"` natijasidan eng
+og'ir to'g'ridan-to'g'ri importlar chiqariladi. Keyin har bir rejimda
+bot yangi jarayonda ishga tushiriladi (Render'dagi uyqudan keyingi
+start kabi). Soxta Bot API (fake_telegram.StubBotAPI) shu jarayonda;
+jarayon ishga tushishidan oldin navbatga /start qo'yiladi, javobdan
+keyin "Profil sozlash" va jins tugmasi yuboriladi - ular AI'ni
+ishlatmaydi.
+
+    eager - eski usul: google.generativeai import qilinib, model
+            bot_gemini'dan oldin yaratiladi
+    lazy  - SDK fonda, polling boshlangach (GEMINI_WARMUP_DELAY)
+
+Natija (jarayon ishga tushgandan boshlab, ms):
+    import_ms       - bot_gemini importi (eager'da SDK bilan)
+    first_reply_ms  - birinchi javob xabari stub'ga yetgan vaqt
+    wizard_ms       - uchala javob (profil ustasi savoli bilan)
+    ai_ready_ms     - Gemini modeli tayyor bo'lgan vaqt
+"""
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import tempfile
+import subprocess
+from typing import Dict, List
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import ui  # noqa: E402
+
+SCRIPT = [("msg", "/start"), ("msg", ui.MENU_PROFILE), ("cb", "gender_male")]
+
+
+def import_report(top: int) -> Dict:
+    """-X importtime: bot_gemini ichidagi to'g'ridan-to'g'ri importlar (kumulyativ, ms)"""
+    env = dict(os.environ, PROFILE_STORE="memory")
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", "import bot_gemini"],
+                            cwd=ROOT, env=env, capture_output=True, text=True, check=True)
+    modules, total = [], 0.0
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if not cumulative.strip().isdigit():
+            continue
+        if name.strip() == "bot_gemini":
+            total = int(cumulative) / 1000
+        elif name.startswith("   ") and not name.startswith("    "):
+            modules.append((int(cumulative) / 1000, name.strip()))
+    modules.sort(reverse=True)
+    return {"bot_gemini_ms": round(total, 1),
+            "heaviest": {name: round(ms, 1) for ms, name in modules[:top]}}
+
+
+async def child(mode: str) -> None:
+    """Bot jarayoni: ishga tushib, model tayyor bo'lgach vaqtlarni chiqaradi"""
+    started = float(os.environ["BENCH_STARTED"])
+    if mode == "eager":
+        import google.generativeai as genai
+        genai.configure(api_key=os.getenv("GEMINI_API_KEY"))
+        model = genai.GenerativeModel(os.getenv("GEMINI_MODEL", "gemini-pro"))
+    import bot_gemini
+    imported = time.time()
+    if mode == "eager":
+        bot_gemini.gemini_model = model
+
+    application = bot_gemini.build_application()
+    await application.initialize()
+    await application.post_init(application)
+    await application.start()
+    await application.updater.start_polling(poll_interval=0, timeout=1)
+    loaded = getattr(bot_gemini.gemini_model, "loaded", True)
+    while not loaded:
+        await asyncio.sleep(0.01)
+        loaded = bot_gemini.gemini_model.loaded
+    ready = time.time() if mode == "lazy" else imported
+    print(json.dumps({"import_ms": (imported - started) * 1000, "ai_ready_ms": (ready - started) * 1000}),
+          flush=True)
+    # O'lchovchi hamma javoblarni olguncha ishlashda davom etish
+    await asyncio.to_thread(sys.stdin.read)
+    await application.updater.stop()
+    await application.stop()
+    await application.post_shutdown(application)
+    await application.shutdown()
+
+
+async def run_once(mode: str, port: int) -> Dict:
+    # Bot jarayoni bularni import qilmaydi - faqat o'lchovchi tomonda
+    from fake_telegram import (
+        STUB_TOKEN, StubBotAPI, make_callback_update, make_message_update, start_server
+    )
+
+    stub = StubBotAPI()
+    server, task = await start_server(stub, port)
+    updates = [(make_message_update if kind == "msg" else make_callback_update)(update_id, 5, value)
+               for update_id, (kind, value) in enumerate(SCRIPT, 1)]
+    # Botni uyg'otgan birinchi update navbatda kutib turadi
+    stub.feed(updates[:1])
+
+    with tempfile.TemporaryDirectory() as workdir:
+        started = time.time()
+        perf_started = time.perf_counter()
+        env = dict(os.environ, BENCH_STARTED=repr(started), PROFILE_STORE="memory",
+                   TELEGRAM_BOT_TOKEN=STUB_TOKEN, TELEGRAM_API_URL=f"http://127.0.0.1:{port}",
+                   GEMINI_WARMUP="1" if mode == "lazy" else "0")
+        process = await asyncio.create_subprocess_exec(
+            sys.executable, os.path.abspath(__file__), "--child", mode,
+            cwd=workdir, env=env, stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL
+        )
+        await stub.wait_replies(1, timeout=60)
+        # Keyingilari foydalanuvchidek - oldingi javobdan keyin
+        for count, update in enumerate(updates[1:], 2):
+            stub.feed([update])
+            await stub.wait_replies(count)
+        output, _ = await process.communicate(b"")
+
+    server.should_exit = True
+    await task
+    result = json.loads(output.decode().strip().splitlines()[-1])
+    result["first_reply_ms"] = (stub.reply_times[0] - perf_started) * 1000
+    result["wizard_ms"] = (stub.reply_times[-1] - perf_started) * 1000
+    return result
+
+
+def median(values: List[float]) -> float:
+    ordered = sorted(values)
+    return round(ordered[len(ordered) // 2], 1)
+
+
+async def run(args: argparse.Namespace) -> Dict:
+    results = {}
+    for mode in ("eager", "lazy"):
+        runs = [await run_once(mode, args.port) for _ in range(args.runs)]
+        results[mode] = {key: median([run[key] for run in runs]) for key in runs[0]}
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--port", type=int, default=8195)
+    parser.add_argument("--top", type=int, default=10, help="importtime hisobotidagi modullar soni")
+    parser.add_argument("--importtime-only", action="store_true")
+    parser.add_argument("--child", choices=("eager", "lazy"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        asyncio.run(child(args.child))
+        return
+    results = {"importtime": import_report(args.top)}
+    if not args.importtime_only:
+        results.update(asyncio.run(run(args)))
+    print(json.dumps(results, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,265 @@
+"""Menyu va inline tugma handlerlari: har update'dagi xotira ajratish va vaqt.
+
+Ishlatish:
+    python benchmarks/bench_ui.py --repeat 20000
+
+Eski handlerlar (har chaqiriqda klaviatura yig'ish + if/elif zanjiri)
+shu faylda nusxa sifatida turibdi va bot_gemini'dagi hozirgi handlerlar
+(ui.py'dagi tayyor klaviaturalar + dict bo'yicha yo'naltirish) bilan
+bir xil soxta update'lar ustida solishtiriladi. Telegram'ga so'rov
+yuborilmaydi: reply_text/edit_message_text hech narsa qilmaydi, shuning
+uchun faqat handlerning o'zi o'lchanadi.
+
+Natija (har bir yo'nalish uchun):
+    *_bytes - bitta update davomida eng ko'p band qilingan xotira (tracemalloc)
+    *_us    - bitta update vaqti
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import tracemalloc
+from datetime import datetime
+from types import SimpleNamespace
+from typing import Awaitable, Callable, Dict
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("PROFILE_STORE", "memory")
+
+from telegram import InlineKeyboardButton, InlineKeyboardMarkup, KeyboardButton, ReplyKeyboardMarkup  # noqa: E402
+
+import bot_gemini  # noqa: E402
+from bot_gemini import (  # noqa: E402
+    MAIN_MENU, PROFILE_SETUP, STRESS_CHECK, TASK_INPUT, button_callback, handle_main_menu, start
+)
+
+Handler = Callable[..., Awaitable[int]]
+
+
+async def _noop(*args, **kwargs) -> None:
+    return None
+
+
+def make_update(text: str = None, data: str = None) -> SimpleNamespace:
+    return SimpleNamespace(
+        effective_user=SimpleNamespace(id=1, first_name="Ali"),
+        message=SimpleNamespace(text=text, reply_text=_noop),
+        callback_query=SimpleNamespace(data=data, answer=_noop, edit_message_text=_noop)
+    )
+
+
+CONTEXT = SimpleNamespace(bot=SimpleNamespace(send_message=_noop))
+
+
+# --- O'zgarishdan oldingi handlerlar (faqat o'lchanadigan yo'nalishlar) ---
+
+def legacy_main_keyboard() -> ReplyKeyboardMarkup:
+    keyboard = [
+        [KeyboardButton("📋 Kunlik rejalashtirish")],
+        [KeyboardButton("🍎 Ovqatlanish rejasi"), KeyboardButton("📊 Haftalik natijalar")],
+        [KeyboardButton("😌 Stress va dam olish"), KeyboardButton("👤 Profil sozlash")],
+        [KeyboardButton("💬 AI bilan suhbat")]
+    ]
+    return ReplyKeyboardMarkup(keyboard, resize_keyboard=True)
+
+
+async def legacy_start(update, context) -> int:
+    reply_markup = legacy_main_keyboard()
+    welcome_text = f"""
+🤖 Assalomu alaykum, {update.effective_user.first_name}!
+
+Men sizning shaxsiy AI yordamchingizman (Google Gemini 🆓)
+
+✅ Kunlik vazifalarni rejalashtirish
+✅ Vazndan kelib chiqib ovqatlanish rejasi
+✅ Stress va dam olishni boshqarish
+✅ Haftalik natijalarni monitoring
+✅ AI bilan 24/7 maslahat (BEPUL!)
+
+Boshlash uchun pastdagi tugmalardan birini tanlang! 👇
+"""
+    await update.message.reply_text(welcome_text, reply_markup=reply_markup)
+    return MAIN_MENU
+
+
+async def legacy_show_daily_tasks(update, context) -> int:
+    keyboard = [
+        [InlineKeyboardButton("➕ Yangi vazifa qo'shish", callback_data="add_task")],
+        [InlineKeyboardButton("✅ Vazifalarni ko'rish", callback_data="view_tasks")],
+        [InlineKeyboardButton("🤖 AI bilan rejalashtirish", callback_data="ai_plan_tasks")],
+        [InlineKeyboardButton("« Orqaga", callback_data="back_main")]
+    ]
+    reply_markup = InlineKeyboardMarkup(keyboard)
+    profile = bot_gemini.user_data_storage.get(update.effective_user.id)
+    today = datetime.now().strftime("%d-%m-%Y")
+    total, completed = profile.tasks.day_counts() if profile else (0, 0)
+    text = f"""
+📋 **Kunlik rejalashtirish**
+📅 Sana: {today}
+
+✅ Bajarilgan: {completed}/{total}
+⏳ Qolgan: {total - completed}
+
+Nima qilmoqchisiz?
+"""
+    await update.message.reply_text(text, reply_markup=reply_markup, parse_mode='Markdown')
+    return MAIN_MENU
+
+
+async def legacy_stress_management(update, context) -> int:
+    keyboard = [
+        [InlineKeyboardButton("😓 Stress tekshirish", callback_data="check_stress")],
+        [InlineKeyboardButton("🧘 Meditatsiya", callback_data="meditation")],
+        [InlineKeyboardButton("⏰ Dam olish rejasi", callback_data="plan_rest")],
+        [InlineKeyboardButton("💤 Uyqu rejasi", callback_data="sleep_schedule")],
+        [InlineKeyboardButton("« Orqaga", callback_data="back_main")]
+    ]
+    reply_markup = InlineKeyboardMarkup(keyboard)
+    text = """
+😌 **Stress va dam olish**
+
+Sog'lom turmush tarzi uchun stress boshqarish muhim!
+
+Quyidagilardan birini tanlang:
+"""
+    await update.message.reply_text(text, reply_markup=reply_markup, parse_mode='Markdown')
+    return MAIN_MENU
+
+
+async def legacy_setup_profile(update, context) -> int:
+    keyboard = [
+        [InlineKeyboardButton("Erkak 👨", callback_data="gender_male")],
+        [InlineKeyboardButton("Ayol 👩", callback_data="gender_female")],
+    ]
+    reply_markup = InlineKeyboardMarkup(keyboard)
+    await update.message.reply_text(
+        "👤 **Profil sozlash**\n\nJinsingizni tanlang:",
+        reply_markup=reply_markup,
+        parse_mode='Markdown'
+    )
+    return PROFILE_SETUP
+
+
+async def legacy_handle_main_menu(update, context) -> int:
+    text = update.message.text
+    if text == "📋 Kunlik rejalashtirish":
+        return await legacy_show_daily_tasks(update, context)
+    elif text == "🍎 Ovqatlanish rejasi":
+        return MAIN_MENU
+    elif text == "📊 Haftalik natijalar":
+        return MAIN_MENU
+    elif text == "😌 Stress va dam olish":
+        return await legacy_stress_management(update, context)
+    elif text == "👤 Profil sozlash":
+        return await legacy_setup_profile(update, context)
+    elif text == "💬 AI bilan suhbat":
+        await update.message.reply_text(
+            "💬 Menga istalgan savol bering! Men Google Gemini AI yordamida sizga "
+            "sog'liq, ovqatlanish, produktivlik va stress boshqarish bo'yicha "
+            "maslahat beraman.\n\n"
+            "🆓 Bu xizmat 100% BEPUL!\n\n"
+            "Asosiy menyuga qaytish: /start"
+        )
+        return MAIN_MENU
+    return MAIN_MENU
+
+
+async def legacy_button_callback(update, context) -> int:
+    query = update.callback_query
+    await query.answer()
+    user_id = update.effective_user.id
+    bot_gemini.user_data_storage.get(user_id)
+
+    if query.data == "back_main":
+        reply_markup = legacy_main_keyboard()
+        await query.edit_message_text("Asosiy menyu:")
+        await context.bot.send_message(chat_id=user_id, text="👇", reply_markup=reply_markup)
+        return MAIN_MENU
+    elif query.data == "add_task":
+        await query.edit_message_text(
+            "✍️ Yangi vazifangizni yozing:\n\n"
+            "Masalan: 'Ertalab yugurish', 'Hisobot tayyorlash'"
+        )
+        return TASK_INPUT
+    elif query.data == "view_tasks" or query.data.startswith("task_done:"):
+        return MAIN_MENU
+    elif query.data == "ai_plan_tasks":
+        return MAIN_MENU
+    elif query.data == "check_stress":
+        await query.edit_message_text(
+            "😌 **Stress tekshirish**\n\n"
+            "Quyidagi savollarga 1-10 baho bering:\n"
+            "1️⃣ Charchoq darajasi?\n"
+            "2️⃣ Uyqu sifati?\n"
+            "3️⃣ Ish yuki?\n\n"
+            "Javob: 5,7,6 formatda yozing"
+        )
+        return STRESS_CHECK
+    return MAIN_MENU
+
+
+def call(handler: Handler, update) -> int:
+    """Soxta update'da handler hech qachon kutmaydi - event loop'siz bajarish"""
+    coroutine = handler(update, CONTEXT)
+    try:
+        coroutine.send(None)
+    except StopIteration as stop:
+        return stop.value
+    raise RuntimeError("handler kutib qoldi")
+
+
+def measure(handler: Handler, update, repeat: int) -> Dict[str, float]:
+    call(handler, update)
+    tracemalloc.start()
+    peaks = []
+    for _ in range(200):
+        before, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        call(handler, update)
+        _, peak = tracemalloc.get_traced_memory()
+        peaks.append(peak - before)
+    tracemalloc.stop()
+
+    started = time.perf_counter()
+    for _ in range(repeat):
+        call(handler, update)
+    return {"bytes": sorted(peaks)[len(peaks) // 2],
+            "us": (time.perf_counter() - started) / repeat * 1e6}
+
+
+ROUTES = {
+    "/start": (legacy_start, start, make_update(text="/start")),
+    "menu:daily": (legacy_handle_main_menu, handle_main_menu, make_update(text="📋 Kunlik rejalashtirish")),
+    "menu:stress": (legacy_handle_main_menu, handle_main_menu, make_update(text="😌 Stress va dam olish")),
+    "menu:profile": (legacy_handle_main_menu, handle_main_menu, make_update(text="👤 Profil sozlash")),
+    "menu:ai_chat": (legacy_handle_main_menu, handle_main_menu, make_update(text="💬 AI bilan suhbat")),
+    "cb:back_main": (legacy_button_callback, button_callback, make_update(data="back_main")),
+    "cb:add_task": (legacy_button_callback, button_callback, make_update(data="add_task")),
+    "cb:check_stress": (legacy_button_callback, button_callback, make_update(data="check_stress")),
+}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=20000)
+    args = parser.parse_args()
+
+    results = {}
+    for name, (legacy, current, update) in ROUTES.items():
+        if call(legacy, update) != call(current, update):
+            raise AssertionError(f"{name}: holatlar mos emas")
+        before = measure(legacy, update, args.repeat)
+        after = measure(current, update, args.repeat)
+        results[name] = {
+            "before_bytes": before["bytes"],
+            "after_bytes": after["bytes"],
+            "before_us": round(before["us"], 2),
+            "after_us": round(after["us"], 2)
+        }
+    print(json.dumps(results, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
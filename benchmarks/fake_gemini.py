@@ -0,0 +1,120 @@
+"""Oflayn benchmarklar uchun deterministik soxta Gemini modeli.
+
+`generate_content` haqiqiy klient kabi bloklaydi (thread pool'da ishlaydi),
+javob matni esa prompt hash'idan kelib chiqadi, shuning uchun bir xil
+prompt har doim bir xil javob beradi (JSON ovqatlanish rejasi so'ralsa -
+har chaqiriqda boshqa taomlar bilan JSON reja). Kechikish va xatolar esa har
+chaqiriqda alohida (`seed` bo'yicha takrorlanadigan) tanlanadi, shuning
+uchun qayta urinish boshqa natija berishi mumkin.
+"""
+import json
+import time
+import random
+import hashlib
+import threading
+from types import SimpleNamespace
+from typing import Iterator
+
+try:
+    from google.api_core.exceptions import ServiceUnavailable as FakeGeminiError
+except ImportError:
+    class FakeGeminiError(RuntimeError):
+        pass
+
+WORDS = [
+    "Sog'lom", "ovqatlanish", "uchun", "kuniga", "2", "litr", "suv", "iching,",
+    "sabzavot", "va", "oqsilni", "ko'paytiring.", "*Muhim:*", "uyqu", "7-8",
+    "soat", "bo'lsin.", "Har", "kuni", "30", "daqiqa", "yuring."
+]
+
+MEALS = {
+    "Nonushta": [("Tuxumli omlet va non", ["tuxum", "non", "pomidor"]),
+                 ("Suli bo'tqasi", ["suli", "sut", "olma"]),
+                 ("Tvorog va asal", ["tvorog", "asal", "yong'oq"])],
+    "Tushlik": [("Mastava", ["guruch", "mol go'shti", "sabzi", "kartoshka"]),
+                ("Osh (kichik porsiya)", ["guruch", "go'sht", "sabzi", "no'xat"]),
+                ("Lag'mon", ["xamir", "go'sht", "bulg'or qalampiri"])],
+    "Kechki ovqat": [("Tovuqli salat", ["tovuq", "bodring", "pomidor"]),
+                     ("Dimlama", ["go'sht", "karam", "kartoshka", "piyoz"]),
+                     ("Baliq va sabzavot", ["baliq", "brokkoli", "limon"])],
+    "Snack": [("Kefir", ["kefir"]), ("Olma va yong'oq", ["olma", "yong'oq"]),
+              ("Qatiq", ["qatiq"]), ("Quruq mevalar", ["o'rik", "mayiz"])]
+}
+MEAL_SHARES = (("Nonushta", 0.25), ("Tushlik", 0.35), ("Kechki ovqat", 0.25),
+               ("Snack", 0.075), ("Snack", 0.075))
+
+
+class FakeGenerativeModel:
+    """`genai.GenerativeModel` o'rnini bosuvchi model.
+
+    latency: birinchi javobgacha kechikish (soniya)
+    jitter: kechikishga qo'shiladigan tasodifiy ulush (0.2 = +-20%)
+    words: javobdagi so'zlar soni
+    chunks: stream rejimida bo'laklar soni
+    error_rate: xato (503) qaytaradigan so'rovlar ulushi
+    tail_rate, tail_factor: so'rovlarning shu ulushi `tail_factor` marta sekin
+    """
+
+    def __init__(self, latency: float = 0.5, jitter: float = 0.2, words: int = 80,
+                 chunks: int = 8, error_rate: float = 0.0, tail_rate: float = 0.0,
+                 tail_factor: float = 10.0, seed: int = 0):
+        self.latency = latency
+        self.jitter = jitter
+        self.words = words
+        self.chunks = max(1, chunks)
+        self.error_rate = error_rate
+        self.tail_rate = tail_rate
+        self.tail_factor = tail_factor
+        self.calls = 0
+        self._lock = threading.Lock()
+        self._random = random.Random(seed)
+
+    def _rng(self, prompt: str) -> random.Random:
+        seed = int.from_bytes(hashlib.blake2b(str(prompt).encode(), digest_size=8).digest(), "big")
+        return random.Random(seed)
+
+    def _answer(self, rng: random.Random) -> str:
+        return " ".join(rng.choice(WORDS) for _ in range(self.words))
+
+    def _plan(self, prompt: str, rng: random.Random) -> str:
+        """"kcal" so'ralgan promptga Gemini kabi ```json``` ichida reja"""
+        found = [int(word) for word in str(prompt).split() if word.isdigit()]
+        calories = max(found) if found else 2000
+        meals = []
+        for name, share in MEAL_SHARES:
+            dish, ingredients = rng.choice(MEALS[name])
+            meals.append({"name": name, "dish": dish, "kcal": int(calories * share),
+                          "ingredients": ingredients})
+        return "```json\n" + json.dumps({"meals": meals}, ensure_ascii=False, indent=1) + "\n```"
+
+    def _delay(self, rng: random.Random) -> float:
+        delay = max(0.0, self.latency * (1 + rng.uniform(-self.jitter, self.jitter)))
+        if rng.random() < self.tail_rate:
+            delay *= self.tail_factor
+        return delay
+
+    def generate_content(self, prompt, stream: bool = False, generation_config=None):
+        with self._lock:
+            self.calls += 1
+            failed = self._random.random() < self.error_rate
+            delay = self._delay(self._random)
+            plan_seed = self._random.random()
+        if failed:
+            time.sleep(delay)
+            raise FakeGeminiError("fake Gemini error")
+        if '"meals"' in str(prompt):
+            text = self._plan(prompt, random.Random(plan_seed))
+        else:
+            text = self._answer(self._rng(prompt))
+        if stream:
+            return self._stream(text, delay)
+        time.sleep(delay)
+        return SimpleNamespace(text=text)
+
+    def _stream(self, text: str, delay: float) -> Iterator[SimpleNamespace]:
+        step = max(1, len(text) // self.chunks)
+        # Birinchi bo'lak kechikishning yarmida, qolganlari teng taqsimlanadi
+        time.sleep(delay / 2)
+        for i in range(0, len(text), step):
+            yield SimpleNamespace(text=text[i:i + step])
+            time.sleep(delay / 2 / self.chunks)
@@ -0,0 +1,285 @@
+"""Lokal soxta Telegram Bot API va webhook/polling o'tkazuvchanlik benchmarki.
+
+Ishlatish:
+    python benchmarks/fake_telegram.py --mode webhook --users 500
+    python benchmarks/fake_telegram.py --mode polling --users 500
+
+Stub server, webhook server, bot va HTTP klient bitta event loop'da
+ishlaydi, shuning uchun natijalar rejimlarni solishtirish uchun, mutlaq
+o'tkazuvchanlik uchun emas.
+"""
+import os
+import sys
+import time
+import json
+import asyncio
+import argparse
+from collections import Counter, deque
+from typing import Dict, List, Optional
+from urllib.parse import parse_qsl
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("PROFILE_STORE", "memory")
+# Stub'ning o'zida limit yo'q - botning chiquvchi navbati o'lchovni cheklamasin
+for _name in ("OUTBOUND_GLOBAL_RATE", "OUTBOUND_GLOBAL_BURST", "OUTBOUND_CHAT_RATE", "OUTBOUND_CHAT_BURST"):
+    os.environ.setdefault(_name, "1000000")
+
+from webhook import read_body, respond  # noqa: E402
+
+STUB_TOKEN = "123456:STUB"
+BOT_USER = {"id": 123456, "is_bot": True, "first_name": "StubBot", "username": "stub_bot"}
+
+
+def make_message_update(update_id: int, user_id: int, text: str) -> Dict:
+    """Matnli xabar update'i (komandalar uchun entity bilan)"""
+    message = {
+        "message_id": update_id,
+        "date": int(time.time()),
+        "chat": {"id": user_id, "type": "private"},
+        "from": {"id": user_id, "is_bot": False, "first_name": f"User{user_id}"},
+        "text": text
+    }
+    if text.startswith("/"):
+        message["entities"] = [{"type": "bot_command", "offset": 0,
+                                "length": len(text.split()[0])}]
+    return {"update_id": update_id, "message": message}
+
+
+def make_callback_update(update_id: int, user_id: int, data: str,
+                         message_id: int = 1) -> Dict:
+    """Inline tugma bosilishi update'i"""
+    return {
+        "update_id": update_id,
+        "callback_query": {
+            "id": str(update_id),
+            "chat_instance": str(user_id),
+            "from": {"id": user_id, "is_bot": False, "first_name": f"User{user_id}"},
+            "data": data,
+            "message": {
+                "message_id": message_id,
+                "date": int(time.time()),
+                "chat": {"id": user_id, "type": "private"},
+                "from": BOT_USER,
+                "text": "..."
+            }
+        }
+    }
+
+
+class StubBotAPI:
+    """Bot API'ning minimal ASGI taqlidi.
+
+    sendMessage/editMessageText kabi metodlarga darhol javob beradi,
+    getUpdates esa `feed()` orqali qo'shilgan update'larni qaytaradi.
+    `flood_global`/`flood_chat` berilsa, Telegram kabi oxirgi bir soniyada
+    shundan ko'p xabar yuborilganda 429 (retry_after) qaytaradi.
+    """
+
+    REPLY_METHODS = {"sendMessage", "editMessageText", "sendDocument"}
+
+    def __init__(self, latency: float = 0.0, flood_global: Optional[int] = None,
+                 flood_chat: Optional[int] = None, retry_after: int = 1):
+        self.latency = latency
+        self.flood_global = flood_global
+        self.flood_chat = flood_chat
+        self.retry_after = retry_after
+        self.flooded = 0
+        self._sent: deque = deque()
+        self._chat_sent: Dict[int, deque] = {}
+        self.calls: Counter = Counter()
+        self.replies = 0
+        self.reply_times: List[float] = []
+        self.messages: Dict[int, List[str]] = {}
+        self._updates: List[Dict] = []
+        self._has_updates = asyncio.Event()
+        self._message_id = 0
+
+    def feed(self, updates: List[Dict]) -> None:
+        self._updates.extend(updates)
+        self._has_updates.set()
+
+    async def wait_replies(self, count: int, timeout: float = 120) -> None:
+        """Kamida `count` ta javob xabari kelguncha kutish"""
+        deadline = time.perf_counter() + timeout
+        while self.replies < count:
+            if time.perf_counter() > deadline:
+                raise TimeoutError(f"{self.replies}/{count} javob keldi")
+            await asyncio.sleep(0.005)
+
+    def _message(self, params: Dict) -> Dict:
+        self._message_id += 1
+        chat_id = int(params.get("chat_id", 0))
+        text = params.get("text", "")
+        self.messages.setdefault(chat_id, []).append(text)
+        return {
+            "message_id": int(params.get("message_id", self._message_id)),
+            "date": int(time.time()),
+            "chat": {"id": chat_id, "type": "private"},
+            "from": BOT_USER,
+            "text": text
+        }
+
+    def _flood(self, params: Dict) -> bool:
+        """Oxirgi soniyadagi xabarlar limitdan oshdimi (oshmasa - hisobga olinadi)"""
+        now = time.monotonic()
+        chat = self._chat_sent.setdefault(int(params.get("chat_id", 0)), deque())
+        for sent in (self._sent, chat):
+            while sent and now - sent[0] >= 1.0:
+                sent.popleft()
+        if ((self.flood_global is not None and len(self._sent) >= self.flood_global)
+                or (self.flood_chat is not None and len(chat) >= self.flood_chat)):
+            self.flooded += 1
+            return True
+        self._sent.append(now)
+        chat.append(now)
+        return False
+
+    async def _get_updates(self, params: Dict) -> List[Dict]:
+        offset = int(params.get("offset", 0) or 0)
+        if offset:
+            self._updates = [u for u in self._updates if u["update_id"] >= offset]
+        if not self._updates:
+            self._has_updates.clear()
+            try:
+                await asyncio.wait_for(self._has_updates.wait(),
+                                       float(params.get("timeout", 0) or 0) or 0.1)
+            except asyncio.TimeoutError:
+                return []
+        return self._updates[:int(params.get("limit", 100) or 100)]
+
+    async def __call__(self, scope: Dict, receive, send) -> None:
+        if scope["type"] != "http":
+            return
+        method = scope["path"].rsplit("/", 1)[-1]
+        # sendDocument multipart (ikkilik) tanasi bilan keladi
+        params = dict(parse_qsl((await read_body(receive)).decode(errors="replace")))
+        self.calls[method] += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+        if method == "getMe":
+            result = BOT_USER
+        elif method == "getUpdates":
+            result = await self._get_updates(params)
+        elif method in self.REPLY_METHODS and (self.flood_global or self.flood_chat) and self._flood(params):
+            body = json.dumps({
+                "ok": False, "error_code": 429,
+                "description": f"Too Many Requests: retry after {self.retry_after}",
+                "parameters": {"retry_after": self.retry_after}
+            }).encode()
+            await respond(send, 429, body, b"application/json")
+            return
+        elif method in self.REPLY_METHODS:
+            result = self._message(params)
+            self.replies += 1
+            self.reply_times.append(time.perf_counter())
+        else:
+            result = True
+        body = json.dumps({"ok": True, "result": result}).encode()
+        await respond(send, 200, body, b"application/json")
+
+
+async def start_server(app, port: int):
+    """ASGI ilovani fon vazifasida uvicorn bilan ishga tushirish"""
+    import uvicorn
+    server = uvicorn.Server(uvicorn.Config(
+        app, host="127.0.0.1", port=port, lifespan="off",
+        log_level="warning", access_log=False
+    ))
+    task = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.01)
+    return server, task
+
+
+def scenario(users: int, texts: List[str], first_id: int = 1) -> List[List[Dict]]:
+    """Har bir bosqichda barcha foydalanuvchilar bittadan xabar yuboradi"""
+    update_id = first_id
+    phases = []
+    for text in texts:
+        phase = []
+        for user_id in range(1, users + 1):
+            phase.append(make_message_update(update_id, 10_000 + user_id, text))
+            update_id += 1
+        phases.append(phase)
+    return phases
+
+
+async def run_benchmark(mode: str, users: int, stub_port: int = 8181,
+                        webhook_port: int = 8282) -> Dict:
+    import httpx
+    import bot_gemini
+    from webhook import WebhookApp
+
+    stub = StubBotAPI()
+    stub_server, stub_task = await start_server(stub, stub_port)
+    application = bot_gemini.build_application(
+        token=STUB_TOKEN, base_url=f"http://127.0.0.1:{stub_port}"
+    )
+    await application.initialize()
+    await application.start()
+
+    webhook_server = webhook_task = None
+    secret = "bench-secret"
+    if mode == "webhook":
+        webhook_server, webhook_task = await start_server(
+            WebhookApp(application, secret), webhook_port
+        )
+    else:
+        await application.updater.start_polling(poll_interval=0, timeout=1)
+
+    phases = scenario(users, ["/start", "📋 Kunlik rejalashtirish"])
+    total = sum(len(p) for p in phases)
+    started = time.perf_counter()
+    expected = 0
+    async with httpx.AsyncClient(limits=httpx.Limits(max_connections=64)) as client:
+        for phase in phases:
+            expected += len(phase)
+            if mode == "webhook":
+                url = f"http://127.0.0.1:{webhook_port}/telegram"
+                headers = {"X-Telegram-Bot-Api-Secret-Token": secret,
+                           "Content-Type": "application/json"}
+                semaphore = asyncio.Semaphore(64)
+
+                async def post(update: Dict) -> None:
+                    async with semaphore:
+                        await client.post(url, content=json.dumps(update), headers=headers)
+
+                await asyncio.gather(*(post(u) for u in phase))
+            else:
+                stub.feed(phase)
+            await stub.wait_replies(expected)
+    elapsed = time.perf_counter() - started
+
+    if mode == "polling":
+        await application.updater.stop()
+    await application.stop()
+    await application.shutdown()
+    for server, task in ((webhook_server, webhook_task), (stub_server, stub_task)):
+        if server:
+            server.should_exit = True
+            await task
+
+    return {
+        "mode": mode,
+        "users": users,
+        "updates": total,
+        "seconds": round(elapsed, 3),
+        "updates_per_sec": round(total / elapsed, 1),
+        "api_calls": dict(stub.calls)
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--mode", choices=["webhook", "polling", "both"], default="both")
+    parser.add_argument("--users", type=int, default=500)
+    args = parser.parse_args()
+
+    modes = ["polling", "webhook"] if args.mode == "both" else [args.mode]
+    for mode in modes:
+        print(json.dumps(asyncio.run(run_benchmark(mode, args.users)), ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+import os
+import time
+import asyncio
+import logging
+from collections import OrderedDict, deque
+from typing import Awaitable, Callable, Deque, Dict, List, Optional, Set
+
+from prompts import PROMPT_CHARS_PER_TOKEN, estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+# Suhbat xotirasi: oxirgi savol-javoblar shuncha tokendan va shuncha juftlikdan oshmaydi
+CHAT_MEMORY_TOKENS = int(os.getenv("CHAT_MEMORY_TOKENS", "600"))
+CHAT_MEMORY_TURNS = int(os.getenv("CHAT_MEMORY_TURNS", "6"))
+# Eski juftliklar xulosasi uchun token chegarasi
+CHAT_SUMMARY_TOKENS = int(os.getenv("CHAT_SUMMARY_TOKENS", "150"))
+# Shuncha soniya yozmagan foydalanuvchining xotirasi o'chiriladi
+CHAT_MEMORY_IDLE = float(os.getenv("CHAT_MEMORY_IDLE", "1800"))
+CHAT_MEMORY_MAX_USERS = int(os.getenv("CHAT_MEMORY_MAX_USERS", "5000"))
+
+# summarize(oldingi xulosa, yangi juftliklar matni) -> yangi xulosa
+Summarizer = Callable[[str, str], Awaitable[str]]
+
+
+def _clip(text: str, tokens: int, tail: bool = False) -> str:
+    """Matnni taxminan `tokens` tokenga qisqartirish (tail - oxirini qoldirish)"""
+    limit = int(tokens * PROMPT_CHARS_PER_TOKEN)
+    if len(text) <= limit:
+        return text
+    return "…" + text[-limit + 1:] if tail else text[:limit - 1] + "…"
+
+
+class Conversation:
+    """Bitta foydalanuvchining suhbat xotirasi"""
+    __slots__ = ('summary', 'turns', 'tokens', 'pending', 'last_seen', 'task')
+
+    def __init__(self):
+        self.summary = ""
+        # "Foydalanuvchi: ...\nAI: ..." matnlari, eskidan yangiga
+        self.turns: Deque[str] = deque()
+        self.tokens = 0
+        # Xotiradan chiqqan, hali xulosaga qo'shilmagan juftliklar
+        self.pending: List[str] = []
+        self.last_seen = time.monotonic()
+        self.task: Optional[asyncio.Task] = None
+
+
+class ChatMemory:
+    """Foydalanuvchilar bo'yicha chegaralangan suhbat xotirasi.
+
+    Promptga oxirgi juftliklar (`budget` token va `max_turns` tadan
+    ko'p emas) va undan oldingilarning xulosasi (`summary_tokens` gacha)
+    qo'shiladi, shuning uchun suhbat qancha uzun bo'lmasin prompt hajmi
+    o'zgarmaydi. Chegaradan chiqqan juftliklar fonda `summarize` bilan
+    xulosaga qo'shiladi; u ishlamasa xulosaga savollarning o'zi yoziladi.
+    `idle` soniya yozmagan foydalanuvchilar va `max_users` dan
+    oshganlarning eng eskisi xotiradan o'chiriladi.
+    """
+
+    def __init__(self, summarize: Summarizer, budget: int = CHAT_MEMORY_TOKENS,
+                 max_turns: int = CHAT_MEMORY_TURNS, summary_tokens: int = CHAT_SUMMARY_TOKENS,
+                 idle: float = CHAT_MEMORY_IDLE, max_users: int = CHAT_MEMORY_MAX_USERS):
+        self.summarize = summarize
+        self.budget = budget
+        self.max_turns = max(1, max_turns)
+        self.summary_tokens = summary_tokens
+        self.idle = idle
+        self.max_users = max(1, max_users)
+        # Oxirgi ishlatilgani oxirida: eskirganlar boshidan o'chiriladi
+        self._conversations: "OrderedDict[int, Conversation]" = OrderedDict()
+        self._tasks: Set[asyncio.Task] = set()
+
+        self.summaries = 0
+        self.summary_errors = 0
+        self.evicted = 0
+
+    def _evict(self, now: float) -> None:
+        while self._conversations:
+            user_id, conversation = next(iter(self._conversations.items()))
+            if now - conversation.last_seen < self.idle and len(self._conversations) <= self.max_users:
+                break
+            del self._conversations[user_id]
+            self.evicted += 1
+
+    def context(self, user_id: int) -> List[str]:
+        """prompt_registry.build() uchun bo'laklar: xulosa va oxirgi juftliklar (eskidan yangiga)"""
+        self._evict(time.monotonic())
+        conversation = self._conversations.get(user_id)
+        if conversation is None:
+            return []
+        parts = [f"Oldingi suhbat xulosasi: {conversation.summary}"] if conversation.summary else []
+        parts.extend(conversation.turns)
+        return parts
+
+    def add(self, user_id: int, question: str, answer: str) -> None:
+        """Savol-javobni yozish; chegaradan chiqqanlarni fonda xulosaga qo'shish"""
+        now = time.monotonic()
+        conversation = self._conversations.get(user_id)
+        if conversation is None:
+            conversation = self._conversations[user_id] = Conversation()
+        self._conversations.move_to_end(user_id)
+        conversation.last_seen = now
+        self._evict(now)
+
+        # Bitta uzun javob butun xotirani egallamasligi uchun
+        turn = _clip(f"Foydalanuvchi: {question}\nAI: {answer}", self.budget // 2)
+        conversation.turns.append(turn)
+        conversation.tokens += estimate_tokens(turn)
+        while len(conversation.turns) > 1 and (conversation.tokens > self.budget
+                                               or len(conversation.turns) > self.max_turns):
+            old = conversation.turns.popleft()
+            conversation.tokens -= estimate_tokens(old)
+            conversation.pending.append(old)
+
+        if conversation.pending and (conversation.task is None or conversation.task.done()):
+            conversation.task = asyncio.create_task(self._compact(user_id, conversation))
+            self._tasks.add(conversation.task)
+            conversation.task.add_done_callback(self._tasks.discard)
+
+    async def _compact(self, user_id: int, conversation: Conversation) -> None:
+        while conversation.pending:
+            batch, conversation.pending = conversation.pending, []
+            try:
+                summary = await self.summarize(conversation.summary, "\n\n".join(batch))
+                summary = _clip(" ".join(summary.split()), self.summary_tokens)
+                self.summaries += 1
+            except Exception as e:
+                # Gemini'siz: oldingi xulosa + savollar (eng yangilari qoladi)
+                self.summary_errors += 1
+                logger.info(f"Suhbat xulosasi olinmadi (user {user_id}): {e!r}")
+                questions = "; ".join(turn.split("\n", 1)[0][len("Foydalanuvchi: "):] for turn in batch)
+                summary = _clip(f"{conversation.summary} Savollar: {questions}".strip(),
+                                self.summary_tokens, tail=True)
+            conversation.summary = summary
+
+    def forget(self, user_id: int) -> None:
+        self._conversations.pop(user_id, None)
+
+    def stats(self) -> Dict[str, float]:
+        users = len(self._conversations)
+        tokens = sum(c.tokens + estimate_tokens(c.summary) for c in self._conversations.values())
+        return {
+            'users': users,
+            'avg_tokens': round(tokens / users, 1) if users else 0.0,
+            'summarizing': len(self._tasks),
+            'summaries': self.summaries,
+            'summary_errors': self.summary_errors,
+            'evicted': self.evicted
+        }
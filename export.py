@@ -0,0 +1,242 @@
+"""Profillar va tarixni analitika uchun eksport qilish (NDJSON yoki CSV, gzip).
+
+Ishlatish:
+    python export.py -o users.ndjson.gz --gzip
+    python export.py --format csv --kind stress --since 2024-05-01 -o stress.csv
+    python export.py --since 1714521600 > changes.ndjson
+
+Bot ishlab turganda ham ishlatish mumkin: SQLite alohida ulanish orqali
+o'qiladi (WAL), bot esa yozishda davom etadi.
+"""
+import io
+import csv
+import sys
+import json
+import zlib
+import argparse
+from datetime import date, datetime, timezone
+from typing import Any, BinaryIO, Dict, Iterable, Iterator, Optional, Sequence, Tuple
+
+from storage import StorageBackend, create_backend
+
+try:
+    import orjson
+
+    def json_dumps(obj: Any) -> bytes:
+        return orjson.dumps(obj)
+    json_loads = orjson.loads
+except ImportError:  # orjson o'rnatilmagan bo'lsa oddiy json
+    def json_dumps(obj: Any) -> bytes:
+        return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode()
+    json_loads = json.loads
+
+# Yozuv turlari va ularning ustunlari (CSV sarlavhasi ham shu tartibda)
+FIELDS: Dict[str, Tuple[str, ...]] = {
+    "profile": ("user_id", "updated_at", "weight", "height", "age", "gender",
+                "activity_level", "goal", "utc_offset", "reminders"),
+    "task": ("user_id", "date", "task_id", "title", "done"),
+    # Kunlik hisoblagichlar (arxivlangan kunlarda vazifa nomlari saqlanmaydi)
+    "task_day": ("user_id", "date", "total", "done"),
+    "stress": ("user_id", "ts", "value"),
+    "meal": ("user_id", "date", "plan_id", "kcal", "dishes"),
+}
+KINDS = tuple(FIELDS)
+FORMATS = ("ndjson", "csv")
+# Chiqishga shuncha baytdan keyin yoziladi (gzip ham shu bo'laklar bilan ishlaydi)
+CHUNK_BYTES = 64 * 1024
+
+Record = Tuple[str, Tuple]
+
+
+def parse_since(text: str) -> float:
+    """Unix vaqt ("1714521600") yoki ISO sana/vaqt ("2024-05-01", "2024-05-01T12:00"); UTC"""
+    try:
+        return float(text)
+    except ValueError:
+        pass
+    moment = datetime.fromisoformat(text)
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return moment.timestamp()
+
+
+def _day(ordinal: int) -> str:
+    return date.fromordinal(ordinal).isoformat()
+
+
+def profile_records(user_id: int, data: Dict, updated_at: float, kinds: Iterable[str],
+                    since: float = 0.0) -> Iterator[Record]:
+    """Bitta profil (UserProfile.to_dict) dan yozuvlar; `since` dan oldingi tarix tashlanadi"""
+    since_day = datetime.fromtimestamp(since, timezone.utc).toordinal() if since > 0 else 0
+    if "profile" in kinds:
+        yield "profile", (user_id, updated_at, data.get("weight"), data.get("height"), data.get("age"),
+                          data.get("gender"), data.get("activity_level"), data.get("goal"),
+                          data.get("utc_offset"), data.get("reminders", True))
+
+    tasks = data.get("tasks") or {}
+    days = tasks.get("days") or {}
+    if "task" in kinds:
+        for day, (first_id, titles, done_mask) in sorted(days.items(), key=lambda item: int(item[0])):
+            if int(day) < since_day:
+                continue
+            for pos, title in enumerate(titles):
+                yield "task", (user_id, _day(int(day)), first_id + pos, title, bool(done_mask >> pos & 1))
+    if "task_day" in kinds:
+        counts = {int(day): (len(titles), bin(done_mask).count("1"))
+                  for day, (_, titles, done_mask) in days.items()}
+        for day, (total, done) in (tasks.get("counts") or {}).items():
+            counts.setdefault(int(day), (total, done))
+        for day in sorted(counts):
+            if day >= since_day:
+                yield "task_day", (user_id, _day(day), *counts[day])
+
+    if "stress" in kinds:
+        for item in data.get("stress_levels") or ():
+            # Eski format: faqat qiymat (vaqti noma'lum - 0)
+            ts, value = item if isinstance(item, (list, tuple)) else (0.0, item)
+            if ts >= since:
+                yield "stress", (user_id, ts, value)
+
+    if "meal" in kinds:
+        for entry in data.get("meal_history") or ():
+            # [kun, reja id, kcal, [taomlar]]
+            if not isinstance(entry, (list, tuple)) or len(entry) < 4 or entry[0] < since_day:
+                continue
+            yield "meal", (user_id, _day(entry[0]), entry[1], entry[2], "; ".join(entry[3]))
+
+
+def iter_records(rows: Iterable[Tuple[int, str, float]], kinds: Sequence[str] = KINDS,
+                 since: float = 0.0) -> Iterator[Record]:
+    """StorageBackend.iter_all() qatorlaridan yozuvlar (bittadan - xotira o'zgarmas)"""
+    for user_id, data, updated_at in rows:
+        yield from profile_records(user_id, json_loads(data), updated_at, kinds, since)
+
+
+def ndjson_lines(records: Iterable[Record]) -> Iterator[bytes]:
+    for kind, values in records:
+        record = {"type": kind}
+        record.update(zip(FIELDS[kind], values))
+        yield json_dumps(record) + b"\n"
+
+
+def csv_lines(records: Iterable[Record], kind: str) -> Iterator[bytes]:
+    """Bitta turdagi yozuvlar CSV qatorlari (sarlavha bilan)"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(FIELDS[kind])
+    for record_kind, values in records:
+        if record_kind == kind:
+            writer.writerow(values)
+            if buffer.tell() >= CHUNK_BYTES:
+                yield buffer.getvalue().encode()
+                buffer.seek(0)
+                buffer.truncate()
+    yield buffer.getvalue().encode()
+
+
+def gzip_chunks(chunks: Iterable[bytes], level: int = 6) -> Iterator[bytes]:
+    """Oqimni yozish paytida gzip'lash (butun fayl xotirada to'planmaydi)"""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def _batched(lines: Iterable[bytes]) -> Iterator[bytes]:
+    batch, size = [], 0
+    for line in lines:
+        batch.append(line)
+        size += len(line)
+        if size >= CHUNK_BYTES:
+            yield b"".join(batch)
+            batch, size = [], 0
+    if batch:
+        yield b"".join(batch)
+
+
+class ExportStats:
+    """Eksport natijasi (yozuvlar turlar bo'yicha)"""
+    __slots__ = ('profiles', 'records', 'bytes')
+
+    def __init__(self):
+        self.profiles = 0
+        self.records: Dict[str, int] = {}
+        self.bytes = 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {'profiles': self.profiles, 'records': dict(self.records), 'bytes': self.bytes}
+
+
+def write_export(backend: StorageBackend, out: BinaryIO, fmt: str = "ndjson",
+                 kinds: Sequence[str] = KINDS, since: float = 0.0, compress: bool = False) -> ExportStats:
+    """Barcha (yoki `since` dan keyin o'zgargan) profillarni `out` ga yozish.
+
+    Bloklaydi: botda thread'da chaqiriladi. Profillar backend'dan
+    bittadan o'qiladi va yozuvlar generatorlar zanjiri orqali o'tadi,
+    shuning uchun xotira profillar soniga bog'liq emas. CSV faqat bitta
+    tur uchun (har turning ustunlari boshqa).
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Noma'lum format: {fmt}")
+    unknown = set(kinds) - set(KINDS)
+    if unknown:
+        raise ValueError(f"Noma'lum tur: {', '.join(sorted(unknown))}")
+    if fmt == "csv" and len(kinds) != 1:
+        raise ValueError("CSV faqat bitta tur uchun (--kind)")
+
+    stats = ExportStats()
+
+    def rows() -> Iterator[Tuple[int, str, float]]:
+        for row in backend.iter_all(since):
+            stats.profiles += 1
+            yield row
+
+    def counted(records: Iterable[Record]) -> Iterator[Record]:
+        for record in records:
+            stats.records[record[0]] = stats.records.get(record[0], 0) + 1
+            yield record
+
+    records = counted(iter_records(rows(), kinds, since))
+    lines = csv_lines(records, kinds[0]) if fmt == "csv" else ndjson_lines(records)
+    chunks = _batched(lines)
+    if compress:
+        chunks = gzip_chunks(chunks)
+    for chunk in chunks:
+        out.write(chunk)
+        stats.bytes += len(chunk)
+    out.flush()
+    return stats
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("-o", "--output", default="-", help="fayl (standart: stdout)")
+    parser.add_argument("--format", choices=FORMATS, default="ndjson")
+    parser.add_argument("--kind", action="append", choices=KINDS,
+                        help="yozuv turi (bir necha marta; standart: hammasi, CSV uchun bittasi shart)")
+    parser.add_argument("--since", type=parse_since, default=0.0,
+                        help="shu vaqtdan keyin o'zgarganlar (unix vaqt yoki ISO sana, UTC)")
+    parser.add_argument("--gzip", action="store_true", help="gzip bilan siqish")
+    parser.add_argument("--store", default=None, help="PROFILE_STORE (standart: muhitdan)")
+    args = parser.parse_args(argv)
+
+    kinds = tuple(args.kind or KINDS)
+    if args.format == "csv" and len(kinds) != 1:
+        parser.error("CSV uchun bitta --kind kerak")
+    backend = create_backend(args.store) if args.store else create_backend()
+    try:
+        if args.output == "-":
+            stats = write_export(backend, sys.stdout.buffer, args.format, kinds, args.since, args.gzip)
+        else:
+            with open(args.output, "wb") as out:
+                stats = write_export(backend, out, args.format, kinds, args.since, args.gzip)
+    finally:
+        backend.close()
+    print(json.dumps(stats.to_dict(), ensure_ascii=False), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
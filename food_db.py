@@ -0,0 +1,262 @@
+import os
+import re
+import csv
+import time
+import bisect
+import logging
+from array import array
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Bot bilan birga keladigan jadval: nom, muqobil nomlar (|), 100 g dagi kcal/oqsil/yog'/uglevod, porsiya (g)
+FOOD_DB_PATH = os.getenv("FOOD_DB_PATH",
+                         os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "foods.csv"))
+# Noaniq qidiruv: trigram o'xshashligi (Jaccard) shundan past bo'lsa topilmadi
+FOOD_MATCH_THRESHOLD = float(os.getenv("FOOD_MATCH_THRESHOLD", "0.4"))
+# Prefiks bo'yicha qidiruv kamida shuncha harfdan
+MIN_PREFIX = 3
+
+_APOSTROPHES = str.maketrans("", "", "'`ʻʼ‘’´")
+_NOT_WORD = re.compile(r"[^\w\s-]+")
+_SPACES = re.compile(r"[\s_-]+")
+# "osh 300g", "2 ta non", "olma 1.5 porsiya"
+_AMOUNT = re.compile(r"(\d+(?:[.,]\d+)?)\s*(kg|gr|gramm|gram|g|ml|l|ta|dona|porsiya|x|гр|г|мл|шт)?(?=\s|$)",
+                     re.IGNORECASE)
+_GRAM_UNITS = {"g": 1, "gr": 1, "gram": 1, "gramm": 1, "ml": 1, "kg": 1000, "l": 1000,
+               "г": 1, "гр": 1, "мл": 1}
+# Birliksiz son shundan katta bo'lsa gramm, aks holda porsiyalar soni
+BARE_GRAMS_FROM = 20
+_CALORIE_QUESTION = re.compile(r"kalor|kcal|kkal|калор|ккал|calor", re.IGNORECASE)
+# Kaloriya savolidan taom nomini ajratishda tashlanadigan so'zlar
+QUESTION_WORDS = frozenset("""
+    kaloriya kaloriyasi kaloriyali kcal kkal necha nechta qancha bor ichida bitta 1 100 g gr gramm
+    gramda grammida porsiya porsiyada da ning qanday сколько калорий ккал в how many calories in
+    is a the of
+""".split())
+_SUFFIXES = ("dagi", "ning", "idagi", "ida", "lar", "dan", "da", "ni", "ga", "si", "i")
+
+
+def normalize(text: str) -> str:
+    """Qidiruv kaliti: kichik harf, apostroflarsiz ("lag'mon" = "lagmon"), bitta bo'shliq"""
+    text = _NOT_WORD.sub(" ", text.lower().translate(_APOSTROPHES))
+    return _SPACES.sub(" ", text).strip()
+
+
+def trigrams(key: str) -> frozenset:
+    padded = f"  {key} "
+    return frozenset(padded[i:i + 3] for i in range(len(padded) - 2))
+
+
+def is_calorie_question(text: str) -> bool:
+    return bool(_CALORIE_QUESTION.search(text))
+
+
+def parse_entry(text: str) -> Tuple[str, float, bool]:
+    """"osh 300g" -> ("osh", 300, True); "2 ta non" -> ("non", 2, False); "olma" -> ("olma", 1, False)"""
+    match = _AMOUNT.search(text)
+    if not match:
+        return text.strip(), 1.0, False
+    amount = float(match.group(1).replace(",", "."))
+    unit = (match.group(2) or "").lower()
+    query = (text[:match.start()] + " " + text[match.end():]).strip()
+    if unit in _GRAM_UNITS:
+        return query, amount * _GRAM_UNITS[unit], True
+    if not unit and amount >= BARE_GRAMS_FROM:
+        return query, amount, True
+    return query, amount, False
+
+
+class Food(NamedTuple):
+    """Qiymatlar 100 g uchun"""
+    name: str
+    kcal: float
+    protein: float
+    fat: float
+    carbs: float
+    portion_g: int
+
+    def kcal_for(self, grams: float) -> int:
+        return int(round(self.kcal * grams / 100))
+
+
+def format_food(food: Food) -> str:
+    """Kaloriya savoliga javob (oddiy matn)"""
+    return (f"🍽 {food.name} - 100 g: {food.kcal:g} kcal\n"
+            f"Oqsil {food.protein:g} g, yog' {food.fat:g} g, uglevod {food.carbs:g} g\n"
+            f"1 porsiya (~{food.portion_g} g): {food.kcal_for(food.portion_g)} kcal")
+
+
+class FoodDB:
+    """Mahalliy taomlar jadvali: birinchi so'rovda yuklanadi, qidiruv mikrosoniyalarda.
+
+    Sonli ustunlar `array` larda (har taomga bir necha bayt), nomlar
+    bitta ro'yxatda. Qidiruv kalitlari (nom + muqobil nomlar, normallashgan)
+    tartiblangan ro'yxatda: aniq moslik - dict, prefiks - bisect, noaniq
+    moslik - trigram indeksi (trigram -> kalitlar) bo'yicha faqat umumiy
+    trigrami bor kalitlar solishtiriladi.
+    """
+
+    def __init__(self, path: str = FOOD_DB_PATH, threshold: float = FOOD_MATCH_THRESHOLD):
+        self.path = path
+        self.threshold = threshold
+        self._loaded = False
+        self._names: List[str] = []
+        self._kcal = array('f')
+        self._protein = array('f')
+        self._fat = array('f')
+        self._carbs = array('f')
+        self._portion = array('H')
+        self._keys: List[str] = []
+        self._key_food = array('H')
+        self._key_grams = array('B')
+        self._exact: Dict[str, int] = {}
+        self._trigrams: Dict[str, array] = {}
+
+        self.load_seconds = 0.0
+        self.exact_hits = 0
+        self.prefix_hits = 0
+        self.fuzzy_hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        self._ensure_loaded()
+        return len(self._names)
+
+    def _ensure_loaded(self) -> None:
+        if not self._loaded:
+            self.load()
+
+    def load(self) -> None:
+        started = time.perf_counter()
+        pairs: Dict[str, int] = {}
+        with open(self.path, newline="", encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                index = len(self._names)
+                self._names.append(row["name"])
+                self._kcal.append(float(row["kcal"]))
+                self._protein.append(float(row["protein"]))
+                self._fat.append(float(row["fat"]))
+                self._carbs.append(float(row["carbs"]))
+                self._portion.append(int(row["portion_g"]))
+                for alias in [row["name"], *(row["aliases"] or "").split("|")]:
+                    key = normalize(alias)
+                    if key:
+                        # Bir xil kalit ikki taomda bo'lsa birinchisi qoladi
+                        pairs.setdefault(key, index)
+
+        for key in sorted(pairs):
+            key_index = len(self._keys)
+            grams = trigrams(key)
+            self._keys.append(key)
+            self._key_food.append(pairs[key])
+            self._key_grams.append(min(255, len(grams)))
+            self._exact[key] = key_index
+            for gram in grams:
+                self._trigrams.setdefault(gram, array('H')).append(key_index)
+        self._loaded = True
+        self.load_seconds = time.perf_counter() - started
+        logger.info(f"Taomlar bazasi: {len(self._names)} ta taom, {len(self._keys)} ta kalit, "
+                    f"{self.load_seconds * 1000:.1f} ms")
+
+    def _food(self, index: int) -> Food:
+        # float32 ustunlar: 0.1 -> 0.10000000149, jadvaldagi aniqlikka qaytariladi
+        return Food(self._names[index], round(self._kcal[index], 1), round(self._protein[index], 1),
+                    round(self._fat[index], 1), round(self._carbs[index], 1), self._portion[index])
+
+    def _prefix(self, key: str) -> Optional[int]:
+        """Shu prefiks bilan boshlanadigan eng qisqa kalit"""
+        start = bisect.bisect_left(self._keys, key)
+        best = None
+        for key_index in range(start, len(self._keys)):
+            candidate = self._keys[key_index]
+            if not candidate.startswith(key):
+                break
+            if best is None or len(candidate) < len(self._keys[best]):
+                best = key_index
+        return best
+
+    def _fuzzy(self, key: str) -> List[Tuple[float, int]]:
+        """(o'xshashlik, kalit) - kamayish tartibida"""
+        grams = trigrams(key)
+        common: Dict[int, int] = {}
+        for gram in grams:
+            for key_index in self._trigrams.get(gram, ()):
+                common[key_index] = common.get(key_index, 0) + 1
+        size = len(grams)
+        scored = [(shared / (size + self._key_grams[key_index] - shared), key_index)
+                  for key_index, shared in common.items()]
+        scored.sort(reverse=True)
+        return scored
+
+    def lookup(self, query: str) -> Optional[Food]:
+        """Aniq nom, prefiks yoki eng o'xshash nom bo'yicha taom (topilmasa None)"""
+        self._ensure_loaded()
+        key = normalize(query)
+        if not key:
+            return None
+        key_index = self._exact.get(key)
+        if key_index is not None:
+            self.exact_hits += 1
+            return self._food(self._key_food[key_index])
+        if len(key) >= MIN_PREFIX:
+            key_index = self._prefix(key)
+            if key_index is not None:
+                self.prefix_hits += 1
+                return self._food(self._key_food[key_index])
+        scored = self._fuzzy(key)
+        if scored and scored[0][0] >= self.threshold:
+            self.fuzzy_hits += 1
+            return self._food(self._key_food[scored[0][1]])
+        self.misses += 1
+        return None
+
+    def search(self, query: str, limit: int = 5) -> List[Food]:
+        """O'xshash taomlar (takrorlarsiz) - topilmaganda taklif qilish uchun"""
+        self._ensure_loaded()
+        foods, seen = [], set()
+        for _, key_index in self._fuzzy(normalize(query)):
+            food_index = self._key_food[key_index]
+            if food_index not in seen:
+                seen.add(food_index)
+                foods.append(self._food(food_index))
+                if len(foods) == limit:
+                    break
+        return foods
+
+    def _stemmed(self, word: str) -> Optional[int]:
+        key_index = self._exact.get(word)
+        if key_index is not None:
+            return key_index
+        for suffix in _SUFFIXES:
+            if word.endswith(suffix) and len(word) - len(suffix) >= 2:
+                key_index = self._exact.get(word[:-len(suffix)])
+                if key_index is not None:
+                    return key_index
+        return None
+
+    def find(self, text: str) -> Optional[Food]:
+        """Erkin matndan taom ("oshda necha kaloriya bor?" -> Osh)"""
+        self._ensure_loaded()
+        words = [word for word in normalize(text).split() if word not in QUESTION_WORDS]
+        # Avval uzun birikmalar ("tovuq go'shti"), keyin so'zlar qo'shimchalarsiz
+        for size in range(min(3, len(words)), 0, -1):
+            for start in range(len(words) - size + 1):
+                key_index = self._stemmed(" ".join(words[start:start + size]))
+                if key_index is not None:
+                    self.exact_hits += 1
+                    return self._food(self._key_food[key_index])
+        return self.lookup(" ".join(words)) if words else None
+
+    def stats(self) -> Dict[str, float]:
+        lookups = self.exact_hits + self.prefix_hits + self.fuzzy_hits + self.misses
+        return {
+            'foods': len(self._names),
+            'keys': len(self._keys),
+            'load_ms': round(self.load_seconds * 1000, 2),
+            'exact_hits': self.exact_hits,
+            'prefix_hits': self.prefix_hits,
+            'fuzzy_hits': self.fuzzy_hits,
+            'misses': self.misses,
+            'hit_rate': (lookups - self.misses) / lookups if lookups else 0.0
+        }
@@ -0,0 +1,75 @@
+import time
+from array import array
+from typing import Iterable, Iterator, List, Optional, Tuple, Union
+
+
+class NumericHistory:
+    """(vaqt, qiymat) juftliklari uchun chegaralangan ring buffer.
+
+    Ma'lumot ikkita `array('d')` da saqlanadi va birinchi qo'shilgunga qadar
+    xotira ajratilmaydi. Sig'im to'lganda eng eski yozuv ustidan yoziladi.
+    Ro'yxat kabi ishlatish mumkin: `len()`, `history[-1]`, `for v in history`.
+    """
+
+    __slots__ = ('capacity', '_ts', '_values', '_start')
+
+    def __init__(self, capacity: int, items: Iterable = ()):
+        self.capacity = max(1, capacity)
+        self._ts: Optional[array] = None
+        self._values: Optional[array] = None
+        self._start = 0
+        for item in items:
+            if isinstance(item, (list, tuple)):
+                self.append(item[1], item[0])
+            else:
+                # Eski format: faqat qiymatlar ro'yxati
+                self.append(item, 0.0)
+
+    def append(self, value: float, ts: Optional[float] = None) -> None:
+        if ts is None:
+            ts = time.time()
+        if self._values is None:
+            self._ts = array('d')
+            self._values = array('d')
+        if len(self._values) < self.capacity:
+            self._ts.append(ts)
+            self._values.append(value)
+            return
+        self._ts[self._start] = ts
+        self._values[self._start] = value
+        self._start = (self._start + 1) % self.capacity
+
+    def __len__(self) -> int:
+        return len(self._values) if self._values is not None else 0
+
+    def _index(self, index: int) -> int:
+        size = len(self)
+        if index < 0:
+            index += size
+        if not 0 <= index < size:
+            raise IndexError("history index out of range")
+        return (self._start + index) % size if size == self.capacity else index
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[float, List[float]]:
+        if isinstance(index, slice):
+            return [self._values[self._index(i)] for i in range(*index.indices(len(self)))]
+        return self._values[self._index(index)]
+
+    def __iter__(self) -> Iterator[float]:
+        for i in range(len(self)):
+            yield self._values[self._index(i)]
+
+    def items(self) -> Iterator[Tuple[float, float]]:
+        """(vaqt, qiymat) juftliklari, eskidan yangiga"""
+        for i in range(len(self)):
+            j = self._index(i)
+            yield self._ts[j], self._values[j]
+
+    def since(self, ts: float) -> Iterator[Tuple[float, float]]:
+        return ((t, v) for t, v in self.items() if t >= ts)
+
+    def to_list(self) -> List[List[float]]:
+        return [[t, v] for t, v in self.items()]
+
+    def __repr__(self) -> str:
+        return f"NumericHistory({self.capacity}, {self.to_list()!r})"
@@ -0,0 +1,300 @@
+import os
+import json
+import time
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+from telegram.ext import BasePersistence, PersistenceInput
+
+from storage import PROFILE_STORE
+
+try:
+    import orjson
+
+    def json_dumps(obj: Any) -> bytes:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+    json_loads = orjson.loads
+except ImportError:  # orjson o'rnatilmagan bo'lsa oddiy json
+    def json_dumps(obj: Any) -> bytes:
+        return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode()
+    json_loads = json.loads
+
+logger = logging.getLogger(__name__)
+
+# Suhbat holatlari saqlanadigan joy ("journal" yoki "memory" - saqlanmaydi)
+CONVERSATION_STORE = os.getenv("CONVERSATION_STORE",
+                               "memory" if PROFILE_STORE == "memory" else "journal")
+JOURNAL_PATH = os.getenv("JOURNAL_PATH", "health_bot.journal")
+# Application o'zgarishlarni shuncha soniyada bir marta yozadi
+JOURNAL_UPDATE_INTERVAL = float(os.getenv("JOURNAL_UPDATE_INTERVAL", "5"))
+# Jurnal yozuvlari tirik yozuvlardan shuncha marta ko'p bo'lsa siqiladi
+JOURNAL_COMPACT_RATIO = float(os.getenv("JOURNAL_COMPACT_RATIO", "4"))
+JOURNAL_COMPACT_MIN = int(os.getenv("JOURNAL_COMPACT_MIN", "50000"))
+
+# Yozuv turlari: [tur, kalit..., qiymat]
+CONVERSATION, USER, CHAT, BOT, CALLBACK = "c", "u", "h", "b", "q"
+
+
+def journal_path(path: str = JOURNAL_PATH) -> str:
+    """Shardlangan rejimda har bir worker o'z jurnaliga yozadi"""
+    index = os.getenv("SHARD_INDEX")
+    return f"{path}.{index}" if index is not None else path
+
+
+class JournalPersistence(BasePersistence):
+    """ConversationHandler holatlari, user_data va chat_data uchun jurnal.
+
+    Har bir o'zgarish faylga bitta JSON qator bo'lib qo'shiladi.
+    Application'ning bitta `update_persistence` chaqiruvidagi barcha
+    yozuvlar fon vazifasida bitta write + fsync bilan yoziladi. Ishga
+    tushganda jurnal boshidan o'qiladi (oxirgi yarim yozilgan qator
+    tashlab yuboriladi), eskirgan yozuvlar ko'payib ketsa jurnal joriy
+    holatning snapshot'i bilan atomik almashtiriladi.
+
+    Qiymatlar JSON'ga aylanadigan bo'lishi kerak; suhbat kalitlari
+    (chat_id, user_id) kortej sifatida tiklanadi.
+    """
+
+    def __init__(self, path: Optional[str] = None,
+                 update_interval: float = JOURNAL_UPDATE_INTERVAL,
+                 compact_ratio: float = JOURNAL_COMPACT_RATIO,
+                 compact_min: int = JOURNAL_COMPACT_MIN):
+        super().__init__(store_data=PersistenceInput(), update_interval=update_interval)
+        self.path = path or journal_path()
+        self.compact_ratio = compact_ratio
+        self.compact_min = compact_min
+        self._conversations: Dict[str, Dict[Tuple, Any]] = {}
+        self._user_data: Dict[int, Dict] = {}
+        self._chat_data: Dict[int, Dict] = {}
+        self._bot_data: Dict = {}
+        self._callback_data: Optional[Any] = None
+        self._loaded = False
+        self._file = None
+        self._pending: List[bytes] = []
+        self._writer: Optional[asyncio.Task] = None
+        self._io = ThreadPoolExecutor(max_workers=1, thread_name_prefix="journal")
+
+        self.records = 0
+        self.batches = 0
+        self.compactions = 0
+        self.skipped_lines = 0
+        self.replay_seconds = 0.0
+
+    # --- O'qish ---
+
+    def _apply(self, record: List) -> None:
+        kind = record[0]
+        if kind == CONVERSATION:
+            states = self._conversations.setdefault(record[1], {})
+            if record[3] is None:
+                states.pop(tuple(record[2]), None)
+            else:
+                states[tuple(record[2])] = record[3]
+        elif kind == USER:
+            self._set(self._user_data, int(record[1]), record[2])
+        elif kind == CHAT:
+            self._set(self._chat_data, int(record[1]), record[2])
+        elif kind == BOT:
+            self._bot_data = record[1]
+        elif kind == CALLBACK:
+            self._callback_data = record[1]
+
+    @staticmethod
+    def _set(target: Dict[int, Dict], key: int, data: Optional[Dict]) -> None:
+        if data:
+            target[key] = data
+        else:
+            target.pop(key, None)
+
+    def _replay(self) -> None:
+        """Jurnalni o'qib holatni tiklash va faylni yozish uchun ochish"""
+        started = time.perf_counter()
+        if os.path.exists(self.path):
+            with open(self.path, "rb") as f:
+                data = f.read()
+            end = data.rfind(b"\n") + 1
+            if end < len(data):
+                # Yozilayotganda uzilgan oxirgi qator
+                logger.warning(f"Jurnal: oxirgi {len(data) - end} bayt tashlab yuborildi")
+                with open(self.path, "r+b") as f:
+                    f.truncate(end)
+            for line in data[:end].splitlines():
+                try:
+                    self._apply(json_loads(line))
+                except (ValueError, IndexError, KeyError, TypeError):
+                    self.skipped_lines += 1
+                self.records += 1
+        self._file = open(self.path, "ab")
+        self._loaded = True
+        self.replay_seconds = time.perf_counter() - started
+        logger.info(f"Jurnal: {self.records} ta yozuv {self.replay_seconds:.2f} s da o'qildi")
+
+    async def _ensure_loaded(self) -> None:
+        if not self._loaded:
+            await asyncio.get_running_loop().run_in_executor(self._io, self._replay)
+
+    async def get_user_data(self) -> Dict[int, Dict]:
+        await self._ensure_loaded()
+        return {user_id: dict(data) for user_id, data in self._user_data.items()}
+
+    async def get_chat_data(self) -> Dict[int, Dict]:
+        await self._ensure_loaded()
+        return {chat_id: dict(data) for chat_id, data in self._chat_data.items()}
+
+    async def get_bot_data(self) -> Dict:
+        await self._ensure_loaded()
+        return dict(self._bot_data)
+
+    async def get_callback_data(self) -> Optional[Any]:
+        await self._ensure_loaded()
+        return self._callback_data
+
+    async def get_conversations(self, name: str) -> Dict[Tuple, Any]:
+        await self._ensure_loaded()
+        return dict(self._conversations.get(name, {}))
+
+    # --- Yozish ---
+
+    def _append(self, record: List) -> None:
+        """Yozuvni navbatga qo'yish; fon vazifasi navbatni bitta fsync bilan yozadi"""
+        self._apply(record)
+        self._pending.append(json_dumps(record) + b"\n")
+        if self._writer is None or self._writer.done():
+            self._writer = asyncio.create_task(self._write_pending())
+
+    def _live(self) -> int:
+        return (sum(len(states) for states in self._conversations.values())
+                + len(self._user_data) + len(self._chat_data) + 2)
+
+    def _snapshot(self) -> List[List]:
+        """Joriy holat yozuvlari (qiymatlar almashtiriladi, o'zgartirilmaydi)"""
+        records: List[List] = []
+        for name, states in self._conversations.items():
+            records.extend([CONVERSATION, name, list(key), state] for key, state in states.items())
+        records.extend([USER, user_id, data] for user_id, data in self._user_data.items())
+        records.extend([CHAT, chat_id, data] for chat_id, data in self._chat_data.items())
+        if self._bot_data:
+            records.append([BOT, self._bot_data])
+        if self._callback_data is not None:
+            records.append([CALLBACK, self._callback_data])
+        return records
+
+    async def _write_pending(self) -> None:
+        """Navbatdagi yozuvlarni guruhlab yozish (bitta fsync)"""
+        loop = asyncio.get_running_loop()
+        while self._pending:
+            batch, self._pending = self._pending, []
+            snapshot = None
+            if self.records + len(batch) > max(self.compact_min, self._live() * self.compact_ratio):
+                snapshot = self._snapshot()
+            try:
+                await loop.run_in_executor(self._io, self._write_sync, batch, snapshot)
+            except Exception as e:
+                logger.error(f"Jurnalga yozishda xato: {e}")
+                self._pending[:0] = batch
+                return
+            self.batches += 1
+
+    def _write_sync(self, batch: List[bytes], snapshot: Optional[List[List]]) -> None:
+        self._file.write(b"".join(batch))
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self.records += len(batch)
+        if snapshot is not None:
+            self._compact_sync(snapshot)
+
+    def _compact_sync(self, snapshot: List[List]) -> None:
+        """Snapshot'ni vaqtinchalik faylga yozib, jurnal o'rniga qo'yish"""
+        started = time.perf_counter()
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(b"".join(json_dumps(record) + b"\n" for record in snapshot))
+            f.flush()
+            os.fsync(f.fileno())
+        self._file.close()
+        os.replace(tmp_path, self.path)
+        directory = os.open(os.path.dirname(os.path.abspath(self.path)), os.O_RDONLY)
+        try:
+            os.fsync(directory)
+        finally:
+            os.close(directory)
+        self._file = open(self.path, "ab")
+        logger.info(f"Jurnal siqildi: {self.records} -> {len(snapshot)} ta yozuv "
+                    f"({time.perf_counter() - started:.2f} s)")
+        self.records = len(snapshot)
+        self.compactions += 1
+
+    async def update_conversation(self, name: str, key: Tuple, new_state: Optional[object]) -> None:
+        if self._conversations.get(name, {}).get(key) == new_state:
+            return
+        self._append([CONVERSATION, name, list(key), new_state])
+
+    async def update_user_data(self, user_id: int, data: Dict) -> None:
+        # Application har bir faol foydalanuvchi uchun chaqiradi - o'zgarmaganlari yozilmaydi
+        if self._user_data.get(user_id, {}) == data:
+            return
+        self._append([USER, user_id, data])
+
+    async def update_chat_data(self, chat_id: int, data: Dict) -> None:
+        if self._chat_data.get(chat_id, {}) == data:
+            return
+        self._append([CHAT, chat_id, data])
+
+    async def update_bot_data(self, data: Dict) -> None:
+        if self._bot_data == data:
+            return
+        self._append([BOT, data])
+
+    async def update_callback_data(self, data: Any) -> None:
+        if self._callback_data == data:
+            return
+        self._append([CALLBACK, data])
+
+    async def drop_user_data(self, user_id: int) -> None:
+        if user_id in self._user_data:
+            self._append([USER, user_id, None])
+
+    async def drop_chat_data(self, chat_id: int) -> None:
+        if chat_id in self._chat_data:
+            self._append([CHAT, chat_id, None])
+
+    async def refresh_user_data(self, user_id: int, user_data: Dict) -> None:
+        pass
+
+    async def refresh_chat_data(self, chat_id: int, chat_data: Dict) -> None:
+        pass
+
+    async def refresh_bot_data(self, bot_data: Dict) -> None:
+        pass
+
+    async def flush(self) -> None:
+        """Qolgan yozuvlarni yozib, faylni yopish (Application.shutdown chaqiradi)"""
+        if self._writer is not None:
+            await self._writer
+        if self._pending:
+            await self._write_pending()
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        self._io.shutdown(wait=True)
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            'records': self.records,
+            'live': self._live(),
+            'batches': self.batches,
+            'compactions': self.compactions,
+            'skipped_lines': self.skipped_lines,
+            'replay_seconds': round(self.replay_seconds, 3)
+        }
+
+
+def create_persistence(kind: str = CONVERSATION_STORE) -> Optional[BasePersistence]:
+    """Sozlamaga qarab persistence yaratish (memory - saqlanmaydi)"""
+    if kind == "memory":
+        return None
+    if kind == "journal":
+        return JournalPersistence()
+    raise ValueError(f"Noma'lum CONVERSATION_STORE: {kind}")
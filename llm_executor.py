@@ -0,0 +1,184 @@
+import os
+import asyncio
+import logging
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterator, Callable, Dict, Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+# Parallel Gemini chaqiriqlari soni va bitta chaqiriq uchun vaqt limiti (soniya)
+GEMINI_MAX_CONCURRENCY = int(os.getenv("GEMINI_MAX_CONCURRENCY", "8"))
+GEMINI_TIMEOUT = float(os.getenv("GEMINI_TIMEOUT", "30"))
+
+
+class _StreamError:
+    """Thread ichida ko'tarilgan xatoni navbat orqali uzatish uchun"""
+
+    def __init__(self, error: BaseException):
+        self.error = error
+
+
+_STREAM_END = object()
+
+
+def _call_soon(loop: asyncio.AbstractEventLoop, callback: Callable[..., Any], *args: Any) -> None:
+    """Thread'dan loop'ga chaqiriq yuborish; loop yopilgan bo'lsa (shutdown'dan
+    keyin tugagan osilgan chaqiriq) jimgina tashlab yuboriladi"""
+    if loop.is_closed():
+        return
+    try:
+        loop.call_soon_threadsafe(callback, *args)
+    except RuntimeError:
+        # is_closed() tekshiruvi va yopilish orasidagi poyga
+        pass
+
+
+class GeminiExecutor:
+    """Bloklovchi Gemini chaqiriqlarini alohida thread pool'da bajarish.
+
+    Event loop hech qachon model javobini kutib qolmaydi: chaqiriqlar
+    `max_concurrency` ta thread'da ishlaydi, qolganlari navbatda turadi.
+    """
+
+    def __init__(self, max_concurrency: int = GEMINI_MAX_CONCURRENCY,
+                 timeout: float = GEMINI_TIMEOUT):
+        self.max_concurrency = max(1, max_concurrency)
+        self.timeout = timeout
+        self._pool = ThreadPoolExecutor(
+            max_workers=self.max_concurrency,
+            thread_name_prefix="gemini"
+        )
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+        # Navbat va natija hisoblagichlari
+        self.in_flight = 0
+        self.waiting = 0
+        self.max_waiting = 0
+        self.completed = 0
+        self.timeouts = 0
+        self.errors = 0
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._semaphore
+
+    def _release(self, semaphore: asyncio.Semaphore) -> None:
+        self.in_flight -= 1
+        semaphore.release()
+
+    async def run(self, func: Callable[..., Any], *args: Any,
+                  timeout: Optional[float] = None, **kwargs: Any) -> Any:
+        """`func(*args, **kwargs)` ni thread pool'da bajarish.
+
+        Vaqt tugasa `asyncio.TimeoutError` ko'tariladi. Slot esa thread
+        haqiqatan bo'shagandagina qaytariladi, shuning uchun osilib qolgan
+        chaqiriqlar ham parallellik limitiga kiradi.
+        """
+        loop = asyncio.get_running_loop()
+        semaphore = self._get_semaphore()
+
+        self.waiting += 1
+        self.max_waiting = max(self.max_waiting, self.waiting)
+        try:
+            await semaphore.acquire()
+        finally:
+            self.waiting -= 1
+
+        self.in_flight += 1
+        try:
+            future = self._pool.submit(functools.partial(func, *args, **kwargs))
+        except BaseException:
+            self._release(semaphore)
+            raise
+        future.add_done_callback(lambda _: _call_soon(loop, self._release, semaphore))
+
+        try:
+            result = await asyncio.wait_for(
+                asyncio.wrap_future(future),
+                timeout if timeout is not None else self.timeout
+            )
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            raise
+        except Exception:
+            self.errors += 1
+            raise
+
+        self.completed += 1
+        return result
+
+    async def stream(self, func: Callable[..., Iterable[Any]], *args: Any,
+                     timeout: Optional[float] = None, **kwargs: Any) -> AsyncIterator[Any]:
+        """`func(*args, **kwargs)` qaytargan iteratorni thread'da aylanib,
+        elementlarni kelishi bilan uzatish.
+
+        `timeout` butun oqim uchun umumiy muddat. Iste'molchi oqimni erta
+        to'xtatsa, thread keyingi elementda to'xtaydi.
+        """
+        loop = asyncio.get_running_loop()
+        semaphore = self._get_semaphore()
+
+        self.waiting += 1
+        self.max_waiting = max(self.max_waiting, self.waiting)
+        try:
+            await semaphore.acquire()
+        finally:
+            self.waiting -= 1
+
+        queue: asyncio.Queue = asyncio.Queue()
+        stopped = threading.Event()
+
+        def worker() -> None:
+            try:
+                for item in func(*args, **kwargs):
+                    if stopped.is_set():
+                        return
+                    _call_soon(loop, queue.put_nowait, item)
+                _call_soon(loop, queue.put_nowait, _STREAM_END)
+            except BaseException as e:
+                _call_soon(loop, queue.put_nowait, _StreamError(e))
+
+        self.in_flight += 1
+        try:
+            future = self._pool.submit(worker)
+        except BaseException:
+            self._release(semaphore)
+            raise
+        future.add_done_callback(lambda _: _call_soon(loop, self._release, semaphore))
+
+        deadline = loop.time() + (timeout if timeout is not None else self.timeout)
+        try:
+            while True:
+                try:
+                    item = await asyncio.wait_for(queue.get(), max(0.0, deadline - loop.time()))
+                except asyncio.TimeoutError:
+                    self.timeouts += 1
+                    raise
+                if item is _STREAM_END:
+                    break
+                if isinstance(item, _StreamError):
+                    self.errors += 1
+                    raise item.error
+                yield item
+        finally:
+            stopped.set()
+
+        self.completed += 1
+
+    def stats(self) -> Dict[str, float]:
+        """Navbat chuqurligi va natijalar bo'yicha joriy ko'rsatkichlar"""
+        return {
+            'max_concurrency': self.max_concurrency,
+            'in_flight': self.in_flight,
+            'waiting': self.waiting,
+            'max_waiting': self.max_waiting,
+            'completed': self.completed,
+            'timeouts': self.timeouts,
+            'errors': self.errors
+        }
+
+    def shutdown(self) -> None:
+        self._pool.shutdown(wait=False, cancel_futures=True)
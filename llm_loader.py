@@ -0,0 +1,94 @@
+import re
+import time
+import asyncio
+import logging
+import threading
+from importlib import metadata
+from typing import Any, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# gemini-pro (1.0) system_instruction va JSON rejimini qabul qilmaydi
+LEGACY_MODELS = ("gemini-pro", "gemini-1.0")
+
+
+def sdk_version() -> Tuple[int, ...]:
+    """google-generativeai versiyasi - paketning o'zini import qilmasdan (metadata'dan)"""
+    try:
+        version = metadata.version("google-generativeai")
+    except metadata.PackageNotFoundError:
+        return (0,)
+    return tuple(int(part) for part in re.findall(r"\d+", version)[:3])
+
+
+def supports_system_instruction(model_name: str) -> bool:
+    # system_instruction google-generativeai 0.5+ da bor
+    return sdk_version() >= (0, 5) and not model_name.startswith(LEGACY_MODELS)
+
+
+def supports_json_mode(model_name: str) -> bool:
+    # GenerationConfig.response_mime_type ham SDK 0.5+ da
+    return sdk_version() >= (0, 5) and not model_name.startswith(LEGACY_MODELS)
+
+
+class LazyGenerativeModel:
+    """`genai.GenerativeModel` o'rnida: SDK birinchi kerak bo'lganda yuklanadi.
+
+    google.generativeai (gRPC/protobuf daraxti) import qilinishi bir
+    soniyagacha vaqt oladi. Bot modulini import qilishda u yuklanmaydi:
+    birinchi `generate_content()` (GeminiExecutor thread'ida) yoki fondagi
+    `warm()` uni yuklaydi, menyu va profil handlerlari esa kutmaydi.
+    Yuklash bir marta, lock ostida bajariladi.
+    """
+
+    def __init__(self, model_name: str, api_key: Optional[str],
+                 system_instruction: Optional[str] = None):
+        self.model_name = model_name
+        self.api_key = api_key
+        self.system_instruction = system_instruction
+        self._model: Any = None
+        self._lock = threading.Lock()
+        self.load_seconds = 0.0
+
+    @property
+    def loaded(self) -> bool:
+        return self._model is not None
+
+    def load(self) -> Any:
+        """SDK'ni import qilish, sozlash va modelni yaratish (bloklaydi - thread'da chaqiring)"""
+        if self._model is None:
+            with self._lock:
+                if self._model is None:
+                    started = time.perf_counter()
+                    import google.generativeai as genai
+                    genai.configure(api_key=self.api_key)
+                    if self.system_instruction:
+                        model = genai.GenerativeModel(self.model_name,
+                                                      system_instruction=self.system_instruction)
+                    else:
+                        model = genai.GenerativeModel(self.model_name)
+                    self.load_seconds = time.perf_counter() - started
+                    self._model = model
+                    logger.info(f"Gemini SDK yuklandi: {self.load_seconds * 1000:.0f} ms")
+        return self._model
+
+    def generate_content(self, *args, **kwargs):
+        return self.load().generate_content(*args, **kwargs)
+
+    async def warm(self, delay: float = 0.0) -> None:
+        """Fonda oldindan yuklash (`delay` - birinchi update'lar avval javob olsin)"""
+        if delay > 0:
+            await asyncio.sleep(delay)
+        if self._model is not None:
+            return
+        try:
+            await asyncio.to_thread(self.load)
+        except Exception as e:
+            # Keyingi generate_content() qayta urinadi
+            logger.error(f"Gemini SDK yuklanmadi: {e!r}")
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            'loaded': int(self.loaded),
+            'load_ms': round(self.load_seconds * 1000, 1)
+        }
@@ -0,0 +1,194 @@
+import os
+import json
+import zlib
+import random
+from functools import lru_cache
+from typing import Any, List, NamedTuple, Optional, Tuple
+
+from telegram.helpers import escape_markdown
+
+from response_cache import Fetcher, ResponseCache
+
+# Kohorta: kunlik kaloriya shu qadam bilan yaxlitlanadi (x maqsad x jins)
+MEAL_PLAN_CALORIE_STEP = int(os.getenv("MEAL_PLAN_CALORIE_STEP", "200"))
+# Har kohorta uchun variantlar, ularning yashash vaqti va kohortalar soni
+MEAL_PLAN_VARIANTS = int(os.getenv("MEAL_PLAN_VARIANTS", "4"))
+MEAL_PLAN_TTL = float(os.getenv("MEAL_PLAN_TTL", str(7 * 24 * 3600)))
+MEAL_PLAN_CACHE_SIZE = int(os.getenv("MEAL_PLAN_CACHE_SIZE", "256"))
+# Kohorta rejasiga Gemini'dan qisqa shaxsiy izoh (har ko'rishda bitta qo'shimcha so'rov)
+MEAL_PLAN_PERSONALIZE = os.getenv("MEAL_PLAN_PERSONALIZE", "0") == "1"
+
+# Modeldan kelgan rejaga chegaralar (Telegram xabari 4096 belgidan oshmasligi uchun ham)
+MIN_MEALS, MAX_MEALS = 2, 8
+MAX_INGREDIENTS = 8
+MAX_NAME_CHARS = 40
+MAX_DISH_CHARS = 80
+MAX_MEAL_KCAL = 3000
+# Kaloriya shu ulushdan kam farq qilsa reja o'zgartirilmaydi
+PERSONALIZE_TOLERANCE = 0.03
+
+
+class Cohort(NamedTuple):
+    """Bir xil reja oladigan foydalanuvchilar guruhi"""
+    calories: int
+    goal: str
+    gender: str
+
+
+class Meal(NamedTuple):
+    name: str
+    dish: str
+    kcal: int
+    ingredients: Tuple[str, ...]
+
+
+class MealPlan(NamedTuple):
+    """Tekshirilgan reja; `id` - ixcham JSON'ning crc32 si (restartdan keyin ham bir xil)"""
+    id: int
+    kcal: int
+    meals: Tuple[Meal, ...]
+
+
+def cohort(calories: int, goal: Optional[str], gender: Optional[str],
+           step: int = MEAL_PLAN_CALORIE_STEP) -> Cohort:
+    bucket = max(step, int(round(calories / step)) * step)
+    return Cohort(bucket, goal or "maintain", gender or "-")
+
+
+def _clean(value: Any, limit: int) -> str:
+    if isinstance(value, dict):
+        # {"name": "guruch", "amount": "100 g"} kabi masalliqlar
+        value = " ".join(str(part) for part in value.values() if part)
+    if not isinstance(value, (str, int, float)) or isinstance(value, bool):
+        raise ValueError(f"matn kutilgan: {value!r}")
+    text = " ".join(str(value).split())
+    if not text:
+        raise ValueError("bo'sh maydon")
+    return text[:limit]
+
+
+def _kcal(value: Any) -> int:
+    try:
+        kcal = int(round(float(value)))
+    except (TypeError, ValueError):
+        raise ValueError(f"kcal raqam emas: {value!r}") from None
+    if isinstance(value, bool) or not 0 < kcal <= MAX_MEAL_KCAL:
+        raise ValueError(f"kcal noto'g'ri: {value!r}")
+    return kcal
+
+
+def _meal(item: Any) -> Meal:
+    if not isinstance(item, dict):
+        raise ValueError("taom obyekt emas")
+    ingredients = item.get("ingredients") or []
+    if isinstance(ingredients, str):
+        ingredients = ingredients.split(",")
+    if not isinstance(ingredients, list):
+        raise ValueError("ingredients ro'yxat emas")
+    return Meal(
+        _clean(item.get("name"), MAX_NAME_CHARS),
+        _clean(item.get("dish"), MAX_DISH_CHARS),
+        _kcal(item.get("kcal")),
+        tuple(_clean(part, MAX_NAME_CHARS) for part in ingredients[:MAX_INGREDIENTS]
+              if str(part).strip())
+    )
+
+
+def _dumps(meals: Tuple[Meal, ...]) -> str:
+    return json.dumps({"meals": [
+        {"name": meal.name, "dish": meal.dish, "kcal": meal.kcal, "ingredients": list(meal.ingredients)}
+        for meal in meals
+    ]}, ensure_ascii=False, separators=(",", ":"))
+
+
+def _plan(meals: Tuple[Meal, ...]) -> MealPlan:
+    return MealPlan(zlib.crc32(_dumps(meals).encode()), sum(meal.kcal for meal in meals), meals)
+
+
+def parse_plan(text: str) -> MealPlan:
+    """Gemini javobidan rejani olish (```json``` o'rami va izohlar tashlanadi).
+
+    Tuzilma noto'g'ri bo'lsa ValueError - bunday javob keshga tushmaydi.
+    """
+    start, end = text.find("{"), text.rfind("}")
+    if start < 0 or end < start:
+        raise ValueError("javobda JSON yo'q")
+    data = json.loads(text[start:end + 1])
+    meals = data.get("meals") if isinstance(data, dict) else None
+    if not isinstance(meals, list) or not MIN_MEALS <= len(meals) <= MAX_MEALS:
+        raise ValueError("meals ro'yxati noto'g'ri")
+    return _plan(tuple(_meal(item) for item in meals))
+
+
+def normalize(text: str) -> str:
+    """Gemini javobini keshda saqlanadigan ixcham JSON'ga aylantirish"""
+    return _dumps(parse_plan(text).meals)
+
+
+@lru_cache(maxsize=MEAL_PLAN_CACHE_SIZE * MEAL_PLAN_VARIANTS)
+def load_plan(text: str) -> MealPlan:
+    """normalize() natijasidan reja (bir xil variant qayta tahlil qilinmaydi)"""
+    return parse_plan(text)
+
+
+def personalize(plan: MealPlan, calories: int) -> MealPlan:
+    """Kohorta rejasi kaloriyasini foydalanuvchining aniq kaloriyasiga moslash"""
+    if not plan.kcal or abs(calories / plan.kcal - 1) < PERSONALIZE_TOLERANCE:
+        return plan
+    factor = calories / plan.kcal
+    meals = tuple(meal._replace(kcal=int(round(meal.kcal * factor, -1))) for meal in plan.meals)
+    return MealPlan(plan.id, sum(meal.kcal for meal in meals), meals)
+
+
+def format_plan(plan: MealPlan) -> str:
+    lines = []
+    for meal in plan.meals:
+        lines.append(f"🍽 **{escape_markdown(meal.name)}** - {meal.kcal} kcal\n{escape_markdown(meal.dish)}")
+        if meal.ingredients:
+            lines.append(f"_{escape_markdown(', '.join(meal.ingredients))}_")
+        lines.append("")
+    lines.append(f"🔥 Jami: {plan.kcal} kcal")
+    return "\n".join(lines)
+
+
+def summary(plan: MealPlan) -> List:
+    """Ko'rsatilgan reja: [id, kcal, [taomlar]] (user_data va meal_history uchun)"""
+    return [plan.id, plan.kcal, [meal.dish for meal in plan.meals]]
+
+
+class MealPlanCache(ResponseCache):
+    """Kohorta prompti -> tayyor rejalar (ixcham JSON variantlari).
+
+    Prompt faqat kohorta maydonlaridan yig'iladi, shuning uchun u keshning
+    kaliti ham bo'ladi: bir kohortadagi barcha foydalanuvchilar Gemini'ga
+    so'rov yubormasdan bir xil variantlar poolidan reja oladi. TTL, LRU va
+    stale-while-revalidate ResponseCache'dagidek.
+    """
+
+    def __init__(self, max_prompts: int = MEAL_PLAN_CACHE_SIZE, ttl: float = MEAL_PLAN_TTL,
+                 variants: int = MEAL_PLAN_VARIANTS):
+        super().__init__(max_prompts, ttl, variants)
+
+    def has(self, key: str) -> bool:
+        """Kohorta uchun (eskirgan bo'lsa ham) reja bormi"""
+        return key in self._entries
+
+    async def plan(self, key: str, fetch: Fetcher) -> MealPlan:
+        return load_plan(await self.get_or_fetch(key, fetch))
+
+    async def another(self, key: str, fetch: Fetcher, exclude: Optional[int]) -> MealPlan:
+        """"Yangi reja": ko'rsatilganidan boshqa variant, qolmagan bo'lsa modeldan yangisi"""
+        others = [text for text in self._fresh(key) if load_plan(text).id != exclude]
+        if others:
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return load_plan(random.choice(others))
+        self.misses += 1
+        text = await fetch(key)
+        self.put(key, text)
+        return load_plan(text)
+
+    async def ensure(self, key: str, fetch: Fetcher) -> None:
+        """Oldindan tayyorlash: kohortada yangi variant bo'lmasa bittasini olish"""
+        if not self._fresh(key):
+            self.put(key, await fetch(key))
@@ -0,0 +1,235 @@
+import os
+import time
+import asyncio
+import logging
+import functools
+from bisect import bisect_left
+from typing import Callable, Dict, List, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+# Umumiy statistika log'ga qancha vaqtda yoziladi (0 - yozilmaydi)
+METRICS_LOG_INTERVAL = float(os.getenv("METRICS_LOG_INTERVAL", "300"))
+# Event loop kechikishini o'lchash oralig'i
+LOOP_LAG_INTERVAL = float(os.getenv("LOOP_LAG_INTERVAL", "0.5"))
+
+PREFIX = "health_bot_"
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+SIZE_BUCKETS = (64, 256, 512, 1024, 2048, 4096, 8192, 16384, 32768)
+TOKEN_BUCKETS = (32, 64, 128, 256, 512, 1024, 2048, 4096, 8192)
+
+
+class Histogram:
+    """Qat'iy chegarali histogram: observe() faqat bisect va qo'shish"""
+    __slots__ = ('bounds', 'counts', 'sum', 'count')
+
+    def __init__(self, bounds: Sequence[float]):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q: float) -> float:
+        """Taxminiy kvantil (tegishli bucket'ning yuqori chegarasi)"""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(self.bounds, self.counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return float("inf")
+
+
+class Counter:
+    __slots__ = ('value',)
+
+    def __init__(self):
+        self.value = 0
+
+    def inc(self, amount: int = 1) -> None:
+        self.value += amount
+
+
+class Family:
+    """Bitta label bo'yicha ajratilgan metrikalar oilasi.
+
+    Bola metrikalar `labels()` orqali bir marta olinadi va saqlab qo'yiladi,
+    shuning uchun issiq yo'lda lug'at qidiruvi ham bo'lmaydi.
+    """
+
+    def __init__(self, name: str, help_text: str, kind: str, label: str = "",
+                 buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.name = PREFIX + name
+        self.help = help_text
+        self.kind = kind
+        self.label = label
+        self.buckets = tuple(buckets)
+        self.children: Dict[str, object] = {}
+
+    def labels(self, value: str = ""):
+        child = self.children.get(value)
+        if child is None:
+            child = Histogram(self.buckets) if self.kind == "histogram" else Counter()
+            self.children[value] = child
+        return child
+
+    def _label(self, value: str, extra: str = "") -> str:
+        parts = [f'{self.label}="{value}"'] if self.label else []
+        if extra:
+            parts.append(extra)
+        return "{" + ",".join(parts) + "}" if parts else ""
+
+    def render(self, lines: List[str]) -> None:
+        lines.append(f"# HELP {self.name} {self.help}")
+        lines.append(f"# TYPE {self.name} {self.kind}")
+        for value, child in sorted(self.children.items()):
+            if self.kind == "counter":
+                lines.append(f"{self.name}{self._label(value)} {child.value}")
+                continue
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), child.counts):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(float(bound))
+                le_label = f'le="{le}"'
+                lines.append(f"{self.name}_bucket{self._label(value, le_label)} {cumulative}")
+            lines.append(f"{self.name}_sum{self._label(value)} {child.sum}")
+            lines.append(f"{self.name}_count{self._label(value)} {child.count}")
+
+
+class Registry:
+    """Barcha metrikalar va ularni Prometheus matni / log ko'rinishiga chiqarish"""
+
+    def __init__(self):
+        self.families: List[Family] = []
+        # nom -> stats() funksiyasi; qiymatlari so'ralgan paytda gauge sifatida olinadi
+        self.sources: Dict[str, Callable[[], Dict]] = {}
+
+    def histogram(self, name: str, help_text: str, label: str = "",
+                  buckets: Sequence[float] = LATENCY_BUCKETS) -> Family:
+        family = Family(name, help_text, "histogram", label, buckets)
+        self.families.append(family)
+        return family
+
+    def counter(self, name: str, help_text: str, label: str = "") -> Family:
+        family = Family(name, help_text, "counter", label)
+        self.families.append(family)
+        return family
+
+    def add_source(self, name: str, stats: Callable[[], Dict]) -> None:
+        self.sources[name] = stats
+
+    def render(self) -> str:
+        """Prometheus text exposition formati"""
+        lines: List[str] = []
+        for family in self.families:
+            if family.children:
+                family.render(lines)
+        for source, stats in self.sources.items():
+            for key, value in stats().items():
+                if isinstance(value, (int, float)) and not isinstance(value, bool):
+                    name = f"{PREFIX}{source}_{key}"
+                    lines.append(f"# TYPE {name} gauge")
+                    lines.append(f"{name} {value}")
+        lines.append("")
+        return "\n".join(lines)
+
+    def summary(self) -> str:
+        """Log uchun qisqa ko'rinish: soni, p50/p95 histogramlar uchun"""
+        parts = []
+        for family in self.families:
+            for value, child in sorted(family.children.items()):
+                name = f"{family.name[len(PREFIX):]}[{value}]" if value else family.name[len(PREFIX):]
+                if family.kind == "counter":
+                    if child.value:
+                        parts.append(f"{name}={child.value}")
+                elif child.count:
+                    parts.append(f"{name} n={child.count} p50<={child.quantile(0.5)} "
+                                 f"p95<={child.quantile(0.95)}")
+        return "; ".join(parts)
+
+
+registry = Registry()
+
+HANDLER_SECONDS = registry.histogram("handler_seconds", "Handler bajarilish vaqti", "handler")
+HANDLER_ERRORS = registry.counter("handler_errors_total", "Handlerdagi xatolar", "handler")
+LLM_SECONDS = registry.histogram("llm_seconds", "Gemini javobi to'liq kelguncha", "mode")
+LLM_FIRST_CHUNK_SECONDS = registry.histogram("llm_first_chunk_seconds",
+                                             "Stream rejimida birinchi bo'lakkacha")
+LLM_PROMPT_CHARS = registry.histogram("llm_prompt_chars", "Prompt uzunligi (belgi)",
+                                      buckets=SIZE_BUCKETS)
+LLM_PROMPT_TOKENS = registry.histogram("llm_prompt_tokens",
+                                       "Prompt tokenlari (taxminiy, tizim prompti bilan)",
+                                       buckets=TOKEN_BUCKETS)
+LLM_RESPONSE_CHARS = registry.histogram("llm_response_chars", "Javob uzunligi (belgi)",
+                                        buckets=SIZE_BUCKETS)
+LLM_FAILURES = registry.counter("llm_failures_total", "Gemini xatolari", "reason")
+LOOP_LAG_SECONDS = registry.histogram("event_loop_lag_seconds", "Event loop kechikishi")
+
+
+def timed(handler: Callable, name: Optional[str] = None) -> Callable:
+    """Async handlerni vaqt va xato hisobi bilan o'rash"""
+    name = name or handler.__name__
+    histogram = HANDLER_SECONDS.labels(name)
+    errors = HANDLER_ERRORS.labels(name)
+
+    @functools.wraps(handler)
+    async def wrapper(*args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return await handler(*args, **kwargs)
+        except Exception:
+            errors.inc()
+            raise
+        finally:
+            histogram.observe(time.perf_counter() - started)
+
+    return wrapper
+
+
+class MetricsReporter:
+    """Fon vazifalari: event loop kechikishini o'lchash va davriy log"""
+
+    def __init__(self, registry: Registry = registry, lag_interval: float = LOOP_LAG_INTERVAL,
+                 log_interval: float = METRICS_LOG_INTERVAL):
+        self.registry = registry
+        self.lag_interval = lag_interval
+        self.log_interval = log_interval
+        self._tasks: List[asyncio.Task] = []
+
+    async def _lag_loop(self) -> None:
+        loop = asyncio.get_running_loop()
+        lag = LOOP_LAG_SECONDS.labels()
+        while True:
+            started = loop.time()
+            await asyncio.sleep(self.lag_interval)
+            lag.observe(max(0.0, loop.time() - started - self.lag_interval))
+
+    async def _log_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.log_interval)
+            logger.info(f"Metrikalar: {self.registry.summary()}")
+
+    def start(self) -> None:
+        if self._tasks:
+            return
+        if self.lag_interval > 0:
+            self._tasks.append(asyncio.create_task(self._lag_loop()))
+        if self.log_interval > 0:
+            self._tasks.append(asyncio.create_task(self._log_loop()))
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        for task in self._tasks:
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._tasks = []
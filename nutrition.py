@@ -0,0 +1,204 @@
+from array import array
+from functools import lru_cache
+from typing import Dict, Iterable, NamedTuple, Optional
+
+
+# Faollik koeffitsientlari (Mifflin-St Jeor BMR ga ko'paytiriladi)
+ACTIVITY_MULTIPLIERS = {
+    "sedentary": 1.2,
+    "light": 1.375,
+    "moderate": 1.55,
+    "active": 1.725,
+    "very_active": 1.9
+}
+DEFAULT_ACTIVITY_MULTIPLIER = 1.55
+
+# Maqsad bo'yicha kunlik kaloriya o'zgarishi
+GOAL_ADJUSTMENTS = {
+    "lose_weight": -500,
+    "maintain": 0,
+    "gain_muscle": 300
+}
+
+# Maqsad bo'yicha makro taqsimoti: (oqsil, uglevod, yog') kaloriya ulushi
+MACRO_SPLITS = {
+    "lose_weight": (0.30, 0.40, 0.30),
+    "maintain": (0.25, 0.50, 0.25),
+    "gain_muscle": (0.30, 0.45, 0.25)
+}
+DEFAULT_MACRO_SPLIT = MACRO_SPLITS["maintain"]
+
+# 1 gramm uchun kaloriya
+KCAL_PER_GRAM = (4, 4, 9)
+
+# Profil to'liq bo'lmaganda ishlatiladigan kaloriya
+DEFAULT_CALORIES = 2000
+
+GOALS = tuple(GOAL_ADJUSTMENTS)
+
+
+class NutritionResult(NamedTuple):
+    """Bitta profil uchun hisoblangan ko'rsatkichlar"""
+    bmi: float
+    bmr: float
+    tdee: float
+    calories: int
+    protein_g: int
+    carbs_g: int
+    fat_g: int
+
+
+def calculate_bmi(weight: Optional[float], height: Optional[float]) -> float:
+    """BMI hisoblab berish"""
+    if weight and height:
+        height_m = height / 100
+        return round(weight / (height_m ** 2), 2)
+    return 0
+
+
+def calculate_bmr(weight: float, height: float, age: float, gender: str) -> float:
+    """Mifflin-St Jeor bo'yicha bazal metabolizm"""
+    bmr = 10 * weight + 6.25 * height - 5 * age
+    return bmr + 5 if gender == "male" else bmr - 161
+
+
+def macros(calories: float, goal: Optional[str]) -> tuple:
+    """Kaloriyani maqsadga qarab oqsil/uglevod/yog' grammlariga bo'lish"""
+    split = MACRO_SPLITS.get(goal, DEFAULT_MACRO_SPLIT)
+    return tuple(int(calories * share / kcal) for share, kcal in zip(split, KCAL_PER_GRAM))
+
+
+@lru_cache(maxsize=4096)
+def calculate(weight: Optional[float], height: Optional[float], age: Optional[int],
+              gender: Optional[str], activity_level: Optional[str],
+              goal: Optional[str]) -> NutritionResult:
+    """Profil maydonlaridan barcha ko'rsatkichlarni hisoblash"""
+    bmi = calculate_bmi(weight, height)
+    if not all([weight, height, age, gender]):
+        return NutritionResult(bmi, 0.0, 0.0, DEFAULT_CALORIES,
+                               *macros(DEFAULT_CALORIES, goal))
+
+    bmr = calculate_bmr(weight, height, age, gender)
+    tdee = bmr * ACTIVITY_MULTIPLIERS.get(activity_level, DEFAULT_ACTIVITY_MULTIPLIER)
+    calories = int(tdee + GOAL_ADJUSTMENTS.get(goal, 0))
+    return NutritionResult(bmi, bmr, tdee, calories, *macros(calories, goal))
+
+
+class ProfileColumns:
+    """Ko'p profil uchun ustunli (array) ma'lumotlar.
+
+    Yetishmayotgan qiymatlar 0 bilan saqlanadi; `complete` ustuni hisob
+    uchun yetarli ma'lumot bor-yo'qligini bildiradi.
+    """
+
+    def __init__(self):
+        self.weight = array('d')
+        self.height = array('d')
+        self.age = array('d')
+        self.is_male = array('b')
+        self.activity = array('d')
+        self.adjustment = array('d')
+        self.goal = array('b')
+        self.complete = array('b')
+
+    def __len__(self) -> int:
+        return len(self.weight)
+
+    def append(self, weight, height, age, gender, activity_level, goal) -> None:
+        self.weight.append(weight or 0.0)
+        self.height.append(height or 0.0)
+        self.age.append(age or 0.0)
+        self.is_male.append(gender == "male")
+        self.activity.append(ACTIVITY_MULTIPLIERS.get(activity_level, DEFAULT_ACTIVITY_MULTIPLIER))
+        self.adjustment.append(GOAL_ADJUSTMENTS.get(goal, 0))
+        self.goal.append(GOALS.index(goal) if goal in GOALS else GOALS.index("maintain"))
+        self.complete.append(bool(weight and height and age and gender))
+
+    @classmethod
+    def from_profiles(cls, profiles: Iterable) -> "ProfileColumns":
+        columns = cls()
+        for p in profiles:
+            columns.append(p.weight, p.height, p.age, p.gender, p.activity_level, p.goal)
+        return columns
+
+
+@lru_cache(maxsize=None)
+def numpy_module():
+    """numpy faqat batch hisobda kerak - bot importini sekinlashtirmasligi uchun shu yerda yuklanadi.
+
+    numpy bo'lmasa None: batch hisob oddiy tsiklda bajariladi.
+    """
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
+
+
+def _batch_numpy(c: ProfileColumns) -> Dict[str, "numpy.ndarray"]:
+    np = numpy_module()
+    weight = np.frombuffer(c.weight, dtype=np.float64)
+    height = np.frombuffer(c.height, dtype=np.float64)
+    age = np.frombuffer(c.age, dtype=np.float64)
+    is_male = np.frombuffer(c.is_male, dtype=np.int8).astype(bool)
+    complete = np.frombuffer(c.complete, dtype=np.int8).astype(bool)
+    goal = np.frombuffer(c.goal, dtype=np.int8)
+
+    height_m = height / 100
+    with np.errstate(divide='ignore', invalid='ignore'):
+        bmi = np.where((weight > 0) & (height > 0), np.round(weight / height_m ** 2, 2), 0.0)
+    bmr = 10 * weight + 6.25 * height - 5 * age + np.where(is_male, 5.0, -161.0)
+    bmr = np.where(complete, bmr, 0.0)
+    tdee = bmr * np.frombuffer(c.activity, dtype=np.float64)
+    calories = np.where(
+        complete,
+        np.trunc(tdee + np.frombuffer(c.adjustment, dtype=np.float64)),
+        DEFAULT_CALORIES
+    )
+
+    splits = np.array([MACRO_SPLITS[g] for g in GOALS])[goal]
+    kcal = np.array(KCAL_PER_GRAM, dtype=np.float64)
+    grams = np.trunc(calories[:, None] * splits / kcal)
+    return {
+        'bmi': bmi, 'bmr': bmr, 'tdee': tdee, 'calories': calories,
+        'protein_g': grams[:, 0], 'carbs_g': grams[:, 1], 'fat_g': grams[:, 2]
+    }
+
+
+def _batch_python(c: ProfileColumns) -> Dict[str, array]:
+    out = {name: array('d', bytes(8 * len(c))) for name in
+           ('bmi', 'bmr', 'tdee', 'calories', 'protein_g', 'carbs_g', 'fat_g')}
+    bmi_col, bmr_col, tdee_col = out['bmi'], out['bmr'], out['tdee']
+    cal_col, p_col, c_col, f_col = out['calories'], out['protein_g'], out['carbs_g'], out['fat_g']
+    splits = [MACRO_SPLITS[g] for g in GOALS]
+    p_kcal, c_kcal, f_kcal = KCAL_PER_GRAM
+
+    for i in range(len(c)):
+        weight, height = c.weight[i], c.height[i]
+        if weight and height:
+            height_m = height / 100
+            bmi_col[i] = round(weight / (height_m * height_m), 2)
+        if c.complete[i]:
+            bmr = 10 * weight + 6.25 * height - 5 * c.age[i] + (5 if c.is_male[i] else -161)
+            tdee = bmr * c.activity[i]
+            calories = float(int(tdee + c.adjustment[i]))
+            bmr_col[i], tdee_col[i] = bmr, tdee
+        else:
+            calories = DEFAULT_CALORIES
+        cal_col[i] = calories
+        protein, carbs, fat = splits[c.goal[i]]
+        p_col[i] = int(calories * protein / p_kcal)
+        c_col[i] = int(calories * carbs / c_kcal)
+        f_col[i] = int(calories * fat / f_kcal)
+    return out
+
+
+def batch_calculate(columns: ProfileColumns, use_numpy: bool = True) -> Dict[str, object]:
+    """Minglab profil uchun BMI/BMR/TDEE/kaloriya/makrolarni birdaniga hisoblash.
+
+    numpy o'rnatilgan bo'lsa vektorlashtirilgan yo'l, aks holda array
+    ustunlari bo'ylab bitta tsikl ishlatiladi.
+    """
+    if use_numpy and numpy_module() is not None:
+        return _batch_numpy(columns)
+    return _batch_python(columns)
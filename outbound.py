@@ -0,0 +1,200 @@
+import os
+import time
+import heapq
+import asyncio
+import itertools
+import logging
+from typing import Any, Callable, Coroutine, Dict, List, Optional, Tuple
+
+from telegram.error import RetryAfter
+from telegram.ext import BaseRateLimiter
+
+from rate_limit import TokenBucket
+
+logger = logging.getLogger(__name__)
+
+# Telegram limitlari: bot bo'yicha ~30 xabar/s, bitta chatga ~1 xabar/s, guruhga 20 xabar/daqiqa.
+# Istalgan 1 soniyada burst + rate tadan ko'p xabar ketmaydi.
+OUTBOUND_GLOBAL_RATE = float(os.getenv("OUTBOUND_GLOBAL_RATE", "25"))
+OUTBOUND_GLOBAL_BURST = float(os.getenv("OUTBOUND_GLOBAL_BURST", "5"))
+OUTBOUND_CHAT_RATE = float(os.getenv("OUTBOUND_CHAT_RATE", "1"))
+OUTBOUND_CHAT_BURST = float(os.getenv("OUTBOUND_CHAT_BURST", "2"))
+OUTBOUND_GROUP_RATE = float(os.getenv("OUTBOUND_GROUP_RATE", str(20 / 60)))
+OUTBOUND_GROUP_BURST = float(os.getenv("OUTBOUND_GROUP_BURST", "3"))
+# RetryAfter (429) dan keyin shuncha marta qayta yuboriladi
+OUTBOUND_MAX_RETRIES = int(os.getenv("OUTBOUND_MAX_RETRIES", "3"))
+OUTBOUND_MAX_TRACKED_CHATS = int(os.getenv("OUTBOUND_MAX_TRACKED_CHATS", "10000"))
+
+# Ustuvorlik (`rate_limit_args`): kichik son - oldinroq
+INTERACTIVE, BULK = 0, 1
+
+
+def retry_after_seconds(error: RetryAfter) -> float:
+    """RetryAfter.retry_after soniyalarda (PTB versiyasiga qarab int yoki timedelta)"""
+    wait = error.retry_after
+    return wait.total_seconds() if hasattr(wait, "total_seconds") else float(wait)
+
+Callback = Callable[..., Coroutine[Any, Any, Any]]
+
+
+def _is_message(endpoint: str) -> bool:
+    """Chatga xabar chiqaradigan metodlar (answerCallbackQuery, getMe va h.k. limitsiz)"""
+    return endpoint.startswith(("send", "edit", "copyMessage", "forwardMessage"))
+
+
+class OutboundLimiter(BaseRateLimiter):
+    """Bot API so'rovlari uchun Telegram flood limitlarini hisobga oluvchi navbat.
+
+    Barcha `reply_text`/`edit_message_text`/`send_message` chaqiriqlari
+    ExtBot orqali shu yerdan o'tadi. Avval chat limiti (bitta chatning
+    xabarlari kelish tartibida), keyin global limit kutiladi; global
+    navbatda ustuvorlik bo'yicha chiqariladi, shuning uchun foydalanuvchiga
+    javoblar (INTERACTIVE, standart) ommaviy eslatmalardan (BULK,
+    `rate_limit_args=BULK`) oldin ketadi. RetryAfter kelsa, global navbat
+    (va o'sha chat) ko'rsatilgan vaqtga to'xtatiladi va so'rov qayta
+    yuboriladi - Telegram 429 ning sababini (chat yoki bot) aytmaydi.
+    """
+
+    def __init__(self, global_rate: float = OUTBOUND_GLOBAL_RATE,
+                 global_burst: float = OUTBOUND_GLOBAL_BURST,
+                 chat_rate: float = OUTBOUND_CHAT_RATE, chat_burst: float = OUTBOUND_CHAT_BURST,
+                 group_rate: float = OUTBOUND_GROUP_RATE, group_burst: float = OUTBOUND_GROUP_BURST,
+                 max_retries: int = OUTBOUND_MAX_RETRIES,
+                 max_tracked_chats: int = OUTBOUND_MAX_TRACKED_CHATS):
+        self.global_rate = global_rate
+        self.chat_rate = chat_rate
+        self.chat_burst = chat_burst
+        self.group_rate = group_rate
+        self.group_burst = group_burst
+        self.max_retries = max(0, max_retries)
+        self.max_tracked_chats = max_tracked_chats
+        self._global = TokenBucket(global_rate, global_burst)
+        self._chats: Dict[int, Tuple[TokenBucket, asyncio.Lock]] = {}
+        self._waiters: List[Tuple[int, int, asyncio.Future]] = []
+        self._seq = itertools.count()
+        self._pump: Optional[asyncio.Task] = None
+
+        self.sent = 0
+        self.throttled = 0
+        self.retried = 0
+        self.failed = 0
+        self.bulk = 0
+
+    async def initialize(self) -> None:
+        pass
+
+    async def shutdown(self) -> None:
+        if self._pump is not None:
+            self._pump.cancel()
+            self._pump = None
+        for _, _, future in self._waiters:
+            future.cancel()
+        self._waiters.clear()
+
+    # --- Chat limiti ---
+
+    def _chat(self, chat_id: int) -> Tuple[TokenBucket, asyncio.Lock]:
+        entry = self._chats.get(chat_id)
+        if entry is None:
+            if len(self._chats) >= self.max_tracked_chats:
+                self._prune()
+            if chat_id < 0:
+                bucket = TokenBucket(self.group_rate, self.group_burst)
+            else:
+                bucket = TokenBucket(self.chat_rate, self.chat_burst)
+            entry = self._chats[chat_id] = (bucket, asyncio.Lock())
+        return entry
+
+    def _prune(self) -> None:
+        """Limiti to'lgan va hech kim kutmayotgan chatlarni unutish"""
+        now = time.monotonic()
+        idle = [chat_id for chat_id, (bucket, lock) in self._chats.items()
+                if not lock.locked() and bucket.is_full(now)]
+        for chat_id in idle:
+            del self._chats[chat_id]
+
+    async def _wait_chat(self, chat_id: int) -> None:
+        bucket, lock = self._chat(chat_id)
+        async with lock:
+            while not bucket.try_acquire():
+                self.throttled += 1
+                await asyncio.sleep((1 - bucket.tokens) / bucket.rate)
+
+    # --- Global limit (ustuvorlik bilan) ---
+
+    async def _wait_global(self, priority: int) -> None:
+        if not self._waiters and self._global.try_acquire():
+            return
+        self.throttled += 1
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._seq), future))
+        if self._pump is None or self._pump.done():
+            self._pump = asyncio.create_task(self._run_pump())
+        await future
+
+    async def _run_pump(self) -> None:
+        """Global token bo'shashi bilan eng ustuvor kutayotgan so'rovni chiqarish"""
+        while self._waiters:
+            if self._waiters[0][2].cancelled():
+                heapq.heappop(self._waiters)
+                continue
+            if self._global.try_acquire():
+                heapq.heappop(self._waiters)[2].set_result(None)
+                continue
+            # Yangi so'rovlar shu orada navbatga tushadi, token bo'lganda eng ustuvori chiqadi
+            await asyncio.sleep((1 - self._global.tokens) / self._global.rate)
+
+    @staticmethod
+    def _penalize(bucket: TokenBucket, seconds: float) -> None:
+        """Keyingi token kamida `seconds` dan keyin bo'ladigan qilish"""
+        bucket.available()
+        bucket.tokens = min(bucket.tokens, 1 - seconds * bucket.rate)
+
+    async def process_request(self, callback: Callback, args: Any, kwargs: Dict[str, Any],
+                              endpoint: str, data: Dict[str, Any],
+                              rate_limit_args: Optional[int]) -> Any:
+        priority = INTERACTIVE if rate_limit_args is None else rate_limit_args
+        chat_id = data.get("chat_id")
+        if not isinstance(chat_id, int):
+            # "@kanal" kabi nomlar uchun alohida chat limiti yuritilmaydi
+            chat_id = None
+        limited = _is_message(endpoint)
+        if limited and priority != INTERACTIVE:
+            self.bulk += 1
+
+        for attempt in range(self.max_retries + 1):
+            if limited:
+                if chat_id is not None:
+                    await self._wait_chat(chat_id)
+                await self._wait_global(priority)
+            try:
+                result = await callback(*args, **kwargs)
+            except RetryAfter as e:
+                retry_after = retry_after_seconds(e)
+                if attempt == self.max_retries:
+                    self.failed += 1
+                    logger.warning(f"{endpoint}: {self.max_retries} marta RetryAfter, yuborilmadi")
+                    raise
+                self.retried += 1
+                logger.info(f"{endpoint}: RetryAfter {retry_after:.0f}s (chat {chat_id})")
+                if not limited:
+                    await asyncio.sleep(retry_after)
+                    continue
+                self._penalize(self._global, retry_after)
+                if chat_id is not None:
+                    self._penalize(self._chat(chat_id)[0], retry_after)
+                continue
+            if limited:
+                self.sent += 1
+            return result
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            'sent': self.sent,
+            'bulk': self.bulk,
+            'throttled': self.throttled,
+            'retried': self.retried,
+            'failed': self.failed,
+            'waiting': len(self._waiters),
+            'chats': len(self._chats)
+        }
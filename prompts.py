@@ -0,0 +1,129 @@
+import os
+import re
+import math
+import string
+from typing import Dict, Sequence, Union
+
+# Token taxmini: o'rtacha shuncha belgi = 1 token (Gemini'ning count_tokens'i tarmoq talab qiladi)
+PROMPT_CHARS_PER_TOKEN = float(os.getenv("PROMPT_CHARS_PER_TOKEN", "4"))
+# Bitta so'rovning kirish qismi uchun token chegarasi (tizim prompti ham kiradi)
+PROMPT_TOKEN_BUDGET = int(os.getenv("PROMPT_TOKEN_BUDGET", "2048"))
+
+_SPACES = re.compile(r"[ \t]+")
+_BLANK_LINES = re.compile(r"\n{3,}")
+_FORMATTER = string.Formatter()
+# "Kontekst: ...", "Savol: ..." yorliqlari va ajratgichlar
+_WRAPPER = "\n\nKontekst: \n\nSavol: "
+
+
+def compact(text: str) -> str:
+    """Qatorlar chetidagi va ichidagi ortiqcha bo'shliqlarni olib tashlash.
+
+    Kod ichidagi uch qo'shtirnoqli matnlarning chekinishi modelga
+    hech narsa bermaydi, lekin har so'rovda token sifatida yuboriladi.
+    Ketma-ket bo'sh qatorlar bittaga qisqartiriladi.
+    """
+    lines = [_SPACES.sub(" ", line).strip() for line in text.strip().splitlines()]
+    return _BLANK_LINES.sub("\n\n", "\n".join(lines))
+
+
+def estimate_tokens(text: str) -> int:
+    return math.ceil(len(text) / PROMPT_CHARS_PER_TOKEN) if text else 0
+
+
+class Template:
+    """Bir marta tahlil qilingan prompt shabloni.
+
+    Matn ro'yxatga olishda bir marta `compact()` qilinadi va tekshiriladi
+    (`str.format` sintaksisi, maydonlar faqat oddiy nomlar), render esa
+    tayyor matn ustida `format_map` (C darajasida) bilan bajariladi.
+    """
+    __slots__ = ('name', 'source', 'fields', 'static_tokens')
+
+    def __init__(self, name: str, source: str):
+        self.name = name
+        self.source = compact(source)
+        parts = list(_FORMATTER.parse(self.source))
+        for _, field, _, conversion in parts:
+            if field is not None and (not field.isidentifier() or conversion):
+                raise ValueError(f"{name}: '{{{field}}}' - faqat oddiy nomli maydonlar")
+        self.fields = frozenset(field for _, field, _, _ in parts if field)
+        self.static_tokens = estimate_tokens("".join(literal for literal, _, _, _ in parts))
+
+    def render(self, **values) -> str:
+        return self.source.format_map(values)
+
+
+class PromptRegistry:
+    """Shablonlar ro'yxati va Gemini'ga yuboriladigan matnni yig'ish.
+
+    Tizim prompti model darajasida (`system_instruction`) berilsa, u
+    so'rov matniga qo'shilmaydi. Aks holda (eski SDK) har so'rov boshiga
+    qisqartirilgan ko'rinishda qo'shiladi. So'rov `budget` tokendan
+    oshsa, avval eng eski kontekst bo'laklari tashlanadi, keyin savol
+    qisqartiriladi.
+    """
+
+    def __init__(self, system: str, system_in_model: bool = False,
+                 budget: int = PROMPT_TOKEN_BUDGET):
+        self.system = compact(system)
+        self.system_tokens = estimate_tokens(self.system)
+        self.system_in_model = system_in_model
+        self.budget = budget
+        self._templates: Dict[str, Template] = {}
+
+        self.requests = 0
+        self.tokens = 0
+        self.trimmed = 0
+
+    def register(self, name: str, source: str) -> Template:
+        template = self._templates[name] = Template(name, source)
+        return template
+
+    def __getitem__(self, name: str) -> Template:
+        return self._templates[name]
+
+    def render(self, name: str, **values) -> str:
+        return self._templates[name].render(**values)
+
+    def build(self, question: str, context: Union[str, Sequence[str]] = ()) -> str:
+        """(Tizim prompti) + kontekst + savol; `context` - eskidan yangiga bo'laklar"""
+        parts = [context] if isinstance(context, str) else list(context)
+        parts = [part for part in parts if part]
+        # Tizim prompti model darajasida bo'lsa ham kirish tokenlariga kiradi
+        budget = self.budget - self.system_tokens - estimate_tokens(_WRAPPER)
+        question_tokens = estimate_tokens(question)
+        if question_tokens > budget:
+            question = question[:int(max(0, budget) * PROMPT_CHARS_PER_TOKEN)]
+            question_tokens = estimate_tokens(question)
+            parts = []
+            self.trimmed += 1
+        budget -= question_tokens
+        used = sum(estimate_tokens(part) for part in parts)
+        if used > budget:
+            self.trimmed += 1
+            while parts and used > budget:
+                used -= estimate_tokens(parts.pop(0))
+
+        text = f"Savol: {question}"
+        if parts:
+            text = "Kontekst: " + "\n".join(parts) + "\n\n" + text
+        if not self.system_in_model:
+            text = f"{self.system}\n\n{text}"
+        self.requests += 1
+        self.tokens += self.request_tokens(text)
+        return text
+
+    def request_tokens(self, text: str) -> int:
+        """`build()` natijasi uchun kirish tokenlari (model darajasidagi tizim prompti bilan)"""
+        return estimate_tokens(text) + (self.system_tokens if self.system_in_model else 0)
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            'templates': len(self._templates),
+            'requests': self.requests,
+            'avg_tokens': round(self.tokens / self.requests, 1) if self.requests else 0.0,
+            'trimmed': self.trimmed,
+            'system_tokens': self.system_tokens,
+            'system_in_model': int(self.system_in_model)
+        }
@@ -0,0 +1,154 @@
+import os
+import time
+import asyncio
+import logging
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Limitlar: rate - sekundiga token, burst - bir zumda ruxsat etilgan so'rovlar
+LLM_USER_RATE = float(os.getenv("LLM_USER_RATE", "0.1"))
+LLM_USER_BURST = float(os.getenv("LLM_USER_BURST", "3"))
+LLM_GLOBAL_RATE = float(os.getenv("LLM_GLOBAL_RATE", "1"))
+LLM_GLOBAL_BURST = float(os.getenv("LLM_GLOBAL_BURST", "10"))
+LLM_MAX_TRACKED_USERS = int(os.getenv("LLM_MAX_TRACKED_USERS", "10000"))
+
+
+class RateLimited(Exception):
+    """So'rov limit tufayli rad etildi"""
+
+    def __init__(self, reason: str):
+        super().__init__(reason)
+        self.reason = reason
+
+
+class TokenBucket:
+    """Klassik token bucket: `rate` token/s, eng ko'pi `capacity` token"""
+
+    __slots__ = ('rate', 'capacity', 'tokens', 'updated')
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def available(self, now: Optional[float] = None) -> float:
+        self._refill(now if now is not None else time.monotonic())
+        return self.tokens
+
+    def try_acquire(self, amount: float = 1.0, now: Optional[float] = None) -> bool:
+        self._refill(now if now is not None else time.monotonic())
+        if self.tokens >= amount:
+            self.tokens -= amount
+            return True
+        return False
+
+    def is_full(self, now: float) -> bool:
+        return self.tokens + (now - self.updated) * self.rate >= self.capacity
+
+
+class LLMGate:
+    """LLM chaqiriqlari oldidagi darvoza: per-user va global limit + single-flight.
+
+    Bir foydalanuvchining bir xil so'rovi bajarilayotgan paytda qayta
+    kelsa, yangi chaqiriq qilinmaydi - birinchisining natijasi qaytadi.
+    `user_id=None` bo'lgan so'rovlar faqat global limitga bo'ysunadi.
+    """
+
+    def __init__(self, user_rate: float = LLM_USER_RATE, user_burst: float = LLM_USER_BURST,
+                 global_rate: float = LLM_GLOBAL_RATE, global_burst: float = LLM_GLOBAL_BURST,
+                 max_tracked_users: int = LLM_MAX_TRACKED_USERS):
+        self.user_rate = user_rate
+        self.user_burst = user_burst
+        self.max_tracked_users = max_tracked_users
+        self._global = TokenBucket(global_rate, global_burst)
+        self._users: Dict[int, TokenBucket] = {}
+        self._inflight: Dict[Tuple[Optional[int], Hashable], asyncio.Future] = {}
+
+        self.allowed = 0
+        self.throttled_user = 0
+        self.throttled_global = 0
+        self.coalesced = 0
+
+    def _prune(self, now: float) -> None:
+        """To'lib qolgan (ya'ni bo'sh turgan) foydalanuvchi bucketlarini o'chirish"""
+        idle = [user_id for user_id, bucket in self._users.items() if bucket.is_full(now)]
+        for user_id in idle:
+            del self._users[user_id]
+
+    def admit(self, user_id: Optional[int]) -> None:
+        """Limitni tekshirish va token olish (bo'lmasa RateLimited)"""
+        now = time.monotonic()
+        bucket = None
+        if user_id is not None:
+            bucket = self._users.get(user_id)
+            if bucket is None:
+                if len(self._users) >= self.max_tracked_users:
+                    self._prune(now)
+                bucket = self._users[user_id] = TokenBucket(self.user_rate, self.user_burst)
+            if bucket.available(now) < 1:
+                self.throttled_user += 1
+                raise RateLimited("user")
+        if not self._global.try_acquire(now=now):
+            self.throttled_global += 1
+            raise RateLimited("global")
+        if bucket is not None:
+            bucket.try_acquire(now=now)
+        self.allowed += 1
+
+    async def call(self, user_id: Optional[int], key: Hashable,
+                   fetch: Callable[[], Awaitable[Any]]) -> Any:
+        """`fetch()` ni limit va single-flight bilan bajarish"""
+        flight_key = (user_id, key)
+        existing = self._inflight.get(flight_key)
+        if existing is not None:
+            self.coalesced += 1
+            return await asyncio.shield(existing)
+
+        self.admit(user_id)
+        task = asyncio.ensure_future(fetch())
+        self._inflight[flight_key] = task
+        task.add_done_callback(lambda _: self._inflight.pop(flight_key, None))
+        return await asyncio.shield(task)
+
+    async def stream(self, user_id: Optional[int], key: Hashable,
+                     open_stream: Callable[[], AsyncIterator[str]]) -> AsyncIterator[str]:
+        """Oqimli javobni limit bilan uzatish.
+
+        Takroriy so'rov birinchi oqim tugashini kutadi va to'liq matnni
+        bitta bo'lak sifatida oladi.
+        """
+        flight_key = (user_id, key)
+        existing = self._inflight.get(flight_key)
+        if existing is not None:
+            self.coalesced += 1
+            yield await asyncio.shield(existing)
+            return
+
+        self.admit(user_id)
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[flight_key] = future
+        parts = []
+        try:
+            async for chunk in open_stream():
+                parts.append(chunk)
+                yield chunk
+        finally:
+            self._inflight.pop(flight_key, None)
+            if not future.done():
+                future.set_result("".join(parts))
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            'allowed': self.allowed,
+            'throttled_user': self.throttled_user,
+            'throttled_global': self.throttled_global,
+            'coalesced': self.coalesced,
+            'in_flight': len(self._inflight),
+            'tracked_users': len(self._users)
+        }
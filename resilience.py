@@ -0,0 +1,292 @@
+import os
+import time
+import random
+import asyncio
+import logging
+from collections import deque
+from functools import lru_cache
+from typing import AsyncIterator, Awaitable, Callable, Dict, Optional, TypeVar
+
+logger = logging.getLogger(__name__)
+
+# Bitta so'rov uchun umumiy muddat (barcha urinishlar bilan, soniya)
+GEMINI_DEADLINE = float(os.getenv("GEMINI_DEADLINE", "40"))
+GEMINI_RETRIES = int(os.getenv("GEMINI_RETRIES", "2"))
+GEMINI_BACKOFF_BASE = float(os.getenv("GEMINI_BACKOFF_BASE", "0.5"))
+GEMINI_BACKOFF_MAX = float(os.getenv("GEMINI_BACKOFF_MAX", "8"))
+# Ketma-ket shuncha xatodan keyin circuit ochiladi va shuncha soniya ochiq turadi
+CIRCUIT_FAILURES = int(os.getenv("CIRCUIT_FAILURES", "5"))
+CIRCUIT_RESET = float(os.getenv("CIRCUIT_RESET", "30"))
+# Hedged so'rovlar: javob p95 dan kechiksa ikkinchi nusxa yuboriladi (Gemini kvotasini oshiradi)
+GEMINI_HEDGE = os.getenv("GEMINI_HEDGE", "0") == "1"
+HEDGE_QUANTILE = float(os.getenv("HEDGE_QUANTILE", "0.95"))
+# Hedged so'rovlar chaqiriqlarning shu ulushidan oshmaydi
+HEDGE_BUDGET = float(os.getenv("HEDGE_BUDGET", "0.1"))
+HEDGE_MIN_SAMPLES = int(os.getenv("HEDGE_MIN_SAMPLES", "50"))
+
+T = TypeVar("T")
+# attempt(timeout) - bitta urinish, `timeout` soniya ichida tugashi kerak
+Attempt = Callable[[float], Awaitable[T]]
+
+
+@lru_cache(maxsize=None)
+def _retryable() -> tuple:
+    # google.api_core birinchi xatoda yuklanadi (bot importini sekinlashtirmasligi uchun);
+    # u vaqtda Gemini SDK odatda allaqachon yuklangan bo'ladi
+    retryable = (asyncio.TimeoutError, ConnectionError)
+    try:
+        from google.api_core import exceptions as google_exceptions
+    except ImportError:  # google-api-core o'rnatilmagan bo'lsa faqat tarmoq/timeout xatolari
+        return retryable
+    return retryable + (
+        google_exceptions.ServiceUnavailable, google_exceptions.TooManyRequests,
+        google_exceptions.InternalServerError, google_exceptions.DeadlineExceeded,
+        google_exceptions.RetryError
+    )
+
+
+def is_retryable(error: BaseException) -> bool:
+    """Vaqtinchalik xato (tarmoq, 429/5xx, timeout) - qayta urinish mumkin.
+
+    Noto'g'ri so'rov, ruxsat yoki xavfsizlik filtri xatolari takrorlansa
+    ham o'zgarmaydi.
+    """
+    return isinstance(error, _retryable())
+
+
+class CircuitOpen(Exception):
+    """Gemini ketma-ket xato qilmoqda, so'rov yuborilmadi"""
+
+
+class CircuitBreaker:
+    """Ketma-ket xatolar bo'yicha circuit breaker.
+
+    closed - so'rovlar o'tadi; `failures` ta ketma-ket xatodan keyin
+    open - `reset_timeout` soniya davomida darhol rad etiladi; keyin
+    half_open - bitta sinov so'rovi o'tadi: muvaffaqiyatli bo'lsa closed,
+    aks holda yana open.
+    """
+    CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+    def __init__(self, failures: int = CIRCUIT_FAILURES, reset_timeout: float = CIRCUIT_RESET):
+        self.failures = max(1, failures)
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self._consecutive = 0
+        self._opened_at = 0.0
+        self._probe_at = 0.0
+        self.opened = 0
+
+    @property
+    def is_open(self) -> bool:
+        return (self.state == self.OPEN
+                and time.monotonic() - self._opened_at < self.reset_timeout)
+
+    def allow(self) -> bool:
+        now = time.monotonic()
+        if self.state == self.CLOSED:
+            return True
+        if self.state == self.OPEN:
+            if now - self._opened_at < self.reset_timeout:
+                return False
+            self.state = self.HALF_OPEN
+            self._probe_at = now
+            return True
+        # half_open: sinov so'rovi javobsiz qolsa, keyingisiga ruxsat
+        if now - self._probe_at >= self.reset_timeout:
+            self._probe_at = now
+            return True
+        return False
+
+    def success(self) -> None:
+        self._consecutive = 0
+        if self.state != self.CLOSED:
+            logger.info("Gemini circuit yopildi")
+        self.state = self.CLOSED
+
+    def failure(self) -> None:
+        self._consecutive += 1
+        if self.state == self.HALF_OPEN or self._consecutive >= self.failures:
+            if self.state != self.OPEN:
+                self.opened += 1
+                logger.warning(f"Gemini circuit ochildi ({self._consecutive} ta ketma-ket xato)")
+            self.state = self.OPEN
+            self._opened_at = time.monotonic()
+
+
+class LatencyWindow:
+    """Oxirgi muvaffaqiyatli javoblar kechikishi (kvantil uchun)"""
+
+    def __init__(self, size: int = 500):
+        self._samples: deque = deque(maxlen=size)
+
+    def add(self, seconds: float) -> None:
+        self._samples.append(seconds)
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def quantile(self, q: float) -> float:
+        if not self._samples:
+            return 0.0
+        ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class ResilientClient:
+    """Gemini chaqiriqlari uchun muddat, qayta urinish, circuit breaker va hedging.
+
+    Urinish `attempt(timeout)` sifatida beriladi (masalan GeminiExecutor.run).
+    Vaqtinchalik xatolarda eksponensial kutish (full jitter) bilan qayta
+    uriniladi, lekin umumiy `deadline` dan oshmaydi. Circuit ochiq bo'lsa
+    `CircuitOpen` darhol ko'tariladi. Hedging yoqilgan bo'lsa, javob p95
+    dan kechiksa ikkinchi urinish parallel yuboriladi va birinchi kelgani
+    olinadi (ikkinchisining thread'i baribir oxirigacha ishlaydi).
+    """
+
+    def __init__(self, deadline: float = GEMINI_DEADLINE, attempt_timeout: float = GEMINI_DEADLINE,
+                 retries: int = GEMINI_RETRIES, backoff_base: float = GEMINI_BACKOFF_BASE,
+                 backoff_max: float = GEMINI_BACKOFF_MAX, breaker: Optional[CircuitBreaker] = None,
+                 hedge: bool = GEMINI_HEDGE, hedge_quantile: float = HEDGE_QUANTILE,
+                 hedge_budget: float = HEDGE_BUDGET, hedge_min_samples: int = HEDGE_MIN_SAMPLES):
+        self.deadline = deadline
+        self.attempt_timeout = attempt_timeout
+        self.retries = max(0, retries)
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.breaker = breaker or CircuitBreaker()
+        self.hedge = hedge
+        self.hedge_quantile = hedge_quantile
+        self.hedge_budget = hedge_budget
+        self.hedge_min_samples = hedge_min_samples
+        self.latency = LatencyWindow()
+
+        self.calls = 0
+        self.retried = 0
+        self.rejected = 0
+        self.failed = 0
+        self.hedged = 0
+        self.hedge_wins = 0
+
+    def _backoff(self, attempt: int) -> float:
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    def _admit(self) -> None:
+        if not self.breaker.allow():
+            self.rejected += 1
+            raise CircuitOpen("Gemini vaqtincha mavjud emas")
+
+    def _record(self, error: BaseException) -> None:
+        if is_retryable(error):
+            self.breaker.failure()
+        else:
+            # Javob keldi (masalan, noto'g'ri so'rov) - servis ishlayapti
+            self.breaker.success()
+
+    async def _retry_wait(self, attempt: int, deadline: float, error: BaseException) -> None:
+        """Keyingi urinishgacha kutish; imkon bo'lmasa xatoni qaytadan ko'tarish"""
+        loop = asyncio.get_running_loop()
+        delay = self._backoff(attempt)
+        if (attempt >= self.retries or not is_retryable(error)
+                or loop.time() + delay >= deadline or not self.breaker.allow()):
+            self.failed += 1
+            raise error
+        self.retried += 1
+        await asyncio.sleep(delay)
+
+    async def call(self, attempt: Attempt) -> T:
+        """`attempt` ni muddat, qayta urinish va circuit breaker bilan bajarish"""
+        self._admit()
+        self.calls += 1
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.deadline
+        number = 0
+        while True:
+            timeout = min(self.attempt_timeout, deadline - loop.time())
+            started = loop.time()
+            try:
+                result = await self._attempt(attempt, timeout)
+            except Exception as e:
+                self._record(e)
+                await self._retry_wait(number, deadline, e)
+                number += 1
+                continue
+            self.breaker.success()
+            self.latency.add(loop.time() - started)
+            return result
+
+    def _hedge_delay(self) -> Optional[float]:
+        if (not self.hedge or len(self.latency) < self.hedge_min_samples
+                or self.hedged >= self.calls * self.hedge_budget):
+            return None
+        return self.latency.quantile(self.hedge_quantile)
+
+    async def _attempt(self, attempt: Attempt, timeout: float) -> T:
+        if timeout <= 0:
+            raise asyncio.TimeoutError()
+        delay = self._hedge_delay()
+        if delay is None or delay >= timeout:
+            return await asyncio.wait_for(attempt(timeout), timeout)
+
+        first = asyncio.ensure_future(asyncio.wait_for(attempt(timeout), timeout))
+        done, _ = await asyncio.wait({first}, timeout=delay)
+        if done:
+            return first.result()
+        self.hedged += 1
+        second = asyncio.ensure_future(asyncio.wait_for(attempt(timeout - delay), timeout - delay))
+        pending = {first, second}
+        error: Optional[BaseException] = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is second:
+                            self.hedge_wins += 1
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def stream(self, open_stream: Callable[[float], AsyncIterator[str]]) -> AsyncIterator[str]:
+        """Oqimli javob: birinchi bo'lak kelguncha qayta urinish mumkin, keyin yo'q"""
+        self._admit()
+        self.calls += 1
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.deadline
+        number = 0
+        while True:
+            received = False
+            try:
+                async for chunk in open_stream(min(self.attempt_timeout, deadline - loop.time())):
+                    if not received:
+                        received = True
+                        self.breaker.success()
+                    yield chunk
+            except Exception as e:
+                self._record(e)
+                if received:
+                    self.failed += 1
+                    raise
+                await self._retry_wait(number, deadline, e)
+                number += 1
+                continue
+            # Oqim davomiyligi javob uzunligiga bog'liq - hedging kvantiliga qo'shilmaydi
+            self.breaker.success()
+            return
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            'state': self.breaker.state,
+            'circuit_open': int(self.breaker.state != CircuitBreaker.CLOSED),
+            'calls': self.calls,
+            'retried': self.retried,
+            'failed': self.failed,
+            'rejected': self.rejected,
+            'circuit_opened': self.breaker.opened,
+            'hedged': self.hedged,
+            'hedge_wins': self.hedge_wins,
+            'p95_ms': round(self.latency.quantile(0.95) * 1000, 1)
+        }
@@ -0,0 +1,125 @@
+import os
+import time
+import random
+import asyncio
+import logging
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Kesh sozlamalari
+ADVICE_CACHE_TTL = float(os.getenv("ADVICE_CACHE_TTL", str(6 * 3600)))
+ADVICE_CACHE_VARIANTS = int(os.getenv("ADVICE_CACHE_VARIANTS", "3"))
+ADVICE_CACHE_SIZE = int(os.getenv("ADVICE_CACHE_SIZE", "128"))
+
+Fetcher = Callable[[str], Awaitable[str]]
+
+
+class ResponseCache:
+    """Prompt bo'yicha javob keshi: TTL, LRU va har prompt uchun N ta variant.
+
+    Eskirgan variant bo'lsa ham darhol qaytariladi, yangisi esa fonda
+    olinadi (stale-while-revalidate). Pool to'lmagan bo'lsa, har bir hitdan
+    keyin fonda yana bitta variant qo'shiladi.
+    """
+
+    def __init__(self, max_prompts: int = ADVICE_CACHE_SIZE,
+                 ttl: float = ADVICE_CACHE_TTL,
+                 variants: int = ADVICE_CACHE_VARIANTS):
+        self.max_prompts = max(1, max_prompts)
+        self.ttl = ttl
+        self.variants = max(1, variants)
+        # prompt -> [(yaratilgan vaqt, javob), ...]
+        self._entries: "OrderedDict[str, List[Tuple[float, str]]]" = OrderedDict()
+        self._pending: Set[str] = set()
+        self._tasks: Set[asyncio.Task] = set()
+
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.fetch_errors = 0
+
+    def _fresh(self, key: str) -> List[str]:
+        now = time.monotonic()
+        return [text for created, text in self._entries.get(key, ())
+                if now - created < self.ttl]
+
+    def get(self, key: str) -> Optional[str]:
+        """Keshdan yangi variantni olish (eskirganlar hisobga olinmaydi)"""
+        fresh = self._fresh(key)
+        if not fresh:
+            return None
+        self._entries.move_to_end(key)
+        return random.choice(fresh)
+
+    def put(self, key: str, value: str) -> None:
+        now = time.monotonic()
+        pool = [(created, text) for created, text in self._entries.get(key, ())
+                if now - created < self.ttl]
+        pool.append((now, value))
+        self._entries[key] = pool[-self.variants:]
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_prompts:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    async def get_or_fetch(self, key: str, fetch: Fetcher) -> str:
+        """Keshdan javob qaytarish, bo'lmasa modeldan olib saqlash"""
+        fresh = self._fresh(key)
+        if fresh:
+            self.hits += 1
+            self._entries.move_to_end(key)
+            if len(fresh) < self.variants:
+                self._refill(key, fetch)
+            return random.choice(fresh)
+
+        stale = self._entries.get(key)
+        if stale:
+            self.stale_hits += 1
+            self._entries.move_to_end(key)
+            self._refill(key, fetch)
+            return random.choice(stale)[1]
+
+        self.misses += 1
+        value = await fetch(key)
+        self.put(key, value)
+        return value
+
+    def _refill(self, key: str, fetch: Fetcher) -> None:
+        if key in self._pending:
+            return
+        self._pending.add(key)
+        task = asyncio.create_task(self._fetch_into(key, fetch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _fetch_into(self, key: str, fetch: Fetcher) -> None:
+        try:
+            self.put(key, await fetch(key))
+        except Exception as e:
+            self.fetch_errors += 1
+            logger.warning(f"Kesh to'ldirishda xato: {e}")
+        finally:
+            self._pending.discard(key)
+
+    async def warm(self, keys: Iterable[str], fetch: Fetcher) -> None:
+        """Har bir prompt uchun variantlar poolini fonda to'ldirish"""
+        keys = list(keys)
+        for _ in range(self.variants):
+            for key in keys:
+                if len(self._fresh(key)) < self.variants:
+                    await self._fetch_into(key, fetch)
+
+    def stats(self) -> Dict[str, float]:
+        lookups = self.hits + self.stale_hits + self.misses
+        return {
+            'prompts': len(self._entries),
+            'hits': self.hits,
+            'stale_hits': self.stale_hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'fetch_errors': self.fetch_errors,
+            'hit_rate': (self.hits + self.stale_hits) / lookups if lookups else 0.0
+        }
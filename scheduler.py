@@ -0,0 +1,156 @@
+import os
+import time
+import random
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Foydalanuvchi vaqt zonasi ko'rsatilmagan bo'lsa (Toshkent, UTC+5)
+DEFAULT_UTC_OFFSET = float(os.getenv("DEFAULT_UTC_OFFSET", "5"))
+# Mahalliy vaqt bo'yicha: rejalar shu soatda tayyorlanadi, eslatma shu soatda yuboriladi
+PLAN_PREGEN_HOUR = int(os.getenv("PLAN_PREGEN_HOUR", "4"))
+REMINDER_HOUR = int(os.getenv("REMINDER_HOUR", "8"))
+# Bir soatlik ish shuncha soniyaga tarqatiladi
+SCHEDULER_WINDOW = float(os.getenv("SCHEDULER_WINDOW", "2700"))
+SCHEDULER_CONCURRENCY = int(os.getenv("SCHEDULER_CONCURRENCY", "4"))
+SCHEDULER_BATCH_SIZE = int(os.getenv("SCHEDULER_BATCH_SIZE", "50"))
+
+# job(bot, user_id, profile)
+Job = Callable[[Any, int, Any], Awaitable[Any]]
+# profiles(select) -> [(user_id, profile)]; select profilning to_dict() ko'rinishini oladi
+ProfileSource = Callable[[Callable[[Dict], bool]], Awaitable[Iterable[Tuple[int, Any]]]]
+
+
+def user_offset(profile: Any) -> float:
+    offset = getattr(profile, "utc_offset", None)
+    return DEFAULT_UTC_OFFSET if offset is None else offset
+
+
+def local_now(offset: float, now: Optional[datetime] = None) -> datetime:
+    now = now or datetime.now(timezone.utc)
+    return now + timedelta(hours=offset)
+
+
+def local_day(offset: float, now: Optional[datetime] = None) -> int:
+    """Foydalanuvchining mahalliy sanasi (date.toordinal)"""
+    return local_now(offset, now).date().toordinal()
+
+
+class PlanScheduler:
+    """JobQueue ustida soatlik rejalashtiruvchi.
+
+    Har soat boshida barcha profillar (diskdagilari ham) ko'rib chiqiladi: mahalliy vaqti
+    PLAN_PREGEN_HOUR bo'lganlar uchun `prepare`, REMINDER_HOUR bo'lganlar
+    uchun `remind` chaqiriladi. Ish partiyalarga bo'linib `window` soniyaga
+    tasodifiy siljish bilan tarqatiladi va bir vaqtda `concurrency` tadan
+    ko'p bajarilmaydi, shuning uchun Gemini va Bot API'ga birdan yuk tushmaydi.
+    Reja faqat vazni kiritilganlar, eslatma esa eslatmalari yoqilganlar uchun.
+    """
+
+    def __init__(self, profiles: ProfileSource,
+                 prepare: Job, remind: Job,
+                 pregen_hour: int = PLAN_PREGEN_HOUR, reminder_hour: int = REMINDER_HOUR,
+                 window: float = SCHEDULER_WINDOW, concurrency: int = SCHEDULER_CONCURRENCY,
+                 batch_size: int = SCHEDULER_BATCH_SIZE):
+        self.profiles = profiles
+        self.prepare = prepare
+        self.remind = remind
+        self.pregen_hour = pregen_hour
+        self.reminder_hour = reminder_hour
+        self.window = window
+        self.concurrency = concurrency
+        self.batch_size = max(1, batch_size)
+        self.prepared = 0
+        self.reminded = 0
+        self.failed = 0
+        self.last_run_seconds = 0.0
+
+    def install(self, job_queue) -> None:
+        """Har soat boshida ishlaydigan job qo'shish"""
+        now = datetime.now(timezone.utc)
+        next_hour = (now + timedelta(hours=1)).replace(minute=0, second=0, microsecond=0)
+        job_queue.run_repeating(self._job, interval=3600, first=next_hour,
+                                name="plan_scheduler")
+
+    async def _job(self, context) -> None:
+        await self.run_hour(context.bot)
+
+    def wanted(self, data: Dict, now: datetime) -> bool:
+        """Profil (to_dict) shu soatda biror ishga kerakmi"""
+        offset = data.get("utc_offset")
+        hour = local_now(DEFAULT_UTC_OFFSET if offset is None else offset, now).hour
+        if hour == self.pregen_hour:
+            return bool(data.get("weight"))
+        if hour == self.reminder_hour:
+            return bool(data.get("reminders", True))
+        return False
+
+    async def due(self, now: Optional[datetime] = None) -> Tuple[List[Tuple[int, Any]], List[Tuple[int, Any]]]:
+        """Hozirgi soatda (tayyorlash, eslatma) kerak bo'lgan profillar"""
+        now = now or datetime.now(timezone.utc)
+        to_prepare, to_remind = [], []
+        for user_id, profile in await self.profiles(lambda data: self.wanted(data, now)):
+            hour = local_now(user_offset(profile), now).hour
+            if hour == self.pregen_hour:
+                to_prepare.append((user_id, profile))
+            elif hour == self.reminder_hour:
+                to_remind.append((user_id, profile))
+        return to_prepare, to_remind
+
+    async def run_hour(self, bot: Any, now: Optional[datetime] = None) -> None:
+        started = time.perf_counter()
+        to_prepare, to_remind = await self.due(now)
+        if not to_prepare and not to_remind:
+            return
+        logger.info(f"Rejalashtiruvchi: {len(to_prepare)} ta reja, {len(to_remind)} ta eslatma")
+        semaphore = asyncio.Semaphore(self.concurrency)
+        prepared, reminded = await asyncio.gather(
+            self.run_batched(bot, to_prepare, self.prepare, semaphore),
+            self.run_batched(bot, to_remind, self.remind, semaphore)
+        )
+        self.prepared += prepared
+        self.reminded += reminded
+        self.last_run_seconds = time.perf_counter() - started
+
+    async def run_batched(self, bot: Any, items: List[Tuple[int, Any]], job: Job,
+                          semaphore: asyncio.Semaphore) -> int:
+        """Ishlarni partiyalarga bo'lib, oyna bo'ylab tarqatib bajarish"""
+        if not items:
+            return 0
+        items = list(items)
+        random.shuffle(items)
+        batches = [items[i:i + self.batch_size] for i in range(0, len(items), self.batch_size)]
+        slot = self.window / len(batches)
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        done = 0
+
+        async def run_one(user_id: int, profile: Any) -> bool:
+            async with semaphore:
+                try:
+                    await job(bot, user_id, profile)
+                    return True
+                except Exception as e:
+                    self.failed += 1
+                    logger.warning(f"Rejalashtirilgan ish xatosi (user {user_id}): {e}")
+                    return False
+
+        for index, batch in enumerate(batches):
+            # Har partiya o'z oralig'ining tasodifiy nuqtasida boshlanadi
+            delay = start + index * slot + random.uniform(0, slot * 0.5) - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            results = await asyncio.gather(*(run_one(uid, p) for uid, p in batch))
+            done += sum(results)
+        return done
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            'prepared': self.prepared,
+            'reminded': self.reminded,
+            'failed': self.failed,
+            'last_run_seconds': round(self.last_run_seconds, 3)
+        }
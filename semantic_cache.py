@@ -0,0 +1,241 @@
+import os
+import re
+import math
+import time
+import zlib
+from collections import OrderedDict
+from typing import Dict, FrozenSet, Hashable, List, NamedTuple, Optional
+
+# Kosinus o'xshashlik shundan yuqori bo'lsa savollar bir xil hisoblanadi
+SEMANTIC_CACHE_THRESHOLD = float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.82"))
+SEMANTIC_CACHE_TTL = float(os.getenv("SEMANTIC_CACHE_TTL", str(7 * 24 * 3600)))
+# Har bir kohorta (maqsad + BMI oralig'i) va savol turi uchun saqlanadigan savollar
+SEMANTIC_CACHE_PER_COHORT = int(os.getenv("SEMANTIC_CACHE_PER_COHORT", "512"))
+# Juda qisqa savollar (normalizatsiyadan keyin) keshlanmaydi
+SEMANTIC_CACHE_MIN_CHARS = int(os.getenv("SEMANTIC_CACHE_MIN_CHARS", "4"))
+
+FEATURE_BITS = 20
+FEATURE_MASK = (1 << FEATURE_BITS) - 1
+STEM_LENGTH = 5
+
+CYRILLIC_TO_LATIN = {
+    "а": "a", "б": "b", "в": "v", "г": "g", "д": "d", "е": "e", "ё": "yo", "ж": "j",
+    "з": "z", "и": "i", "й": "y", "к": "k", "л": "l", "м": "m", "н": "n", "о": "o",
+    "п": "p", "р": "r", "с": "s", "т": "t", "у": "u", "ф": "f", "х": "x", "ц": "ts",
+    "ч": "ch", "ш": "sh", "щ": "sh", "ъ": "", "ы": "i", "ь": "", "э": "e", "ю": "yu",
+    "я": "ya", "ў": "o", "қ": "q", "ғ": "g", "ҳ": "h"
+}
+_TRANSLATE = str.maketrans({**CYRILLIC_TO_LATIN,
+                            # o', g' va tutuq belgisining barcha ko'rinishlari olib tashlanadi
+                            "'": "", "`": "", "ʻ": "", "ʼ": "", "‘": "", "’": ""})
+_NON_WORD = re.compile(r"[^a-z0-9]+")
+
+# Bog'lovchilar va yordamchi so'zlar: ular ma'noni emas, gap shaklini bildiradi
+STOPWORDS = frozenset((
+    "va", "bilan", "uchun", "ham", "men", "menga", "meni", "mening", "siz", "sizga",
+    "iltimos", "bu", "shu", "u", "bir", "edi", "ekan", "yoki", "lekin", "endi", "juda",
+    "qilib", "mumkin", "kerak", "qilish", "qilsam", "qilay", "boladi", "bolsa", "bormi",
+    "mi", "yaxshimi"
+))
+# Savol so'zlari -> savol turi. "Qancha suv" va "qachon suv" - boshqa savollar:
+# tur vektorga emas, kalitga kiradi (faqat bir xil turdagi savollar solishtiriladi)
+QUESTION_WORDS = {
+    "qanday": "how", "nima": "what", "nega": "why", "nimaga": "why",
+    "qachon": "when", "qaysi": "which", "qancha": "amount", "necha": "amount", "qayerda": "where"
+}
+
+
+def _words(text: str) -> List[str]:
+    text = text.lower().translate(_TRANSLATE)
+    return [w for w in _NON_WORD.split(text) if w]
+
+
+def normalize(text: str) -> List[str]:
+    """Matnni so'zlarga ajratish: kichik harf, kirill -> lotin, tutuq belgisiz"""
+    return [w for w in _words(text) if w not in STOPWORDS and w not in QUESTION_WORDS]
+
+
+def question_kind(text: str) -> FrozenSet[str]:
+    """Savoldagi savol so'zlari turlari (yo'q bo'lsa - bo'sh to'plam)"""
+    return frozenset(QUESTION_WORDS[w] for w in _words(text) if w in QUESTION_WORDS)
+
+
+def _feature(name: str) -> int:
+    return zlib.crc32(name.encode()) & FEATURE_MASK
+
+
+def features(words: List[str]) -> Dict[int, float]:
+    """Hash qilingan belgilar: so'zlar, so'z o'zaklari va harf 3-gramlari (TF)"""
+    tf: Dict[int, float] = {}
+    for word in words:
+        # O'zbek tili qo'shimchalarga boy: o'zak va 3-gramlar so'z shakllarini yaqinlashtiradi
+        names = ["w:" + word]
+        if len(word) > STEM_LENGTH:
+            names.append("s:" + word[:STEM_LENGTH])
+        padded = f"#{word}#"
+        names.extend("c:" + padded[i:i + 3] for i in range(len(padded) - 2))
+        for name in names:
+            key = _feature(name)
+            tf[key] = tf.get(key, 0.0) + 1.0
+    return tf
+
+
+def bmi_band(bmi: float) -> str:
+    if not bmi:
+        return "-"
+    if bmi < 18.5:
+        return "under"
+    if bmi < 25:
+        return "normal"
+    if bmi < 30:
+        return "over"
+    return "obese"
+
+
+class SemanticHit(NamedTuple):
+    text: str
+    similarity: float
+    question: str
+
+
+class _Entry:
+    __slots__ = ('question', 'text', 'vector', 'created', 'latency')
+
+    def __init__(self, question: str, text: str, vector: Dict[int, float], latency: float):
+        self.question = question
+        self.text = text
+        self.vector = vector
+        self.created = time.monotonic()
+        self.latency = latency
+
+
+class _Cohort:
+    """Bitta kohorta va savol turi: yozuvlar (LRU) va belgi -> {yozuv: og'irlik} teskari indeksi"""
+    __slots__ = ('entries', 'postings', 'next_id')
+
+    def __init__(self):
+        self.entries: "OrderedDict[int, _Entry]" = OrderedDict()
+        self.postings: Dict[int, Dict[int, float]] = {}
+        self.next_id = 0
+
+
+class SemanticCache:
+    """Erkin savollar uchun semantik javob keshi.
+
+    Savol hash qilingan n-gram TF-IDF vektoriga aylantiriladi va shu
+    kohortadagi, savol turi (question_kind) bir xil bo'lgan saqlangan
+    savollar bilan kosinus o'xshashlik orqali solishtiriladi. Qidiruv teskari indeks bo'yicha: faqat umumiy
+    belgisi bor yozuvlar ko'rib chiqiladi. IDF saqlangan savollardan
+    yig'iladi; yozuv vektori qo'shilgan paytdagi IDF bilan qotiriladi.
+    """
+
+    def __init__(self, threshold: float = SEMANTIC_CACHE_THRESHOLD, ttl: float = SEMANTIC_CACHE_TTL,
+                 per_cohort: int = SEMANTIC_CACHE_PER_COHORT):
+        self.threshold = threshold
+        self.ttl = ttl
+        self.per_cohort = per_cohort
+        self._cohorts: Dict[Hashable, _Cohort] = {}
+        self._df: Dict[int, int] = {}
+        self._docs = 0
+        self.hits = 0
+        self.misses = 0
+        self.skipped = 0
+        self.saved_seconds = 0.0
+        self.lookup_seconds = 0.0
+
+    def _idf(self, feature: int) -> float:
+        return math.log((self._docs + 1) / (self._df.get(feature, 0) + 1)) + 1.0
+
+    def _vector(self, tf: Dict[int, float]) -> Dict[int, float]:
+        vector = {f: (1.0 + math.log(count)) * self._idf(f) for f, count in tf.items()}
+        norm = math.sqrt(sum(w * w for w in vector.values())) or 1.0
+        return {f: w / norm for f, w in vector.items()}
+
+    @staticmethod
+    def _cacheable(words: List[str]) -> bool:
+        return sum(len(w) for w in words) >= SEMANTIC_CACHE_MIN_CHARS
+
+    def lookup(self, cohort: Hashable, question: str) -> Optional[SemanticHit]:
+        started = time.perf_counter()
+        try:
+            words = normalize(question)
+            bucket = self._cohorts.get((cohort, question_kind(question)))
+            if bucket is None or not self._cacheable(words):
+                self.misses += 1
+                return None
+            query = self._vector(features(words))
+            scores: Dict[int, float] = {}
+            for feature, weight in query.items():
+                for entry_id, entry_weight in bucket.postings.get(feature, {}).items():
+                    scores[entry_id] = scores.get(entry_id, 0.0) + weight * entry_weight
+            now = time.monotonic()
+            for entry_id, score in sorted(scores.items(), key=lambda item: -item[1]):
+                if score < self.threshold:
+                    break
+                entry = bucket.entries[entry_id]
+                if now - entry.created > self.ttl:
+                    self._remove(bucket, entry_id)
+                    continue
+                bucket.entries.move_to_end(entry_id)
+                self.hits += 1
+                self.saved_seconds += entry.latency
+                return SemanticHit(entry.text, score, entry.question)
+            self.misses += 1
+            return None
+        finally:
+            self.lookup_seconds += time.perf_counter() - started
+
+    def put(self, cohort: Hashable, question: str, text: str, latency: float = 0.0) -> bool:
+        """Javobni saqlash (`latency` - Gemini'ga ketgan vaqt, tejalgan vaqt hisobi uchun)"""
+        words = normalize(question)
+        if not self._cacheable(words):
+            self.skipped += 1
+            return False
+        tf = features(words)
+        self._docs += 1
+        for feature in tf:
+            self._df[feature] = self._df.get(feature, 0) + 1
+        key = (cohort, question_kind(question))
+        bucket = self._cohorts.get(key)
+        if bucket is None:
+            bucket = self._cohorts[key] = _Cohort()
+        entry_id = bucket.next_id
+        bucket.next_id += 1
+        entry = _Entry(question, text, self._vector(tf), latency)
+        bucket.entries[entry_id] = entry
+        for feature, weight in entry.vector.items():
+            bucket.postings.setdefault(feature, {})[entry_id] = weight
+        while len(bucket.entries) > self.per_cohort:
+            self._remove(bucket, next(iter(bucket.entries)))
+        return True
+
+    def _remove(self, bucket: _Cohort, entry_id: int) -> None:
+        entry = bucket.entries.pop(entry_id)
+        self._docs -= 1
+        for feature in entry.vector:
+            postings = bucket.postings.get(feature)
+            if postings is not None:
+                postings.pop(entry_id, None)
+                if not postings:
+                    del bucket.postings[feature]
+            count = self._df.get(feature, 0) - 1
+            if count > 0:
+                self._df[feature] = count
+            else:
+                self._df.pop(feature, None)
+
+    def __len__(self) -> int:
+        return sum(len(b.entries) for b in self._cohorts.values())
+
+    def stats(self) -> Dict[str, float]:
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self),
+            'cohorts': len({cohort for cohort, _ in self._cohorts}),
+            'hits': self.hits,
+            'misses': self.misses,
+            'skipped': self.skipped,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'saved_seconds': round(self.saved_seconds, 3),
+            'avg_lookup_ms': round(self.lookup_seconds / lookups * 1000, 3) if lookups else 0.0
+        }
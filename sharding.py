@@ -0,0 +1,269 @@
+import os
+import json
+import queue
+import signal
+import asyncio
+import logging
+import multiprocessing
+from collections import Counter
+from typing import Any, Callable, Dict, List, Optional
+
+from telegram import Bot
+from telegram.error import Conflict, InvalidToken, RetryAfter, TelegramError
+
+from outbound import retry_after_seconds
+from webhook import (
+    WEBHOOK_HOST, WEBHOOK_PATH, WEBHOOK_PORT, Receive, Send, WebhookApp, respond, telegram_secret
+)
+
+logger = logging.getLogger(__name__)
+
+# Worker jarayonlar soni (1 - odatdagi bitta jarayonli rejim)
+BOT_SHARDS = int(os.getenv("BOT_SHARDS", "1"))
+# Worker bir marta navbatdan shuncha update'gacha oladi
+SHARD_BATCH_SIZE = int(os.getenv("SHARD_BATCH_SIZE", "100"))
+SHARD_POLL_TIMEOUT = int(os.getenv("SHARD_POLL_TIMEOUT", "30"))
+# getUpdates xatosidan keyin kutish: 1, 2, 4 ... soniya, shundan oshmaydi
+SHARD_POLL_BACKOFF_MAX = float(os.getenv("SHARD_POLL_BACKOFF_MAX", "30"))
+
+# Update ichida foydalanuvchi shu maydonlardan birida bo'ladi
+UPDATE_KINDS = (
+    "message", "edited_message", "callback_query", "inline_query", "chosen_inline_result",
+    "shipping_query", "pre_checkout_query", "poll_answer", "my_chat_member", "chat_member",
+    "chat_join_request", "message_reaction", "channel_post", "edited_channel_post"
+)
+
+
+def update_user_id(data: Dict) -> int:
+    """Xom update'dan foydalanuvchi (bo'lmasa chat) ID si"""
+    for kind in UPDATE_KINDS:
+        obj = data.get(kind)
+        if obj:
+            user = obj.get("from") or obj.get("user")
+            if user:
+                return user["id"]
+            chat = obj.get("chat")
+            if chat:
+                return chat["id"]
+    return 0
+
+
+def shard_for(user_id: int, shards: int) -> int:
+    return user_id % shards
+
+
+def _next_batch(source: multiprocessing.Queue) -> List[Optional[Dict]]:
+    """Bitta update'ni kutish, keyin navbatda turganlarini ham olish"""
+    batch = [source.get()]
+    while batch[-1] is not None and len(batch) < SHARD_BATCH_SIZE:
+        try:
+            batch.append(source.get_nowait())
+        except queue.Empty:
+            break
+    return batch
+
+
+async def _run_worker(index: int, shards: int, source: multiprocessing.Queue, ready,
+                      token: str, base_url: Optional[str]) -> None:
+    from telegram import Update
+    import bot_gemini
+    from rate_limit import LLMGate, LLM_GLOBAL_BURST, LLM_GLOBAL_RATE
+
+    # Gemini kvotasi umumiy - global limit workerlar orasida bo'linadi
+    bot_gemini.llm_gate = LLMGate(global_rate=LLM_GLOBAL_RATE / shards,
+                                  global_burst=max(1.0, LLM_GLOBAL_BURST / shards))
+    bot_gemini.metrics.registry.add_source("llm_gate", bot_gemini.llm_gate.stats)
+    # Baza umumiy: worker faqat o'z foydalanuvchilarini yuklaydi, yozadi va
+    # rejalashtiruvchida ko'radi (eslatmalar har bir foydalanuvchiga bir marta)
+    bot_gemini.user_data_storage.owns = lambda user_id: shard_for(user_id, shards) == index
+
+    application = bot_gemini.build_application(token=token, base_url=base_url)
+    await application.initialize()
+    if application.post_init:
+        await application.post_init(application)
+    await application.start()
+    logger.info(f"Shard {index}/{shards} tayyor (pid {os.getpid()})")
+    ready.set()
+
+    loop = asyncio.get_running_loop()
+    try:
+        while True:
+            batch = await loop.run_in_executor(None, _next_batch, source)
+            for data in batch:
+                if data is None:
+                    return
+                await application.update_queue.put(Update.de_json(data, application.bot))
+    finally:
+        await application.stop()
+        if application.post_stop:
+            await application.post_stop(application)
+        await application.shutdown()
+        if application.post_shutdown:
+            await application.post_shutdown(application)
+
+
+def worker_main(index: int, shards: int, source: multiprocessing.Queue, ready,
+                token: str, base_url: Optional[str]) -> None:
+    """Worker jarayon: o'z ulushidagi foydalanuvchilar uchun to'liq Application"""
+    os.environ["SHARD_INDEX"] = str(index)
+    # Ctrl+C ni frontend ushlaydi va workerlarni navbat orqali to'xtatadi
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    asyncio.run(_run_worker(index, shards, source, ready, token, base_url))
+
+
+class ShardRouter:
+    """Update'larni user_id bo'yicha worker jarayonlarga taqsimlash.
+
+    Bitta foydalanuvchining barcha update'lari doim bitta workerga boradi,
+    shuning uchun uning profili va ConversationHandler holati faqat shu
+    jarayonda yashaydi va tartib saqlanadi. Workerlar `spawn` bilan
+    yaratiladi va profillarni umumiy SQLite bazasida saqlaydi; har bir
+    worker ProfileStore'da faqat o'z ulushidagi foydalanuvchilarga egalik qiladi.
+    `worker` - jarayon kirish nuqtasi (worker_main imzosi bilan).
+    """
+
+    def __init__(self, shards: int, token: str, base_url: Optional[str] = None,
+                 worker: Callable[..., None] = worker_main):
+        self.shards = max(1, shards)
+        self.token = token
+        self.base_url = base_url
+        self.worker = worker
+        self._context = multiprocessing.get_context("spawn")
+        self.queues: List[multiprocessing.Queue] = []
+        self.processes: List[Any] = []
+        self._ready: List[Any] = []
+        self.routed: Counter = Counter()
+
+    def start(self) -> None:
+        for index in range(self.shards):
+            source = self._context.Queue()
+            ready = self._context.Event()
+            process = self._context.Process(
+                target=self.worker, name=f"health-bot-shard-{index}",
+                args=(index, self.shards, source, ready, self.token, self.base_url)
+            )
+            process.start()
+            self.queues.append(source)
+            self._ready.append(ready)
+            self.processes.append(process)
+
+    def wait_ready(self, timeout: float = 60) -> bool:
+        return all(ready.wait(timeout) for ready in self._ready)
+
+    def route(self, data: Dict) -> int:
+        shard = shard_for(update_user_id(data), self.shards)
+        self.queues[shard].put(data)
+        self.routed[shard] += 1
+        return shard
+
+    def stop(self, timeout: float = 30) -> None:
+        """Workerlarga to'xtash belgisini yuborish va tugashini kutish"""
+        for source in self.queues:
+            source.put(None)
+        for process in self.processes:
+            process.join(timeout)
+            if process.is_alive():
+                logger.warning(f"{process.name} to'xtamadi, majburan tugatilmoqda")
+                process.terminate()
+        self.queues, self.processes, self._ready = [], [], []
+
+    def stats(self) -> Dict[str, int]:
+        stats = {f"routed_shard_{i}": self.routed[i] for i in range(self.shards)}
+        stats["alive"] = sum(p.is_alive() for p in self.processes)
+        return stats
+
+
+class ShardedWebhookApp(WebhookApp):
+    """Webhook frontend: update JSON'ini parse qilib workerga uzatadi (Update obyektisiz)"""
+
+    def __init__(self, router: ShardRouter, secret_token: str, path: str = WEBHOOK_PATH):
+        super().__init__(None, secret_token, path)
+        self.router = router
+
+    async def dispatch(self, data: Dict) -> None:
+        self.router.route(data)
+
+    async def handle_health(self, scope: Dict, receive: Receive, send: Send) -> None:
+        body = json.dumps({
+            "status": "ok" if self.router.stats()["alive"] == self.router.shards else "degraded",
+            "received": self.received,
+            "rejected": self.rejected,
+            **self.router.stats()
+        }).encode()
+        await respond(send, 200, body, b"application/json")
+
+
+async def _poll(router: ShardRouter, bot: Bot, allowed_updates: Optional[List[str]]) -> None:
+    """getUpdates tsikli; vaqtinchalik xatolarda kutib davom etadi (PTB Updater kabi).
+
+    Faqat noto'g'ri token va boshqa getUpdates/webhook bilan to'qnashuv
+    (Conflict) tsiklni to'xtatadi - qolganlari shardlarni o'chirmasligi kerak.
+    """
+    await bot.delete_webhook()
+    offset = 0
+    delay = 1.0
+    while True:
+        try:
+            updates = await bot.get_updates(offset=offset, timeout=SHARD_POLL_TIMEOUT,
+                                            allowed_updates=allowed_updates)
+        except (InvalidToken, Conflict):
+            raise
+        except RetryAfter as e:
+            wait = retry_after_seconds(e)
+            logger.warning(f"getUpdates: flood control, {wait:g} s kutiladi")
+            await asyncio.sleep(wait)
+            continue
+        except TelegramError as e:
+            logger.warning(f"getUpdates xatosi: {e!r}, {delay:g} s dan keyin qayta")
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, SHARD_POLL_BACKOFF_MAX)
+            continue
+        delay = 1.0
+        for update in updates:
+            router.route(update.to_dict())
+            offset = update.update_id + 1
+
+
+async def _serve_webhook(router: ShardRouter, bot: Bot, url: str, secret_token: Optional[str],
+                         host: str, port: int, path: str,
+                         allowed_updates: Optional[List[str]]) -> None:
+    import uvicorn
+
+    secret_token = telegram_secret(secret_token)
+    server = uvicorn.Server(uvicorn.Config(
+        ShardedWebhookApp(router, secret_token, path), host=host, port=port,
+        lifespan="off", log_level="warning", access_log=False
+    ))
+    await bot.set_webhook(url=url.rstrip("/") + path, secret_token=secret_token,
+                          allowed_updates=allowed_updates)
+    logger.info(f"Webhook: {url.rstrip('/')}{path} (port {port}), {router.shards} ta shard")
+    await server.serve()
+
+
+def run_sharded(shards: int, token: str, base_url: Optional[str] = None,
+                webhook_url: Optional[str] = None, secret_token: Optional[str] = None,
+                allowed_updates: Optional[List[str]] = None,
+                host: str = WEBHOOK_HOST, port: int = WEBHOOK_PORT,
+                path: str = WEBHOOK_PATH) -> None:
+    """Frontend (polling yoki webhook) + `shards` ta worker jarayon"""
+    router = ShardRouter(shards, token, base_url)
+    router.start()
+    if not router.wait_ready():
+        logger.warning("Ba'zi shardlar vaqtida tayyor bo'lmadi")
+    bot = Bot(token, **({"base_url": f"{base_url.rstrip('/')}/bot"} if base_url else {}))
+
+    async def frontend() -> None:
+        async with bot:
+            if webhook_url:
+                await _serve_webhook(router, bot, webhook_url, secret_token,
+                                     host, port, path, allowed_updates)
+            else:
+                await _poll(router, bot, allowed_updates)
+
+    try:
+        asyncio.run(frontend())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        router.stop()
+        logger.info(f"Shardlar to'xtadi: {dict(router.routed)}")
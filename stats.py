@@ -0,0 +1,181 @@
+from datetime import date, datetime, timezone
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from tasks import current_day
+
+# Statistika oynalari (kun)
+WINDOWS = (7, 30)
+
+# Hisoblagich: kunlik qiymat = hodisalar soni (vazifa qo'shildi, bajarildi, ovqat) yoki yig'indi (kcal)
+# O'lchov: kunlik qiymat = o'rtacha (stress bahosi)
+COUNTER = "counter"
+GAUGE = "gauge"
+METRICS = {
+    "tasks_added": COUNTER,
+    "tasks_done": COUNTER,
+    "meals": COUNTER,
+    "kcal": COUNTER,
+    "stress": GAUGE
+}
+
+
+class WindowSummary(NamedTuple):
+    """Bitta metrika uchun oyna natijasi"""
+    days: int
+    count: int
+    mean: float
+    min: float
+    max: float
+    trend: float  # kunlik qiymatning kuniga o'zgarishi (chiziqli regressiya)
+
+
+EMPTY_SUMMARY = WindowSummary(0, 0, 0.0, 0.0, 0.0, 0.0)
+
+
+def _slope(points: List[Tuple[int, float]]) -> float:
+    """Eng kichik kvadratlar bo'yicha og'ish"""
+    n = len(points)
+    if n < 2:
+        return 0.0
+    mean_x = sum(x for x, _ in points) / n
+    mean_y = sum(y for _, y in points) / n
+    var_x = sum((x - mean_x) ** 2 for x, _ in points)
+    if not var_x:
+        return 0.0
+    return sum((x - mean_x) * (y - mean_y) for x, y in points) / var_x
+
+
+class StatsAggregator:
+    """Hodisalar bo'yicha yangilanadigan 7/30 kunlik statistika.
+
+    Har metrika uchun kunlik [soni, yig'indi, min, max] saqlanadi. Hodisa
+    yozilganda shu metrikaning oyna natijalari qayta hisoblanadi (ko'pi
+    bilan 30 ta kun), shuning uchun `summary()` tayyor qiymatni qaytaradi.
+    Kun almashganda natijalar bir marta yangilanadi.
+    """
+    __slots__ = ('_buckets', '_summaries', '_day')
+
+    def __init__(self):
+        # metrika -> {kun: [soni, yig'indi, min, max]}
+        self._buckets: Optional[Dict[str, Dict[int, List[float]]]] = None
+        self._summaries: Dict[Tuple[str, int], WindowSummary] = {}
+        self._day = 0
+
+    def _rollover(self, day: int) -> None:
+        if day == self._day:
+            return
+        self._day = day
+        if self._buckets:
+            oldest = day - max(WINDOWS) + 1
+            for buckets in self._buckets.values():
+                for old_day in [d for d in buckets if d < oldest]:
+                    del buckets[old_day]
+            self._summaries = {}
+            for metric in self._buckets:
+                self._refresh(metric)
+
+    def record(self, metric: str, value: float = 1.0, day: Optional[int] = None) -> None:
+        """Hodisani yozish (hisoblagichlar uchun value=1)"""
+        day = day if day is not None else current_day()
+        if day < self._day - max(WINDOWS) + 1:
+            return
+        self._rollover(max(day, self._day))
+        if self._buckets is None:
+            self._buckets = {}
+        bucket = self._buckets.setdefault(metric, {}).get(day)
+        if bucket is None:
+            self._buckets[metric][day] = [1, value, value, value]
+        else:
+            bucket[0] += 1
+            bucket[1] += value
+            bucket[2] = min(bucket[2], value)
+            bucket[3] = max(bucket[3], value)
+        self._refresh(metric)
+
+    def _refresh(self, metric: str) -> None:
+        buckets = self._buckets.get(metric) or {}
+        counter = METRICS.get(metric, GAUGE) == COUNTER
+        for days in WINDOWS:
+            first = self._day - days + 1
+            if counter:
+                # Hodisasiz kunlar ham 0 qiymat sifatida hisobga olinadi
+                daily = [(d, buckets[d][1] if d in buckets else 0.0)
+                         for d in range(first, self._day + 1)]
+                values = [v for _, v in daily]
+                count = int(sum(values))
+                summary = WindowSummary(days, count, sum(values) / days,
+                                        min(values), max(values), _slope(daily))
+            else:
+                rows = [(d, b) for d, b in buckets.items() if d >= first]
+                count = int(sum(b[0] for _, b in rows))
+                if not count:
+                    summary = EMPTY_SUMMARY._replace(days=days)
+                else:
+                    summary = WindowSummary(
+                        days, count,
+                        sum(b[1] for _, b in rows) / count,
+                        min(b[2] for _, b in rows),
+                        max(b[3] for _, b in rows),
+                        _slope([(d, b[1] / b[0]) for d, b in rows])
+                    )
+            self._summaries[(metric, days)] = summary
+
+    def day_total(self, metric: str, day: Optional[int] = None) -> float:
+        """Bir kunlik yig'indi (standart - bugun)"""
+        bucket = ((self._buckets or {}).get(metric) or {}).get(
+            day if day is not None else current_day())
+        return bucket[1] if bucket else 0.0
+
+    def summary(self, metric: str, days: int = 7, day: Optional[int] = None) -> WindowSummary:
+        """Oldindan hisoblangan oyna natijasi (`day` - oynaning oxirgi kuni, standart - bugun)"""
+        self._rollover(max(day if day is not None else current_day(), self._day))
+        return self._summaries.get((metric, days)) or EMPTY_SUMMARY._replace(days=days)
+
+    def to_dict(self) -> Dict:
+        return {metric: {str(d): b for d, b in buckets.items()}
+                for metric, buckets in (self._buckets or {}).items()}
+
+    @classmethod
+    def from_dict(cls, data: Dict, day: Optional[int] = None) -> "StatsAggregator":
+        """`day` - foydalanuvchining bugungi kuni (standart - server bo'yicha)"""
+        stats = cls()
+        if data:
+            stats._buckets = {metric: {int(d): list(b) for d, b in buckets.items()}
+                              for metric, buckets in data.items()}
+            stats._rollover(day if day is not None else current_day())
+        return stats
+
+    @classmethod
+    def from_history(cls, tasks, stress_levels, utc_offset: Optional[float] = None,
+                     day: Optional[int] = None) -> "StatsAggregator":
+        """Eski profillar uchun: vazifa hisoblagichlari va stress tarixidan tiklash.
+
+        Stress vaqtlari foydalanuvchining `utc_offset` bo'yicha kunlarga
+        bo'linadi (None - server vaqti), `day` - uning bugungi kuni.
+        """
+        stats = cls()
+        if day is not None:
+            stats._rollover(day)
+        for day, total, done in tasks.daily_counts():
+            for _ in range(total):
+                stats.record("tasks_added", day=day)
+            for _ in range(done):
+                stats.record("tasks_done", day=day)
+        for ts, value in stress_levels.items():
+            # Vaqtsiz eski yozuvlarni qaysi kunga tegishli ekanini bilib bo'lmaydi
+            if not ts:
+                continue
+            if utc_offset is None:
+                stress_day = date.fromtimestamp(ts).toordinal()
+            else:
+                stress_day = datetime.fromtimestamp(ts + utc_offset * 3600, timezone.utc).toordinal()
+            stats.record("stress", value, day=stress_day)
+        return stats
+
+
+def format_trend(trend: float) -> str:
+    """Trendni qisqa belgi bilan ko'rsatish"""
+    if abs(trend) < 0.05:
+        return "→ barqaror"
+    arrow = "↑" if trend > 0 else "↓"
+    return f"{arrow} {trend:+.2f}/kun"
@@ -0,0 +1,348 @@
+import os
+import json
+import time
+import sqlite3
+import asyncio
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterator, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Saqlash sozlamalari
+PROFILE_STORE = os.getenv("PROFILE_STORE", "sqlite")
+PROFILE_DB_PATH = os.getenv("PROFILE_DB_PATH", "health_bot.db")
+PROFILE_FLUSH_INTERVAL = float(os.getenv("PROFILE_FLUSH_INTERVAL", "5"))
+PROFILE_CACHE_SIZE = int(os.getenv("PROFILE_CACHE_SIZE", "10000"))
+
+
+class StorageBackend:
+    """Profillarni saqlash backend interfeysi"""
+
+    def load(self, user_id: int) -> Optional[Dict]:
+        raise NotImplementedError
+
+    def save_many(self, records: List[Tuple[int, str, float]]) -> None:
+        """(user_id, json, updated_at) yozuvlarini bitta tranzaksiyada saqlash"""
+        raise NotImplementedError
+
+    def iter_all(self, since: float = 0) -> Iterator[Tuple[int, str, float]]:
+        raise NotImplementedError
+
+    def close(self) -> None:
+        pass
+
+
+class MemoryBackend(StorageBackend):
+    """Xotiradagi backend (sinov va lokal ishga tushirish uchun)"""
+
+    def __init__(self):
+        self._rows: Dict[int, Tuple[str, float]] = {}
+
+    def load(self, user_id: int) -> Optional[Dict]:
+        row = self._rows.get(user_id)
+        return json.loads(row[0]) if row else None
+
+    def save_many(self, records: List[Tuple[int, str, float]]) -> None:
+        for user_id, data, updated_at in records:
+            self._rows[user_id] = (data, updated_at)
+
+    def iter_all(self, since: float = 0) -> Iterator[Tuple[int, str, float]]:
+        for user_id, (data, updated_at) in list(self._rows.items()):
+            if updated_at >= since:
+                yield user_id, data, updated_at
+
+
+class SQLiteBackend(StorageBackend):
+    """SQLite backend (WAL rejimi, bitta jadval)"""
+
+    def __init__(self, path: str = PROFILE_DB_PATH):
+        self.path = path
+        # Ulanish event loop (sinxron load) va ProfileStore thread'i orasida
+        # umumiy - tranzaksiya o'rtasida o'qish bo'lmasligi uchun lock
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS profiles ("
+            "user_id INTEGER PRIMARY KEY, "
+            "data TEXT NOT NULL, "
+            "updated_at REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS profiles_updated_at ON profiles(updated_at)"
+        )
+        self._conn.commit()
+
+    def load(self, user_id: int) -> Optional[Dict]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT data FROM profiles WHERE user_id = ?", (user_id,)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def save_many(self, records: List[Tuple[int, str, float]]) -> None:
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT INTO profiles (user_id, data, updated_at) VALUES (?, ?, ?) "
+                "ON CONFLICT(user_id) DO UPDATE SET "
+                "data = excluded.data, updated_at = excluded.updated_at",
+                records
+            )
+
+    def iter_all(self, since: float = 0) -> Iterator[Tuple[int, str, float]]:
+        # Alohida ulanish: eksport asosiy yozuvchini bloklamasin
+        conn = sqlite3.connect(self.path)
+        try:
+            cursor = conn.execute(
+                "SELECT user_id, data, updated_at FROM profiles "
+                "WHERE updated_at >= ? ORDER BY user_id", (since,)
+            )
+            while True:
+                rows = cursor.fetchmany(500)
+                if not rows:
+                    break
+                yield from rows
+        finally:
+            conn.close()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+def create_backend(kind: str = PROFILE_STORE) -> StorageBackend:
+    """Sozlamaga qarab backend yaratish"""
+    if kind == "memory":
+        return MemoryBackend()
+    if kind == "sqlite":
+        return SQLiteBackend()
+    raise ValueError(f"Noma'lum PROFILE_STORE: {kind}")
+
+
+class ProfileStore:
+    """Profillar keshi va write-behind saqlash.
+
+    Handlerlar profillarni faqat xotiradan oladi. O'zgargan profillar
+    davriy `flush()` orqali bitta tranzaksiyada yoziladi, disk bilan
+    ishlash esa alohida thread'da bajariladi.
+
+    `owns(user_id)` berilsa (shard worker), boshqa jarayonga tegishli
+    foydalanuvchilar yuklanmaydi, keshlanmaydi va yozilmaydi: baza umumiy,
+    eskirgan nusxa egasining ma'lumotini bosib ketmasligi kerak.
+    """
+
+    def __init__(self, backend: StorageBackend, loader: Callable[[Dict], Any],
+                 flush_interval: float = PROFILE_FLUSH_INTERVAL,
+                 cache_size: int = PROFILE_CACHE_SIZE,
+                 owns: Optional[Callable[[int], bool]] = None):
+        self.backend = backend
+        self.loader = loader
+        self.owns = owns
+        self.flush_interval = flush_interval
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[int, Any]" = OrderedDict()
+        # Oxirgi flush'dan beri o'qilgan (demak o'zgargan bo'lishi mumkin) profillar
+        self._touched: Set[int] = set()
+        # Oldingi flush'gacha berilganlar: handler havolani await orqali ushlab,
+        # flush'dan keyin o'zgartirsa ham keyingi flush'da tekshiriladi
+        self._recent: Set[int] = set()
+        # Diskdagi holat: user_id -> json hash
+        self._saved: Dict[int, int] = {}
+        # Diskda yo'qligi ma'lum ID'lar (LRU, cache_size dan oshmaydi)
+        self._missing: "OrderedDict[int, None]" = OrderedDict()
+        self._io = ThreadPoolExecutor(max_workers=1, thread_name_prefix="profile-store")
+        self._flush_task: Optional[asyncio.Task] = None
+        self._flush_lock = asyncio.Lock()
+
+        self.loads = 0
+        self.sync_loads = 0
+        self.flushes = 0
+        self.written = 0
+        self.foreign = 0
+
+    def _owned(self, user_id: int) -> bool:
+        if self.owns is None or self.owns(user_id):
+            return True
+        self.foreign += 1
+        logger.warning(f"Profil {user_id} boshqa shardga tegishli - o'tkazib yuborildi")
+        return False
+
+    def _remember(self, user_id: int, profile: Any) -> None:
+        if not self._owned(user_id):
+            return
+        self._cache[user_id] = profile
+        self._cache.move_to_end(user_id)
+        self._touched.add(user_id)
+        self._missing.pop(user_id, None)
+
+    def _adopt(self, user_id: int, data: Optional[Dict]) -> Optional[Any]:
+        self.loads += 1
+        if data is None:
+            self._missing[user_id] = None
+            self._missing.move_to_end(user_id)
+            while len(self._missing) > self.cache_size:
+                self._missing.popitem(last=False)
+            return None
+        self._saved[user_id] = hash(json.dumps(data, ensure_ascii=False, sort_keys=True))
+        return self.loader(data)
+
+    def _load_sync(self, user_id: int) -> Optional[Any]:
+        if user_id in self._missing:
+            return None
+        # preload() qamramagan yo'l: disk event loop'da o'qiladi (stats'da ko'rinadi)
+        self.sync_loads += 1
+        logger.debug(f"Profil {user_id} sinxron yuklandi")
+        return self._adopt(user_id, self.backend.load(user_id))
+
+    async def preload(self, user_id: int) -> None:
+        """Profilni diskdan thread'da oldindan yuklash (handlerdan oldin)"""
+        if user_id in self._cache or user_id in self._missing or not self._owned(user_id):
+            return
+        loop = asyncio.get_running_loop()
+        data = await loop.run_in_executor(self._io, self.backend.load, user_id)
+        if user_id in self._cache:
+            return
+        profile = self._adopt(user_id, data)
+        if profile is not None:
+            self._remember(user_id, profile)
+
+    async def load(self, user_id: int, default: Any = None) -> Any:
+        """get() ning asinxron varianti: keshda bo'lmasa disk thread'da o'qiladi"""
+        await self.preload(user_id)
+        return self.get(user_id, default)
+
+    def get(self, user_id: int, default: Any = None) -> Any:
+        profile = self._cache.get(user_id)
+        if profile is None:
+            if not self._owned(user_id):
+                return default
+            profile = self._load_sync(user_id)
+            if profile is None:
+                return default
+        self._remember(user_id, profile)
+        return profile
+
+    async def iter_profiles(self, select: Optional[Callable[[Dict], bool]] = None) -> List[Tuple[int, Any]]:
+        """Barcha profillar (diskdagi va hali saqlanmagan) - rejalashtiruvchi uchun.
+
+        `select` profilning to_dict() ko'rinishi bo'yicha filtr: diskdagi
+        yozuvlardan faqat tanlanganlari obyektga aylantiriladi. Disk alohida
+        thread'da o'qiladi (`_io` band bo'lsa preload() kutib qolardi).
+        Keshdagi profil diskdagidan yangiroq bo'lishi mumkin, shuning uchun
+        u ishlatiladi; diskdan olinganlar keshga qo'shilmaydi. Shard rejimida
+        faqat shu jarayonga tegishli profillar qaytadi.
+        """
+        cached = dict(self._cache)
+        owns = self.owns
+
+        def scan() -> List[Tuple[int, Any]]:
+            found = []
+            for user_id, data, _ in self.backend.iter_all():
+                if user_id in cached or (owns is not None and not owns(user_id)):
+                    continue
+                record = json.loads(data)
+                if select is None or select(record):
+                    found.append((user_id, self.loader(record)))
+            return found
+
+        found = await asyncio.to_thread(scan)
+        found.extend((user_id, profile) for user_id, profile in cached.items()
+                     if select is None or select(profile.to_dict()))
+        return found
+
+    def __contains__(self, user_id: int) -> bool:
+        return self.get(user_id) is not None
+
+    def __getitem__(self, user_id: int) -> Any:
+        profile = self.get(user_id)
+        if profile is None:
+            raise KeyError(user_id)
+        return profile
+
+    def __setitem__(self, user_id: int, profile: Any) -> None:
+        self._remember(user_id, profile)
+
+    def __len__(self) -> int:
+        return len(self._cache)
+
+    def _collect(self) -> List[Tuple[int, str, float]]:
+        """O'zgargan profillarni JSON ga aylantirish (loop thread'ida)"""
+        now = time.time()
+        records = []
+        touched, self._touched = self._touched, set()
+        recent, self._recent = self._recent, touched
+        for user_id in touched | recent:
+            profile = self._cache.get(user_id)
+            if profile is None:
+                continue
+            data = json.dumps(profile.to_dict(), ensure_ascii=False, sort_keys=True)
+            digest = hash(data)
+            if self._saved.get(user_id) != digest:
+                self._saved[user_id] = digest
+                records.append((user_id, data, now))
+        return records
+
+    def _evict(self) -> None:
+        """Eng kam ishlatilgan, saqlangan profillarni keshdan chiqarish"""
+        for user_id in list(self._cache):
+            if len(self._cache) <= self.cache_size:
+                break
+            if user_id in self._touched or user_id in self._recent:
+                continue
+            del self._cache[user_id]
+            self._saved.pop(user_id, None)
+
+    async def flush(self) -> int:
+        """O'zgargan profillarni diskka yozish"""
+        async with self._flush_lock:
+            records = self._collect()
+            if records:
+                loop = asyncio.get_running_loop()
+                try:
+                    await loop.run_in_executor(self._io, self.backend.save_many, records)
+                except Exception as e:
+                    logger.error(f"Profillarni saqlashda xato: {e}")
+                    for user_id, _, _ in records:
+                        self._saved.pop(user_id, None)
+                        self._touched.add(user_id)
+                    return 0
+                self.flushes += 1
+                self.written += len(records)
+            self._evict()
+            return len(records)
+
+    async def _flush_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush()
+
+    def start(self) -> None:
+        if self._flush_task is None:
+            self._flush_task = asyncio.create_task(self._flush_loop())
+
+    async def stop(self) -> None:
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            try:
+                await self._flush_task
+            except asyncio.CancelledError:
+                pass
+            self._flush_task = None
+        await self.flush()
+        self._io.shutdown(wait=True)
+        self.backend.close()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            'cached': len(self._cache),
+            'dirty': len(self._touched),
+            'loads': self.loads,
+            'sync_loads': self.sync_loads,
+            'flushes': self.flushes,
+            'written': self.written,
+            'foreign': self.foreign
+        }
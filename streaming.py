@@ -0,0 +1,198 @@
+import os
+import time
+import asyncio
+import logging
+from typing import AsyncIterator, List, Optional, Tuple
+
+from telegram import InlineKeyboardMarkup, Message
+from telegram.constants import MessageLimit
+from telegram.error import BadRequest, RetryAfter
+
+from outbound import retry_after_seconds
+
+logger = logging.getLogger(__name__)
+
+# Bitta xabarni tahrirlash orasidagi minimal vaqt (Telegram limiti ~1/s)
+STREAM_EDIT_INTERVAL = float(os.getenv("STREAM_EDIT_INTERVAL", "1.0"))
+# Yangi tahrir uchun kamida shuncha yangi belgi kelishi kerak
+STREAM_MIN_DELTA = int(os.getenv("STREAM_MIN_DELTA", "20"))
+
+MAX_MESSAGE_LENGTH = MessageLimit.MAX_TEXT_LENGTH
+CURSOR = " ▌"
+# Model bo'sh javob qaytarsa (masalan, xavfsizlik filtri) xabar bo'sh qolmasin
+EMPTY_TEXT = "⚠️ Javob bo'sh keldi. Iltimos, savolni boshqacha yozib ko'ring."
+
+
+def _scan(text: str) -> Tuple[int, int, int, int]:
+    """Legacy Markdown bo'yicha matnni bir marta o'qish.
+
+    Telegram'ning eski Markdown'ida entity'lar ichma-ich bo'lmaydi, shuning
+    uchun bitta ochiq entity holatini kuzatish yetarli. Natija: yopilmagan
+    entity boshi (-1 - yo'q) hamda entity'dan tashqaridagi oxirgi bo'sh
+    qator, qator oxiri va bo'shliq pozitsiyalari (-1 - yo'q).
+    """
+    open_marker = None
+    open_pos = 0
+    paragraph = newline = space = -1
+    i = 0
+    length = len(text)
+    while i < length:
+        char = text[i]
+        if open_marker is None:
+            if char == "\\":
+                i += 2
+                continue
+            if char == "\n":
+                if i and text[i - 1] == "\n":
+                    paragraph = i
+                newline = i
+            elif char == " ":
+                space = i
+            elif text.startswith("```", i):
+                open_marker, open_pos = "```", i
+                i += 3
+                continue
+            elif char in "*_`[":
+                open_marker, open_pos = char, i
+        elif open_marker == "```":
+            if text.startswith("```", i):
+                open_marker = None
+                i += 3
+                continue
+        elif open_marker == "[":
+            if char == "]" and not text.startswith("](", i):
+                open_marker = None
+            elif char == ")":
+                open_marker = None
+        elif char == open_marker:
+            open_marker = None
+        i += 1
+    return (-1 if open_marker is None else open_pos), paragraph, newline, space
+
+
+def markdown_safe_prefix(text: str) -> str:
+    """Legacy Markdown uchun yopilmagan entity'siz eng uzun prefiks.
+
+    Oxirgi yopilmagan belgidan oldingi qism qaytariladi.
+    """
+    open_pos = _scan(text)[0]
+    return text if open_pos < 0 else text[:open_pos]
+
+
+def fit_message(text: str, limit: int = MAX_MESSAGE_LENGTH) -> str:
+    """Matnni bitta Telegram xabari chegarasiga sig'dirish"""
+    if len(text) <= limit:
+        return text
+    return markdown_safe_prefix(text[:limit - 1]) + "…"
+
+
+def split_message(text: str, limit: int = MAX_MESSAGE_LENGTH) -> List[str]:
+    """Uzun matnni Telegram chegarasidagi xabarlarga bo'lish.
+
+    Imkon qadar bo'sh qator, qator oxiri yoki bo'shliqda (xabarning ikkinchi
+    yarmida) va hech qachon Markdown entity ichida bo'linmaydi. Bitta
+    entity chegaradan uzun bo'lsa (masalan, katta kod bloki), u majburan
+    kesiladi - bunday qism oddiy matn sifatida yuboriladi (_edit/reply_formatted).
+    """
+    parts = []
+    while len(text) > limit:
+        window = text[:limit]
+        open_pos, paragraph, newline, space = _scan(window)
+        end = len(window) if open_pos < 0 else open_pos
+        for cut in (paragraph, newline, space):
+            if limit // 2 <= cut <= end:
+                break
+        else:
+            cut = end or len(window)
+        parts.append(window[:cut].rstrip())
+        text = text[cut:].lstrip()
+    if text:
+        parts.append(text)
+    return parts
+
+
+def _message_parts(text: str) -> List[str]:
+    """split_message, lekin kamida bitta bo'sh bo'lmagan xabar (Telegram bo'sh matnni rad etadi)"""
+    parts = [part for part in split_message(text) if part.strip()]
+    return parts or [EMPTY_TEXT]
+
+
+async def _edit(message: Message, text: str, reply_markup: Optional[InlineKeyboardMarkup],
+                parse_mode: Optional[str], final: bool = False) -> bool:
+    try:
+        await message.edit_text(text, reply_markup=reply_markup, parse_mode=parse_mode)
+        return True
+    except RetryAfter as e:
+        if not final:
+            # Oraliq tahrirni tashlab ketamiz, keyingisi baribir yangiroq bo'ladi
+            return False
+        await asyncio.sleep(retry_after_seconds(e))
+        return await _edit(message, text, reply_markup, parse_mode, final)
+    except BadRequest as e:
+        if "not modified" in str(e).lower():
+            return True
+        if parse_mode and "parse" in str(e).lower():
+            # Model yaroqsiz Markdown qaytargan bo'lsa - oddiy matn sifatida
+            return await _edit(message, text, reply_markup, None, final)
+        raise
+
+
+async def _reply(message: Message, text: str, reply_markup: Optional[InlineKeyboardMarkup],
+                 parse_mode: Optional[str]) -> Message:
+    try:
+        return await message.reply_text(text, reply_markup=reply_markup, parse_mode=parse_mode)
+    except BadRequest as e:
+        if parse_mode and "parse" in str(e).lower():
+            return await message.reply_text(text, reply_markup=reply_markup)
+        raise
+
+
+async def reply_formatted(message: Message, text: str,
+                          reply_markup: Optional[InlineKeyboardMarkup] = None,
+                          parse_mode: Optional[str] = "Markdown") -> Message:
+    """Tayyor matnni javob qilib yuborish (Markdown xato bo'lsa oddiy matn).
+
+    Uzun matn bir nechta xabarga bo'linadi, klaviatura oxirgisiga qo'yiladi.
+    """
+    parts = _message_parts(text)
+    for part in parts[:-1]:
+        await _reply(message, part, None, parse_mode)
+    return await _reply(message, parts[-1], reply_markup, parse_mode)
+
+
+async def stream_to_message(message: Message, chunks: AsyncIterator[str],
+                            header: str = "", footer: str = "",
+                            reply_markup: Optional[InlineKeyboardMarkup] = None,
+                            parse_mode: Optional[str] = "Markdown",
+                            interval: float = STREAM_EDIT_INTERVAL) -> str:
+    """Kelayotgan bo'laklar bilan bitta xabarni bosqichma-bosqich tahrirlash.
+
+    Birinchi bo'lak darhol ko'rsatiladi, keyingilari `interval` bo'yicha
+    birlashtiriladi. Oraliq tahrirlarda faqat Markdown jihatdan to'liq
+    prefiks yuboriladi. Yakuniy matn chegaradan uzun bo'lsa qolgan qismi
+    keyingi xabarlarda yuboriladi. Modeldan kelgan matn qaytariladi.
+    """
+    body = ""
+    shown = -1
+    last_edit = 0.0
+
+    async for chunk in chunks:
+        body += chunk
+        now = time.monotonic()
+        if last_edit and (now - last_edit < interval or len(body) - shown < STREAM_MIN_DELTA):
+            continue
+        partial = markdown_safe_prefix(body)
+        if not partial.strip() or len(partial) == shown:
+            continue
+        text = fit_message(header + partial + CURSOR)
+        last_edit = now
+        if await _edit(message, text, None, parse_mode):
+            shown = len(partial)
+
+    # Chegaradan uzun javob: birinchi qism shu xabarda, qolganlari keyingi xabarlarda
+    # Bo'sh javobda ham xabar "..." holatida qolib ketmasin
+    parts = _message_parts(header + (body if body.strip() else EMPTY_TEXT) + footer)
+    await _edit(message, parts[0], reply_markup if len(parts) == 1 else None, parse_mode, final=True)
+    for i, part in enumerate(parts[1:], 2):
+        await _reply(message, part, reply_markup if i == len(parts) else None, parse_mode)
+    return body
@@ -0,0 +1,186 @@
+import os
+import sys
+from datetime import date
+from typing import Dict, Iterator, List, Optional, Tuple
+
+# Vazifa tafsilotlari va kunlik hisoblagichlar qancha kun saqlanadi
+TASK_RETENTION_DAYS = int(os.getenv("TASK_RETENTION_DAYS", "7"))
+TASK_COUNT_RETENTION_DAYS = int(os.getenv("TASK_COUNT_RETENTION_DAYS", "60"))
+
+
+def current_day() -> int:
+    """Server bo'yicha bugungi kun (date.toordinal ko'rinishida).
+
+    Foydalanuvchi kuni uchun `scheduler.local_day()` natijasi `day` sifatida beriladi.
+    """
+    return date.today().toordinal()
+
+
+class Task:
+    """Bitta vazifa (ko'rsatish uchun yaratiladigan ko'rinish)"""
+    __slots__ = ('id', 'title', 'done')
+
+    def __init__(self, task_id: int, title: str, done: bool = False):
+        self.id = task_id
+        self.title = title
+        self.done = done
+
+
+class _DayBucket:
+    """Bir kunlik vazifalar.
+
+    Bir kunda qo'shilgan vazifalar ketma-ket ID oladi, shuning uchun
+    ID -> o'rin `task_id - first_id` bilan topiladi. Bajarilganlar
+    bitmask'da saqlanadi.
+    """
+    __slots__ = ('first_id', 'titles', 'done_mask', 'done_count')
+
+    def __init__(self, first_id: int, titles: Optional[List[str]] = None, done_mask: int = 0):
+        self.first_id = first_id
+        self.titles = titles if titles is not None else []
+        self.done_mask = done_mask
+        self.done_count = bin(done_mask).count("1")
+
+    def position(self, task_id: int) -> int:
+        pos = task_id - self.first_id
+        return pos if 0 <= pos < len(self.titles) else -1
+
+    def is_done(self, pos: int) -> bool:
+        return bool(self.done_mask >> pos & 1)
+
+
+class TaskBook:
+    """Foydalanuvchi vazifalari: kunlar bo'yicha bo'lingan, ID bilan indekslangan.
+
+    Har kun uchun (jami, bajarilgan) hisoblagichlari vazifa qo'shilganda va
+    bajarilganda yangilanadi, shuning uchun haftalik statistika ro'yxatlarni
+    aylanib chiqmasdan olinadi. Saqlash muddati o'tgan kunlardan faqat
+    hisoblagichlar qoladi.
+    """
+    __slots__ = ('_next_id', '_days', '_archive', '_day')
+
+    def __init__(self):
+        self._next_id = 1
+        # kun -> _DayBucket (oxirgi TASK_RETENTION_DAYS kun)
+        self._days: Dict[int, _DayBucket] = {}
+        # kun -> (jami, bajarilgan) eskiroq kunlar uchun
+        self._archive: Optional[Dict[int, Tuple[int, int]]] = None
+        self._day = 0
+
+    def rollover(self, day: Optional[int] = None) -> int:
+        """Yangi kunga o'tish: eski kunlar tafsilotlarini hisoblagichga aylantirish"""
+        day = day if day is not None else current_day()
+        if day == self._day:
+            return day
+        self._day = day
+        for old_day in [d for d in self._days if d <= day - TASK_RETENTION_DAYS]:
+            bucket = self._days.pop(old_day)
+            if self._archive is None:
+                self._archive = {}
+            self._archive[old_day] = (len(bucket.titles), bucket.done_count)
+        if self._archive:
+            for old_day in [d for d in self._archive if d <= day - TASK_COUNT_RETENTION_DAYS]:
+                del self._archive[old_day]
+        return day
+
+    def add(self, title: str, day: Optional[int] = None) -> Task:
+        day = self.rollover(day)
+        bucket = self._days.get(day)
+        if bucket is None:
+            bucket = self._days[day] = _DayBucket(self._next_id)
+        task_id = bucket.first_id + len(bucket.titles)
+        bucket.titles.append(sys.intern(title))
+        self._next_id = task_id + 1
+        return Task(task_id, title)
+
+    def _find(self, task_id: int) -> Tuple[int, Optional[_DayBucket], int]:
+        for day, bucket in self._days.items():
+            pos = bucket.position(task_id)
+            if pos >= 0:
+                return day, bucket, pos
+        return 0, None, -1
+
+    def get(self, task_id: int) -> Optional[Task]:
+        _, bucket, pos = self._find(task_id)
+        if bucket is None:
+            return None
+        return Task(task_id, bucket.titles[pos], bucket.is_done(pos))
+
+    def complete(self, task_id: int) -> Optional[int]:
+        """Vazifani bajarilgan deb belgilash (qayta chaqirish xavfsiz).
+
+        Vazifa qaysi kunniki bo'lsa o'sha kun qaytadi (statistika ham shu
+        kunga yoziladi), topilmasa None.
+        """
+        day, bucket, pos = self._find(task_id)
+        if bucket is None:
+            return None
+        if not bucket.is_done(pos):
+            bucket.done_mask |= 1 << pos
+            bucket.done_count += 1
+        return day
+
+    def tasks_for(self, day: Optional[int] = None) -> List[Task]:
+        day = self.rollover(day)
+        bucket = self._days.get(day)
+        if bucket is None:
+            return []
+        return [Task(bucket.first_id + pos, title, bucket.is_done(pos))
+                for pos, title in enumerate(bucket.titles)]
+
+    def _counts(self, day: int) -> Tuple[int, int]:
+        bucket = self._days.get(day)
+        if bucket is not None:
+            return len(bucket.titles), bucket.done_count
+        if self._archive:
+            return self._archive.get(day, (0, 0))
+        return 0, 0
+
+    def day_counts(self, day: Optional[int] = None) -> Tuple[int, int]:
+        """(jami, bajarilgan) bitta kun uchun"""
+        return self._counts(self.rollover(day))
+
+    def window_counts(self, days: int, day: Optional[int] = None) -> Tuple[int, int]:
+        """(jami, bajarilgan) oxirgi `days` kun uchun"""
+        day = self.rollover(day)
+        total = done = 0
+        for d in range(day - days + 1, day + 1):
+            day_total, day_done = self._counts(d)
+            total += day_total
+            done += day_done
+        return total, done
+
+    def daily_counts(self) -> Iterator[Tuple[int, int, int]]:
+        """(kun, jami, bajarilgan) - saqlangan barcha kunlar"""
+        days = set(self._days) | set(self._archive or ())
+        for d in sorted(days):
+            yield (d, *self._counts(d))
+
+    def to_dict(self) -> Dict:
+        return {
+            'next_id': self._next_id,
+            'days': {str(d): [b.first_id, b.titles, b.done_mask] for d, b in self._days.items()},
+            'counts': {str(d): list(c) for d, c in (self._archive or {}).items()}
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "TaskBook":
+        book = cls()
+        book._next_id = data.get('next_id', 1)
+        for d, (first_id, titles, done_mask) in (data.get('days') or {}).items():
+            book._days[int(d)] = _DayBucket(first_id, [sys.intern(t) for t in titles], done_mask)
+        if data.get('counts'):
+            book._archive = {int(d): tuple(c) for d, c in data['counts'].items()}
+        return book
+
+    @classmethod
+    def from_legacy(cls, daily_tasks: List[str], completed_tasks: List[str],
+                    day: Optional[int] = None) -> "TaskBook":
+        """Eski `daily_tasks`/`completed_tasks` ro'yxatlaridan bugungi (`day`) kunga ko'chirish"""
+        book = cls()
+        completed = set(completed_tasks)
+        for title in daily_tasks:
+            task = book.add(title, day)
+            if title in completed:
+                book.complete(task.id)
+        return book
@@ -0,0 +1,6 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Modullar sozlamani import paytida o'qiydi: testlar diskdagi bazaga tegmasin
+os.environ.setdefault("PROFILE_STORE", "memory")
@@ -0,0 +1,95 @@
+import asyncio
+
+from journal import JournalPersistence
+
+
+def write(path, updates, **kwargs):
+    async def run():
+        journal = JournalPersistence(path, **kwargs)
+        await journal.get_conversations("main")
+        for update in updates:
+            await update(journal)
+        await journal.flush()
+        return journal
+    return asyncio.run(run())
+
+
+def replay(path):
+    async def run():
+        journal = JournalPersistence(path)
+        state = (await journal.get_conversations("main"), await journal.get_user_data(),
+                 await journal.get_chat_data(), await journal.get_bot_data())
+        await journal.flush()
+        return journal, state
+    return asyncio.run(run())
+
+
+def test_replay_restores_state(tmp_path):
+    path = str(tmp_path / "bot.journal")
+    write(path, [
+        lambda j: j.update_conversation("main", (5, 5), 3),
+        lambda j: j.update_conversation("main", (6, 6), 1),
+        lambda j: j.update_conversation("main", (6, 6), None),
+        lambda j: j.update_user_data(5, {"meal_plan": [1, 2]}),
+        lambda j: j.update_chat_data(5, {"x": 1}),
+        lambda j: j.drop_chat_data(5),
+        lambda j: j.update_bot_data({"version": 2}),
+    ])
+    _, (conversations, user_data, chat_data, bot_data) = replay(path)
+    # Kalitlar kortej sifatida tiklanadi
+    assert conversations == {(5, 5): 3}
+    assert user_data == {5: {"meal_plan": [1, 2]}}
+    assert chat_data == {}
+    assert bot_data == {"version": 2}
+
+
+def test_unchanged_values_are_not_written(tmp_path):
+    path = str(tmp_path / "bot.journal")
+    journal = write(path, [
+        lambda j: j.update_user_data(5, {"a": 1}),
+        lambda j: j.update_user_data(5, {"a": 1}),
+        lambda j: j.update_conversation("main", (5, 5), 2),
+        lambda j: j.update_conversation("main", (5, 5), 2),
+    ])
+    assert journal.records == 2
+
+
+def test_torn_last_line_is_truncated(tmp_path):
+    path = str(tmp_path / "bot.journal")
+    write(path, [lambda j: j.update_conversation("main", (5, 5), 4)])
+    with open(path, "rb") as f:
+        good = f.read()
+    # Yozish o'rtasida uzilgan qator
+    with open(path, "ab") as f:
+        f.write(b'["c","main",[6,6],')
+
+    journal, (conversations, _, _, _) = replay(path)
+    assert conversations == {(5, 5): 4}
+    assert journal.records == 1
+    with open(path, "rb") as f:
+        assert f.read() == good
+
+
+def test_corrupt_line_is_skipped(tmp_path):
+    path = str(tmp_path / "bot.journal")
+    with open(path, "wb") as f:
+        f.write(b'["c","main",[5,5],1]\nnot json\n["u",5,{"a":1}]\n')
+    journal, (conversations, user_data, _, _) = replay(path)
+    assert conversations == {(5, 5): 1}
+    assert user_data == {5: {"a": 1}}
+    assert journal.skipped_lines == 1
+
+
+def test_compaction_keeps_state(tmp_path):
+    path = str(tmp_path / "bot.journal")
+    updates = [lambda j, state=state: j.update_conversation("main", (5, 5), state)
+               for state in range(1, 41)]
+    updates.append(lambda j: j.update_user_data(7, {"b": 2}))
+    journal = write(path, updates, compact_ratio=2, compact_min=10)
+    assert journal.compactions > 0
+    with open(path, "rb") as f:
+        assert len(f.read().splitlines()) < 41
+
+    _, (conversations, user_data, _, _) = replay(path)
+    assert conversations == {(5, 5): 40}
+    assert user_data == {7: {"b": 2}}
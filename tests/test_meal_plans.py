@@ -0,0 +1,59 @@
+import json
+
+import pytest
+
+from meal_plans import MAX_DISH_CHARS, MAX_INGREDIENTS, load_plan, normalize, parse_plan, personalize
+
+
+def plan_text(meals):
+    return json.dumps({"meals": meals}, ensure_ascii=False)
+
+
+def meal(name="Nonushta", dish="Suli bo'tqasi", kcal=400, ingredients=("suli", "sut")):
+    return {"name": name, "dish": dish, "kcal": kcal, "ingredients": list(ingredients)}
+
+
+def test_parse_plan_strips_wrapper_and_comments():
+    text = "Mana reja:\n```json\n" + plan_text([meal(), meal("Tushlik", "Osh", "650.4")]) + "\n```\nYoqimli ishtaha!"
+    plan = parse_plan(text)
+    assert plan.kcal == 1050
+    assert [m.dish for m in plan.meals] == ["Suli bo'tqasi", "Osh"]
+    assert plan.meals[0].ingredients == ("suli", "sut")
+    # Bir xil reja - bir xil id, ixcham JSON qayta tahlil qilinadi
+    assert load_plan(normalize(text)) == plan
+
+
+@pytest.mark.parametrize("text", [
+    "Kechirasiz, reja tuza olmayman",
+    plan_text([meal()]),
+    plan_text([meal()] * 9),
+    '{"meals": "nonushta"}',
+    plan_text([meal(), meal(kcal="ko'p")]),
+    plan_text([meal(), meal(kcal=0)]),
+    plan_text([meal(), meal(kcal=True)]),
+    plan_text([meal(), meal(kcal=5000)]),
+    plan_text([meal(), meal(dish="  ")]),
+    plan_text([meal(), meal(name=["x"])]),
+    plan_text([meal(), "Kechki ovqat"]),
+])
+def test_parse_plan_rejects_invalid_structure(text):
+    with pytest.raises(ValueError):
+        parse_plan(text)
+
+
+def test_parse_plan_trims_long_fields():
+    ingredients = ["masalliq %d" % i for i in range(20)]
+    plan = parse_plan(plan_text([meal(dish="x" * 500, ingredients=ingredients),
+                                 meal(ingredients=[{"name": "guruch", "amount": "100 g"}])]))
+    assert len(plan.meals[0].dish) == MAX_DISH_CHARS
+    assert len(plan.meals[0].ingredients) == MAX_INGREDIENTS
+    assert plan.meals[1].ingredients == ("guruch 100 g",)
+
+
+def test_personalize_scales_calories():
+    plan = parse_plan(plan_text([meal(kcal=500), meal(kcal=1500)]))
+    assert personalize(plan, 2020) is plan
+    scaled = personalize(plan, 1500)
+    assert scaled.id == plan.id
+    assert [m.kcal for m in scaled.meals] == [380, 1120]
+    assert scaled.kcal == 1500
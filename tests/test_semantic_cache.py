@@ -0,0 +1,65 @@
+import pytest
+
+from semantic_cache import SemanticCache, normalize, question_kind
+
+COHORT = ("lose_weight", "normal")
+
+
+def cache_with(question, **kwargs):
+    cache = SemanticCache(**kwargs)
+    assert cache.put(COHORT, question, "javob")
+    return cache
+
+
+@pytest.mark.parametrize("other", [
+    "Kuniga qancha suv ichish kerak",
+    "KUNIGA QANCHA SUV ICHISH KERAK!",
+    "Кунига қанча сув ичиш керак?",
+    "Iltimos, kuniga necha suv ichish kerak?",
+])
+def test_paraphrases_hit(other):
+    hit = cache_with("Kuniga qancha suv ichish kerak?").lookup(COHORT, other)
+    assert hit is not None
+    assert hit.text == "javob"
+
+
+@pytest.mark.parametrize("cached, other", [
+    ("Kuniga qancha suv ichish kerak?", "Kuniga qachon suv ichish kerak?"),
+    ("Kuniga qancha suv ichish kerak?", "Kuniga nega suv ichish kerak?"),
+    ("Ozish uchun nima yeyish kerak?", "Nega ozish uchun yeyish kerak?"),
+    ("Qaysi mevalar foydali?", "Nega mevalar foydali?"),
+    ("Qanday qilib yaxshi uxlash mumkin?", "Yaxshi uxlash mumkin?"),
+])
+def test_different_question_words_do_not_collide(cached, other):
+    assert cache_with(cached).lookup(COHORT, other) is None
+
+
+def test_question_words_are_kept_out_of_the_vector():
+    assert normalize("Qachon suv ichish kerak?") == ["suv", "ichish"]
+    assert question_kind("Qachon va nega?") == frozenset({"when", "why"})
+    assert question_kind("necha / qancha") == frozenset({"amount"})
+
+
+def test_threshold_and_cohort_limit_hits():
+    question = "Kuniga qancha suv ichish kerak?"
+    other = "Kuniga qancha suv ichishim kerak?"
+    assert cache_with(question).lookup(COHORT, other) is None
+    assert cache_with(question, threshold=0.7).lookup(COHORT, other) is not None
+    cache = cache_with(question)
+    assert cache.lookup(("gain_muscle", "normal"), question) is None
+    assert cache.stats()['hits'] == 0
+
+
+def test_expired_entries_are_removed():
+    cache = cache_with("Kuniga qancha suv ichish kerak?", ttl=-1)
+    assert cache.lookup(COHORT, "Kuniga qancha suv ichish kerak?") is None
+    assert len(cache) == 0
+
+
+def test_per_cohort_limit_evicts_oldest():
+    cache = SemanticCache(per_cohort=2)
+    for question in ("Olma foydalimi?", "Banan foydalimi?", "Uzum foydalimi?"):
+        cache.put(COHORT, question, question)
+    assert len(cache) == 2
+    assert cache.lookup(COHORT, "Olma foydalimi?") is None
+    assert cache.lookup(COHORT, "Uzum foydalimi?").text == "Uzum foydalimi?"
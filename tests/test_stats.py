@@ -0,0 +1,82 @@
+from datetime import datetime, timezone
+
+import pytest
+
+from stats import StatsAggregator
+from tasks import TaskBook
+
+DAY = 739000
+
+
+def test_counter_window_counts_empty_days():
+    stats = StatsAggregator()
+    stats.record("meals", day=DAY - 1)
+    stats.record("meals", day=DAY)
+    stats.record("meals", day=DAY)
+
+    week = stats.summary("meals", 7, DAY)
+    assert week.count == 3
+    assert week.mean == pytest.approx(3 / 7)
+    assert (week.min, week.max) == (0.0, 2.0)
+    assert week.trend > 0
+    assert stats.summary("meals", 30, DAY).mean == pytest.approx(3 / 30)
+
+
+def test_gauge_window_averages_events():
+    stats = StatsAggregator()
+    stats.record("stress", 8, day=DAY - 10)
+    stats.record("stress", 4, day=DAY - 1)
+    stats.record("stress", 6, day=DAY)
+
+    week = stats.summary("stress", 7, DAY)
+    assert (week.count, week.mean, week.min, week.max) == (2, 5.0, 4, 6)
+    month = stats.summary("stress", 30, DAY)
+    assert (month.count, month.mean) == (3, 6.0)
+
+
+def test_old_days_leave_the_window():
+    stats = StatsAggregator()
+    stats.record("stress", 5, day=DAY)
+    assert stats.summary("stress", 7, DAY + 7).count == 0
+    assert stats.summary("stress", 30, DAY + 7).count == 1
+    # Oynadan tashqaridagi kech hodisa e'tiborsiz qoladi
+    stats.record("stress", 9, day=DAY - 30)
+    assert stats.summary("stress", 30, DAY + 7).max == 5
+
+
+def test_day_total_sums_one_day():
+    stats = StatsAggregator()
+    stats.record("kcal", 450, DAY - 1)
+    stats.record("kcal", 600, DAY)
+    stats.record("kcal", 250.5, DAY)
+    assert stats.day_total("kcal", DAY) == 850.5
+    assert stats.day_total("kcal", DAY - 1) == 450
+    assert stats.day_total("kcal", DAY + 1) == 0.0
+    assert stats.day_total("water", DAY) == 0.0
+
+
+def test_from_dict_rolls_over_to_given_day():
+    stats = StatsAggregator()
+    stats.record("tasks_done", day=DAY)
+    # Server kuni emas, foydalanuvchi kuni: oyna siljimaydi
+    restored = StatsAggregator.from_dict(stats.to_dict(), DAY + 3)
+    assert restored.summary("tasks_done", 7, DAY + 3).count == 1
+    assert restored.to_dict() == stats.to_dict()
+    later = StatsAggregator.from_dict(stats.to_dict(), DAY + 7)
+    assert later.summary("tasks_done", 7, DAY + 7).count == 0
+    assert later.summary("tasks_done", 30, DAY + 7).count == 1
+
+
+def test_from_history_uses_user_offset():
+    # 2024-01-01 05:00 UTC: UTC+0 bo'yicha 1-yanvar, UTC-10 bo'yicha 31-dekabr
+    moment = datetime(2024, 1, 1, 5, tzinfo=timezone.utc)
+    today = moment.date().toordinal()
+    book = TaskBook.from_legacy(["A", "B"], ["A"], today)
+
+    utc = StatsAggregator.from_history(book, {moment.timestamp(): 7, 0: 3}, 0, today).to_dict()
+    assert utc["stress"] == {str(today): [1, 7, 7, 7]}
+    assert utc["tasks_added"] == {str(today): [2, 2, 1, 1]}
+    assert utc["tasks_done"] == {str(today): [1, 1, 1, 1]}
+
+    west = StatsAggregator.from_history(book, {moment.timestamp(): 7}, -10, today).to_dict()
+    assert west["stress"] == {str(today - 1): [1, 7, 7, 7]}
@@ -0,0 +1,163 @@
+import json
+import asyncio
+
+from storage import MemoryBackend, ProfileStore, SQLiteBackend
+
+
+class Profile:
+    def __init__(self, user_id, value=0):
+        self.user_id = user_id
+        self.value = value
+
+    def to_dict(self):
+        return {"user_id": self.user_id, "value": self.value}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data["user_id"], data["value"])
+
+
+def make_store(backend=None, **kwargs):
+    return ProfileStore(backend or MemoryBackend(), Profile.from_dict, **kwargs)
+
+
+def saved(backend, user_id):
+    data = backend.load(user_id)
+    return data and data["value"]
+
+
+def test_flush_writes_only_changed_profiles():
+    async def run():
+        store = make_store()
+        store[1] = Profile(1, 10)
+        store[2] = Profile(2, 20)
+        assert await store.flush() == 2
+        # O'qilgan, lekin o'zgarmagan profil qayta yozilmaydi
+        store.get(1)
+        assert await store.flush() == 0
+        store.get(2).value = 21
+        assert await store.flush() == 1
+        assert saved(store.backend, 2) == 21
+    asyncio.run(run())
+
+
+def test_change_after_flush_is_saved_on_next_flush():
+    async def run():
+        store = make_store()
+        profile = store.get(1, None) or Profile(1)
+        store[1] = profile
+        await store.flush()
+        # Handler havolani await orqali ushlab turib, flush'dan keyin o'zgartiradi
+        profile.value = 5
+        await store.flush()
+        assert saved(store.backend, 1) == 5
+    asyncio.run(run())
+
+
+def test_failed_flush_is_retried():
+    class FlakyBackend(MemoryBackend):
+        fail = True
+
+        def save_many(self, records):
+            if self.fail:
+                self.fail = False
+                raise OSError("disk full")
+            super().save_many(records)
+
+    async def run():
+        store = make_store(FlakyBackend())
+        store[1] = Profile(1, 7)
+        assert await store.flush() == 0
+        assert await store.flush() == 1
+        assert saved(store.backend, 1) == 7
+    asyncio.run(run())
+
+
+def test_evicted_profile_is_reloaded_from_disk():
+    async def run():
+        store = make_store(cache_size=2)
+        for user_id in range(4):
+            store[user_id] = Profile(user_id, user_id * 10)
+        await store.flush()
+        await store.flush()
+        assert len(store) == 2
+        assert store.get(0).value == 0
+        assert store.stats()["sync_loads"] == 1
+        await store.preload(1)
+        assert store.get(1).value == 10
+        assert store.stats()["sync_loads"] == 1
+    asyncio.run(run())
+
+
+def test_missing_ids_are_bounded():
+    store = make_store(cache_size=3)
+    for user_id in range(10):
+        assert store.get(user_id) is None
+    assert len(store._missing) == 3
+    store[9] = Profile(9)
+    assert 9 not in store._missing
+
+
+def test_sqlite_roundtrip_and_iter_all_since(tmp_path):
+    backend = SQLiteBackend(str(tmp_path / "profiles.db"))
+    backend.save_many([(1, json.dumps({"user_id": 1, "value": 1}), 100.0),
+                       (2, json.dumps({"user_id": 2, "value": 2}), 200.0)])
+    backend.save_many([(1, json.dumps({"user_id": 1, "value": 3}), 300.0)])
+    assert backend.load(1) == {"user_id": 1, "value": 3}
+    assert backend.load(3) is None
+    assert [row[0] for row in backend.iter_all(250.0)] == [1]
+    backend.close()
+
+    reopened = SQLiteBackend(str(tmp_path / "profiles.db"))
+    assert reopened.load(2) == {"user_id": 2, "value": 2}
+    reopened.close()
+
+
+def test_stop_flushes_pending_changes(tmp_path):
+    path = str(tmp_path / "profiles.db")
+
+    async def run():
+        store = make_store(SQLiteBackend(path))
+        store.start()
+        store[1] = Profile(1, 42)
+        await store.stop()
+    asyncio.run(run())
+
+    backend = SQLiteBackend(path)
+    assert saved(backend, 1) == 42
+    backend.close()
+
+
+def test_iter_profiles_prefers_cached_copies():
+    async def run():
+        store = make_store(cache_size=2)
+        for user_id in range(4):
+            store[user_id] = Profile(user_id, user_id)
+        await store.flush()
+        await store.flush()
+        # Keshdagi o'zgarish hali diskka yozilmagan
+        store.get(3).value = 33
+        profiles = dict(await store.iter_profiles())
+        assert {user_id: p.value for user_id, p in profiles.items()} == {0: 0, 1: 1, 2: 2, 3: 33}
+        odd = await store.iter_profiles(lambda data: data["value"] % 2)
+        assert sorted(user_id for user_id, _ in odd) == [1, 3]
+        assert len(store) == 2
+    asyncio.run(run())
+
+
+def test_foreign_profiles_are_not_loaded_or_saved():
+    async def run():
+        backend = MemoryBackend()
+        backend.save_many([(user_id, json.dumps({"user_id": user_id, "value": user_id}), 0.0)
+                           for user_id in range(4)])
+        store = make_store(backend, owns=lambda user_id: user_id % 2 == 0)
+        assert store.get(1) is None
+        assert store.get(2).value == 2
+        store[3] = Profile(3, 30)
+        store.get(2).value = 20
+        assert await store.flush() == 1
+        assert saved(backend, 3) == 3
+        assert saved(backend, 2) == 20
+        assert sorted(user_id for user_id, _ in await store.iter_profiles()) == [0, 2]
+        assert store.stats()["foreign"] == 2
+    asyncio.run(run())
@@ -0,0 +1,75 @@
+import asyncio
+
+from telegram.error import BadRequest
+
+from streaming import EMPTY_TEXT, markdown_safe_prefix, split_message, stream_to_message
+
+
+class FakeMessage:
+    """edit_text/reply_text chaqiruvlarini yozib boradigan xabar"""
+
+    def __init__(self, reject_markdown=False):
+        self.edits = []
+        self.replies = []
+        self.reject_markdown = reject_markdown
+
+    async def edit_text(self, text, reply_markup=None, parse_mode=None):
+        if parse_mode and self.reject_markdown:
+            raise BadRequest("Can't parse entities")
+        self.edits.append((text, parse_mode))
+
+    async def reply_text(self, text, reply_markup=None, parse_mode=None):
+        self.replies.append((text, parse_mode))
+        return self
+
+
+async def _chunks(*parts):
+    for part in parts:
+        yield part
+
+
+def test_markdown_safe_prefix_stops_before_open_entity():
+    assert markdown_safe_prefix("Salom *dunyo* bu") == "Salom *dunyo* bu"
+    assert markdown_safe_prefix("Salom *dun") == "Salom "
+    assert markdown_safe_prefix("a _b_ ```kod") == "a _b_ "
+    assert markdown_safe_prefix("[havola](http://x") == ""
+    assert markdown_safe_prefix(r"2 \* 3 = 6") == r"2 \* 3 = 6"
+
+
+def test_split_message_respects_limit_and_entities():
+    text = "\n\n".join("Paragraf %d: *qalin* matn va _kursiv_ so'zlar." % i for i in range(40))
+    parts = split_message(text, 200)
+    assert len(parts) > 1
+    assert all(0 < len(part) <= 200 for part in parts)
+    assert all(markdown_safe_prefix(part) == part for part in parts)
+    assert " ".join(parts).split() == text.split()
+
+
+def test_split_message_cuts_oversized_entity():
+    text = "```" + "x" * 500 + "```"
+    parts = split_message(text, 200)
+    assert all(len(part) <= 200 for part in parts)
+    assert "".join(parts) == text
+
+
+def test_empty_stream_replaces_placeholder():
+    message = FakeMessage()
+    body = asyncio.run(stream_to_message(message, _chunks("", "  "), interval=0))
+    assert body == "  "
+    assert message.edits[-1] == (EMPTY_TEXT, "Markdown")
+
+
+def test_long_stream_continues_in_new_messages():
+    message = FakeMessage()
+    chunks = ["So'z %d. " % i for i in range(1500)]
+    body = asyncio.run(stream_to_message(message, _chunks(*chunks), header="*Javob*\n\n"))
+    assert body == "".join(chunks)
+    assert message.edits[-1][0].startswith("*Javob*")
+    assert message.replies
+    assert all(len(text) <= 4096 for text, _ in message.edits + message.replies)
+
+
+def test_invalid_markdown_falls_back_to_plain_text():
+    message = FakeMessage(reject_markdown=True)
+    asyncio.run(stream_to_message(message, _chunks("Salom *dunyo")))
+    assert message.edits[-1] == ("Salom *dunyo", None)
@@ -0,0 +1,50 @@
+from tasks import TASK_COUNT_RETENTION_DAYS, TASK_RETENTION_DAYS, TaskBook
+
+DAY = 739000
+
+
+def test_add_and_complete_returns_task_day():
+    book = TaskBook()
+    first = book.add("Suv ichish", DAY)
+    second = book.add("Yugurish", DAY + 1)
+    assert book.complete(first.id) == DAY
+    assert book.complete(first.id) == DAY
+    assert book.complete(999) is None
+    assert book.day_counts(DAY) == (1, 1)
+    assert [(t.title, t.done) for t in book.tasks_for(DAY + 1)] == [("Yugurish", False)]
+    assert book.get(second.id).title == "Yugurish"
+
+
+def test_rollover_archives_old_days():
+    book = TaskBook()
+    task = book.add("Kitob o'qish", DAY)
+    book.add("Mashq", DAY)
+    book.complete(task.id)
+
+    later = DAY + TASK_RETENTION_DAYS
+    assert book.tasks_for(later) == []
+    # Tafsilotlar o'chadi, hisoblagichlar qoladi
+    assert book.get(task.id) is None
+    assert book.day_counts(DAY) == (2, 1)
+    assert book.window_counts(TASK_RETENTION_DAYS + 1, later) == (2, 1)
+
+    book.rollover(DAY + TASK_COUNT_RETENTION_DAYS)
+    assert book.day_counts(DAY) == (0, 0)
+
+
+def test_from_legacy_uses_given_day():
+    book = TaskBook.from_legacy(["A", "B", "C"], ["B"], DAY)
+    assert book.day_counts(DAY) == (3, 1)
+    assert [t.done for t in book.tasks_for(DAY)] == [False, True, False]
+
+
+def test_dict_roundtrip():
+    book = TaskBook()
+    book.add("Eski", DAY - TASK_RETENTION_DAYS)
+    done = book.add("Yangi", DAY)
+    book.complete(done.id)
+
+    restored = TaskBook.from_dict(book.to_dict())
+    assert restored.to_dict() == book.to_dict()
+    assert list(restored.daily_counts()) == list(book.daily_counts())
+    assert restored.add("Keyingi", DAY).id == done.id + 1
@@ -0,0 +1,145 @@
+"""Tayyor klaviaturalar va o'zgarmas matnlar.
+
+Telegram obyektlari yaratilgandan keyin o'zgarmaydi (python-telegram-bot
+ularni muzlatadi), shuning uchun har update'da qayta yig'ish o'rniga
+modul yuklanganda bir marta yaratilib, barcha handlerlarda ishlatiladi.
+"""
+from telegram import InlineKeyboardButton, InlineKeyboardMarkup, KeyboardButton, ReplyKeyboardMarkup
+
+# --- Asosiy menyu tugmalari ---
+MENU_DAILY = "📋 Kunlik rejalashtirish"
+MENU_MEAL_PLAN = "🍎 Ovqatlanish rejasi"
+MENU_WEEKLY = "📊 Haftalik natijalar"
+MENU_STRESS = "😌 Stress va dam olish"
+MENU_PROFILE = "👤 Profil sozlash"
+MENU_AI_CHAT = "💬 AI bilan suhbat"
+MENU_LOG_MEAL = "🍽 Ovqat yozish"
+
+MAIN_MENU_KEYBOARD = ReplyKeyboardMarkup([
+    [KeyboardButton(MENU_DAILY)],
+    [KeyboardButton(MENU_MEAL_PLAN), KeyboardButton(MENU_WEEKLY)],
+    [KeyboardButton(MENU_STRESS), KeyboardButton(MENU_PROFILE)],
+    [KeyboardButton(MENU_LOG_MEAL), KeyboardButton(MENU_AI_CHAT)]
+], resize_keyboard=True)
+
+# --- Inline klaviaturalar ---
+BACK_BUTTON = InlineKeyboardButton("« Orqaga", callback_data="back_main")
+BACK_KEYBOARD = InlineKeyboardMarkup([[BACK_BUTTON]])
+
+DAILY_TASKS_KEYBOARD = InlineKeyboardMarkup([
+    [InlineKeyboardButton("➕ Yangi vazifa qo'shish", callback_data="add_task")],
+    [InlineKeyboardButton("✅ Vazifalarni ko'rish", callback_data="view_tasks")],
+    [InlineKeyboardButton("🤖 AI bilan rejalashtirish", callback_data="ai_plan_tasks")],
+    [BACK_BUTTON]
+])
+
+MEAL_PLAN_KEYBOARD = InlineKeyboardMarkup([
+    [InlineKeyboardButton("🔄 Yangi reja", callback_data="new_meal_plan")],
+    [InlineKeyboardButton("💾 Saqlash", callback_data="save_meal_plan")],
+    [BACK_BUTTON]
+])
+
+STRESS_KEYBOARD = InlineKeyboardMarkup([
+    [InlineKeyboardButton("😓 Stress tekshirish", callback_data="check_stress")],
+    [InlineKeyboardButton("🧘 Meditatsiya", callback_data="meditation")],
+    [InlineKeyboardButton("⏰ Dam olish rejasi", callback_data="plan_rest")],
+    [InlineKeyboardButton("💤 Uyqu rejasi", callback_data="sleep_schedule")],
+    [BACK_BUTTON]
+])
+
+GENDER_KEYBOARD = InlineKeyboardMarkup([
+    [InlineKeyboardButton("Erkak 👨", callback_data="gender_male")],
+    [InlineKeyboardButton("Ayol 👩", callback_data="gender_female")],
+])
+
+ACTIVITY_KEYBOARD = InlineKeyboardMarkup([
+    [InlineKeyboardButton("🪑 Kam harakatli", callback_data="activity_sedentary")],
+    [InlineKeyboardButton("🚶 Yengil faol", callback_data="activity_light")],
+    [InlineKeyboardButton("🏃 O'rtacha faol", callback_data="activity_moderate")],
+    [InlineKeyboardButton("💪 Juda faol", callback_data="activity_very_active")]
+])
+
+GOAL_KEYBOARD = InlineKeyboardMarkup([
+    [InlineKeyboardButton("📉 Vazn tushirish", callback_data="goal_lose_weight")],
+    [InlineKeyboardButton("⚖️ Vazn saqlash", callback_data="goal_maintain")],
+    [InlineKeyboardButton("💪 Mushak ortirish", callback_data="goal_gain_muscle")]
+])
+
+# callback_data -> profil qiymati
+ACTIVITY_LEVELS = {
+    "activity_sedentary": "sedentary",
+    "activity_light": "light",
+    "activity_moderate": "moderate",
+    "activity_very_active": "very_active"
+}
+GOALS = {
+    "goal_lose_weight": "lose_weight",
+    "goal_maintain": "maintain",
+    "goal_gain_muscle": "gain_muscle"
+}
+
+# --- O'zgarmas matnlar ---
+# Maslahat tugmalari (callback_data = STATIC_PROMPTS kaliti) sarlavhalari
+ADVICE_TITLES = {
+    "ai_plan_tasks": "🤖 **AI reja (Gemini):**",
+    "meditation": "🧘 **Meditatsiya (Gemini AI):**",
+    "plan_rest": "⏰ **Dam olish rejasi:**",
+    "sleep_schedule": "💤 **Uyqu rejasi:**"
+}
+ADVICE_PROGRESS = {
+    "ai_plan_tasks": "🤖 Google Gemini AI sizga kunlik reja tuzmoqda..."
+}
+
+WELCOME_TEXT = """
+🤖 Assalomu alaykum, {first_name}!
+
+Men sizning shaxsiy AI yordamchingizman (Google Gemini 🆓)
+
+✅ Kunlik vazifalarni rejalashtirish
+✅ Vazndan kelib chiqib ovqatlanish rejasi
+✅ Stress va dam olishni boshqarish
+✅ Haftalik natijalarni monitoring
+✅ AI bilan 24/7 maslahat (BEPUL!)
+
+Boshlash uchun pastdagi tugmalardan birini tanlang! 👇
+"""
+
+AI_CHAT_TEXT = (
+    "💬 Menga istalgan savol bering! Men Google Gemini AI yordamida sizga "
+    "sog'liq, ovqatlanish, produktivlik va stress boshqarish bo'yicha "
+    "maslahat beraman.\n\n"
+    "🆓 Bu xizmat 100% BEPUL!\n\n"
+    "Asosiy menyuga qaytish: /start"
+)
+
+STRESS_TEXT = """
+😌 **Stress va dam olish**
+
+Sog'lom turmush tarzi uchun stress boshqarish muhim!
+
+Quyidagilardan birini tanlang:
+"""
+
+PROFILE_SETUP_TEXT = "👤 **Profil sozlash**\n\nJinsingizni tanlang:"
+
+PROFILE_REQUIRED_TEXT = "⚠️ Avval profilingizni to'ldiring!\nProfil sozlash tugmasini bosing."
+
+LOG_MEAL_TEXT = (
+    "🍽 Nima yedingiz? Vergul bilan bir nechtasini yozish mumkin:\n\n"
+    "Masalan: 'osh 300g, 2 ta non, choy'\n"
+    "Tezkor: /eat somsa"
+)
+
+ADD_TASK_TEXT = (
+    "✍️ Yangi vazifangizni yozing:\n\n"
+    "Masalan: 'Ertalab yugurish', 'Hisobot tayyorlash'"
+)
+
+CHECK_STRESS_TEXT = (
+    "😌 **Stress tekshirish**\n\n"
+    "Quyidagi savollarga 1-10 baho bering:\n"
+    "1️⃣ Charchoq darajasi?\n"
+    "2️⃣ Uyqu sifati?\n"
+    "3️⃣ Ish yuki?\n\n"
+    "Javob: 5,7,6 formatda yozing"
+)
@@ -0,0 +1,191 @@
+import os
+import re
+import hmac
+import json
+import base64
+import hashlib
+import logging
+import secrets
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+from telegram import Update
+from telegram.ext import Application
+
+import metrics
+
+try:
+    import orjson
+    json_loads = orjson.loads
+except ImportError:  # orjson o'rnatilmagan bo'lsa oddiy json
+    json_loads = json.loads
+
+logger = logging.getLogger(__name__)
+
+# Webhook sozlamalari (Render o'zi PORT va RENDER_EXTERNAL_URL beradi)
+WEBHOOK_URL = os.getenv("WEBHOOK_URL") or os.getenv("RENDER_EXTERNAL_URL")
+WEBHOOK_PATH = os.getenv("WEBHOOK_PATH", "/telegram")
+WEBHOOK_SECRET = os.getenv("WEBHOOK_SECRET")
+WEBHOOK_HOST = os.getenv("WEBHOOK_HOST", "0.0.0.0")
+WEBHOOK_PORT = int(os.getenv("PORT", "8080"))
+# GET /metrics uchun "Authorization: Bearer <token>"; berilmasa webhook siri ishlatiladi
+METRICS_TOKEN = os.getenv("METRICS_TOKEN")
+
+SECRET_HEADER = b"x-telegram-bot-api-secret-token"
+# Telegram secret_token uchun ruxsat etilgan ko'rinish
+_SECRET_RE = re.compile(r"^[A-Za-z0-9_-]{1,256}$")
+
+Receive = Callable[[], Awaitable[Dict]]
+Send = Callable[[Dict], Awaitable[None]]
+Route = Callable[[Dict, Receive, Send], Awaitable[None]]
+
+
+async def read_body(receive: Receive) -> bytes:
+    """ASGI so'rov tanasini to'liq o'qish"""
+    chunks = []
+    more_body = True
+    while more_body:
+        message = await receive()
+        chunks.append(message.get("body", b""))
+        more_body = message.get("more_body", False)
+    return b"".join(chunks)
+
+
+async def respond(send: Send, status: int, body: bytes = b"",
+                  content_type: bytes = b"text/plain; charset=utf-8") -> None:
+    """Oddiy HTTP javob yuborish"""
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [(b"content-type", content_type),
+                    (b"content-length", str(len(body)).encode())]
+    })
+    await send({"type": "http.response.body", "body": body})
+
+
+class WebhookApp:
+    """Telegram webhook uchun minimal ASGI ilova.
+
+    POST {path} - update qabul qilish (secret token tekshiriladi),
+    GET /healthz - holat tekshiruvi,
+    GET /metrics - Prometheus metrikalari (Bearer token bilan: port ochiq,
+    metrikalarda esa foydalanuvchilar va ichki holat haqida ma'lumot bor).
+    """
+
+    def __init__(self, application: Application, secret_token: str,
+                 path: str = WEBHOOK_PATH, metrics_token: Optional[str] = METRICS_TOKEN):
+        self.application = application
+        self.secret_token = secret_token.encode()
+        self.metrics_auth = b"Bearer " + (metrics_token or secret_token).encode()
+        self.path = path
+        self.routes: Dict[Tuple[str, str], Route] = {
+            ("POST", path): self.handle_update,
+            ("GET", "/healthz"): self.handle_health,
+            ("GET", "/metrics"): self.handle_metrics,
+        }
+        self.received = 0
+        self.rejected = 0
+
+    async def __call__(self, scope: Dict, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            return
+        route = self.routes.get((scope["method"], scope["path"]))
+        if route is None:
+            await respond(send, 404, b"not found")
+            return
+        await route(scope, receive, send)
+
+    def _header(self, scope: Dict, name: bytes) -> Optional[bytes]:
+        for key, value in scope["headers"]:
+            if key == name:
+                return value
+        return None
+
+    async def handle_update(self, scope: Dict, receive: Receive, send: Send) -> None:
+        token = self._header(scope, SECRET_HEADER) or b""
+        if not hmac.compare_digest(token, self.secret_token):
+            self.rejected += 1
+            await respond(send, 403, b"forbidden")
+            return
+
+        body = await read_body(receive)
+        try:
+            await self.dispatch(json_loads(body))
+        except Exception as e:
+            logger.warning(f"Webhook: noto'g'ri update: {e}")
+            await respond(send, 400, b"bad request")
+            return
+
+        self.received += 1
+        await respond(send, 200)
+
+    async def dispatch(self, data: Dict) -> None:
+        """Update'ni qayta ishlashga uzatish"""
+        await self.application.update_queue.put(Update.de_json(data, self.application.bot))
+
+    async def handle_health(self, scope: Dict, receive: Receive, send: Send) -> None:
+        body = json.dumps({
+            "status": "ok" if self.application.running else "starting",
+            "received": self.received,
+            "rejected": self.rejected,
+            "queued": self.application.update_queue.qsize()
+        }).encode()
+        await respond(send, 200, body, b"application/json")
+
+    async def handle_metrics(self, scope: Dict, receive: Receive, send: Send) -> None:
+        auth = self._header(scope, b"authorization") or b""
+        if not hmac.compare_digest(auth, self.metrics_auth):
+            await respond(send, 401, b"unauthorized")
+            return
+        body = metrics.registry.render().encode()
+        await respond(send, 200, body, b"text/plain; version=0.0.4; charset=utf-8")
+
+
+def telegram_secret(secret: Optional[str]) -> str:
+    """Webhook siri Telegram qabul qiladigan ko'rinishda.
+
+    Berilmasa tasodifiy yaratiladi. Ruxsat etilmagan belgilar bo'lsa
+    (masalan, base64 dagi `+/=`) uning sha256 i urlsafe-base64 qilinadi -
+    bir xil sozlama har doim bir xil sirni beradi.
+    """
+    if not secret:
+        return secrets.token_urlsafe(32)
+    if _SECRET_RE.match(secret):
+        return secret
+    digest = hashlib.sha256(secret.encode()).digest()
+    return base64.urlsafe_b64encode(digest).decode().rstrip("=")
+
+
+async def serve_webhook(application: Application, url: str,
+                        secret_token: Optional[str] = None,
+                        host: str = WEBHOOK_HOST, port: int = WEBHOOK_PORT,
+                        path: str = WEBHOOK_PATH,
+                        allowed_updates: Optional[List[str]] = None) -> None:
+    """Application'ni webhook rejimida ishga tushirish (uvicorn bilan)"""
+    import uvicorn
+
+    secret_token = telegram_secret(secret_token)
+    asgi_app = WebhookApp(application, secret_token, path)
+    server = uvicorn.Server(uvicorn.Config(
+        asgi_app, host=host, port=port, lifespan="off",
+        log_level="warning", access_log=False
+    ))
+
+    await application.initialize()
+    if application.post_init:
+        await application.post_init(application)
+    await application.start()
+    try:
+        await application.bot.set_webhook(
+            url=url.rstrip("/") + path,
+            secret_token=secret_token,
+            allowed_updates=allowed_updates
+        )
+        logger.info(f"Webhook: {url.rstrip('/')}{path} (port {port})")
+        await server.serve()
+    finally:
+        await application.stop()
+        if application.post_stop:
+            await application.post_stop(application)
+        await application.shutdown()
+        if application.post_shutdown:
+            await application.post_shutdown(application)